@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Import-time benchmark of chainer_chemistry
+
+Each target module is imported in a fresh python process, and the wall clock
+time of the import and the heavy third party modules loaded by it are
+reported. It exits with status 1 when the median import time exceeds
+`--max-time`, or when a module listed in `--forbid` is loaded by importing
+the first target, so that it can be used to catch import-time regressions.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --max-time 0.5 --out import_time.json
+"""
+
+from __future__ import print_function
+
+from argparse import ArgumentParser
+import json
+import subprocess
+import sys
+
+DEFAULT_TARGETS = [
+    'chainer_chemistry',
+    'chainer_chemistry.inference',
+    'chainer_chemistry.models',
+    'chainer_chemistry.models.nfp',
+    'chainer_chemistry.dataset.preprocessors',
+    'chainer_chemistry.datasets',
+    'chainer_chemistry.training.extensions.roc_auc_evaluator',
+]
+
+HEAVY_MODULES = ['chainer', 'rdkit', 'pandas', 'sklearn', 'scipy',
+                 'matplotlib', 'tqdm', 'joblib']
+
+_MEASURE_CODE = '''
+import json, sys, time
+start = time.time()
+import {target}
+elapsed = time.time() - start
+print(json.dumps({{'time': elapsed,
+                  'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def measure(target, repeat=5, python=sys.executable):
+    """Measure import time of `target` in fresh processes
+
+    Args:
+        target (str): module name to import.
+        repeat (int): number of processes to measure.
+        python (str): python executable.
+
+    Returns (dict): median and min time in seconds, and the heavy modules
+        loaded by the import.
+    """
+    code = _MEASURE_CODE.format(target=target, heavy=HEAVY_MODULES)
+    times = []
+    loaded = []
+    for _ in range(repeat):
+        out = subprocess.check_output([python, '-c', code])
+        result = json.loads(out.decode('utf-8').strip().splitlines()[-1])
+        times.append(result['time'])
+        loaded = result['loaded']
+    times.sort()
+    return {'target': target,
+            'median': times[len(times) // 2],
+            'min': times[0],
+            'loaded': loaded}
+
+
+def parse_arguments():
+    parser = ArgumentParser(description='Import-time benchmark')
+    parser.add_argument('targets', nargs='*', default=DEFAULT_TARGETS,
+                        help='module names to import')
+    parser.add_argument('--repeat', '-r', type=int, default=5,
+                        help='number of processes for each target')
+    parser.add_argument('--max-time', type=float, default=None,
+                        help='fail if median time of the first target '
+                        'exceeds it (sec)')
+    parser.add_argument('--forbid', nargs='*',
+                        default=['rdkit', 'pandas', 'sklearn', 'matplotlib',
+                                 'tqdm', 'joblib'],
+                        help='fail if the first target loads these modules')
+    parser.add_argument('--out', '-o', type=str, default=None,
+                        help='path to output json')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    results = []
+    print('{:<60} {:>10} {:>10}  loaded'.format('target', 'median', 'min'))
+    for target in args.targets:
+        result = measure(target, repeat=args.repeat)
+        results.append(result)
+        print('{:<60} {:>9.1f}ms {:>9.1f}ms  {}'.format(
+            target, result['median'] * 1e3, result['min'] * 1e3,
+            ','.join(result['loaded'])))
+    if args.out is not None:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    errors = []
+    first = results[0]
+    if args.max_time is not None and first['median'] > args.max_time:
+        errors.append('import {} took {:.3f} sec > {:.3f} sec'.format(
+            first['target'], first['median'], args.max_time))
+    forbidden = sorted(set(first['loaded']) & set(args.forbid))
+    if forbidden:
+        errors.append('import {} loaded {}'.format(
+            first['target'], ', '.join(forbidden)))
+    for error in errors:
+        print('FAIL:', error)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+"""Forward/backward microbenchmark of chainer_chemistry models on CPU
+
+Each model in `chainer_chemistry.models` is run on synthetic inputs of the
+shapes and dtypes given by its preprocessor, while sweeping batch size,
+number of (padded) atoms and hidden dimension. For each configuration the
+following values are recorded:
+
+- forward time and throughput (molecules/sec) in test mode without backprop
+- forward+backward time and throughput in train mode
+- peak RSS of the process and its increase during the measurement
+- peak bytes traced by `tracemalloc` in one forward+backward
+- number of function calls in one forward+backward, i.e. number of
+  output arrays allocated by `FunctionNode` (forward and backward)
+
+Each configuration runs in a fresh worker process so that peak RSS is not
+affected by the previous configurations.
+
+With `--static-graph`, the models which support `use_static_graph` replay
+the computational graph recorded at the first call, and the others run as
+they are. Function hooks are not called in the replayed iterations, so that
+the number of function calls only counts the functions run define-by-run.
+
+Usage:
+    python benchmarks/model_speed.py
+    python benchmarks/model_speed.py nfp ggnn --batchsize 32 128 \\
+        --n-atoms 32 --hidden-dim 64 --out model_speed.json
+    python benchmarks/model_speed.py nfp ggnn --static-graph
+"""
+
+from __future__ import print_function
+
+from argparse import ArgumentParser
+import itertools
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+import chainer
+from chainer import functions
+import numpy
+import scipy.sparse
+
+from chainer_chemistry.config import MAX_ATOMIC_NUM
+from chainer_chemistry import models
+
+_get_time = getattr(time, 'perf_counter', time.time)
+
+
+def _atom_array(rs, batchsize, n_atoms):
+    return rs.randint(1, MAX_ATOMIC_NUM,
+                      size=(batchsize, n_atoms)).astype(numpy.int32)
+
+
+def _adj(rs, batchsize, n_atoms, n_edge_types=None):
+    shape = (batchsize, n_atoms, n_atoms)
+    if n_edge_types is not None:
+        shape = (batchsize, n_edge_types, n_atoms, n_atoms)
+    adj = (rs.uniform(size=shape) < 0.1).astype(numpy.float32)
+    return adj + adj.swapaxes(-1, -2)
+
+
+def _normalized_adj(rs, batchsize, n_atoms):
+    adj = _adj(rs, batchsize, n_atoms) + numpy.eye(n_atoms, dtype='f')
+    degree = adj.sum(axis=2)
+    norm = 1. / numpy.sqrt(degree)
+    return (adj * norm[:, :, None] * norm[:, None, :]).astype(numpy.float32)
+
+
+def _molecular_normalized_adj(rs, batchsize, n_atoms):
+    # Tree-like sparse graph, where each atom is bonded to one of the
+    # preceding atoms as in molecules
+    adj = numpy.zeros((batchsize, n_atoms, n_atoms), dtype=numpy.float32)
+    for i in range(1, n_atoms):
+        j = i - 1 - rs.randint(min(i, 3), size=batchsize)
+        adj[numpy.arange(batchsize), i, j] = 1
+    adj = adj + adj.swapaxes(-1, -2) + numpy.eye(n_atoms, dtype='f')
+    norm = 1. / numpy.sqrt(adj.sum(axis=2))
+    return (adj * norm[:, :, None] * norm[:, None, :]).astype(numpy.float32)
+
+
+# name -> (function to build model, function to make inputs)
+MODELS = {
+    'nfp': (
+        lambda hidden_dim, n_atoms: models.NFP(
+            out_dim=hidden_dim, hidden_dim=hidden_dim),
+        lambda rs, b, n: (_atom_array(rs, b, n), _adj(rs, b, n))),
+    'ggnn': (
+        lambda hidden_dim, n_atoms: models.GGNN(
+            out_dim=hidden_dim, hidden_dim=hidden_dim),
+        lambda rs, b, n: (_atom_array(rs, b, n), _adj(rs, b, n, 4))),
+    'schnet': (
+        lambda hidden_dim, n_atoms: models.SchNet(
+            out_dim=1, hidden_dim=hidden_dim),
+        lambda rs, b, n: (
+            _atom_array(rs, b, n),
+            rs.uniform(0, 5, (b, n, n)).astype(numpy.float32))),
+    'weavenet': (
+        lambda hidden_dim, n_atoms: models.WeaveNet(
+            weave_channels=[hidden_dim, hidden_dim], hidden_dim=hidden_dim,
+            n_atom=n_atoms),
+        lambda rs, b, n: (
+            _atom_array(rs, b, n),
+            rs.uniform(size=(b, n * n, 7)).astype(numpy.float32))),
+    'rsgcn': (
+        lambda hidden_dim, n_atoms: models.RSGCN(
+            out_dim=hidden_dim, hidden_dim=hidden_dim),
+        lambda rs, b, n: (_atom_array(rs, b, n),
+                          _normalized_adj(rs, b, n))),
+    'rsgcn_sparse': (
+        lambda hidden_dim, n_atoms: models.RSGCN(
+            out_dim=hidden_dim, hidden_dim=hidden_dim),
+        lambda rs, b, n: (_atom_array(rs, b, n), scipy.sparse.block_diag(
+            [scipy.sparse.coo_matrix(a)
+             for a in _molecular_normalized_adj(rs, b, n)], format='csr'))),
+    'relgcn': (
+        lambda hidden_dim, n_atoms: models.RelGCN(
+            out_channels=hidden_dim, ch_list=[hidden_dim] * 4),
+        lambda rs, b, n: (_atom_array(rs, b, n), _adj(rs, b, n, 4))),
+    'mlp': (
+        lambda hidden_dim, n_atoms: models.MLP(
+            out_dim=1, hidden_dim=hidden_dim),
+        lambda rs, b, n: (
+            rs.uniform(size=(b, n)).astype(numpy.float32),)),
+}
+
+
+class _FunctionCallCounter(chainer.FunctionHook):
+
+    name = 'FunctionCallCounter'
+
+    def __init__(self):
+        self.count = 0
+
+    def forward_postprocess(self, function, in_data):
+        self.count += 1
+
+    def backward_postprocess(self, function, in_data, out_grad):
+        self.count += 1
+
+
+def _max_rss():
+    # KB in Linux, bytes in macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _forward_backward(model, inputs):
+    y = model(*inputs)
+    model.cleargrads()
+    functions.sum(y).backward()
+
+
+def _time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = _get_time()
+        fn()
+        times.append(_get_time() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def run_config(config):
+    """Measure one configuration
+
+    Args:
+        config (dict): 'model', 'batchsize', 'n_atoms', 'hidden_dim',
+            'static_graph', 'repeat' and 'seed'.
+
+    Returns (dict): `config` updated with the measured values.
+    """
+    rs = numpy.random.RandomState(config['seed'])
+    build_model, make_inputs = MODELS[config['model']]
+    batchsize = config['batchsize']
+    model = build_model(config['hidden_dim'], config['n_atoms'])
+    if config.get('static_graph') and hasattr(model, 'use_static_graph'):
+        model.use_static_graph = True
+    inputs = make_inputs(rs, batchsize, config['n_atoms'])
+    rss_start = _max_rss()
+
+    def forward():
+        with chainer.using_config('train', False), \
+                chainer.no_backprop_mode():
+            model(*inputs)
+
+    def forward_backward():
+        _forward_backward(model, inputs)
+
+    # warm up, which also initializes lazily initialized parameters
+    forward_backward()
+    forward()
+
+    counter = _FunctionCallCounter()
+    tracemalloc.start()
+    with counter:
+        forward_backward()
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    forward_time = _time(forward, config['repeat'])
+    forward_backward_time = _time(forward_backward, config['repeat'])
+    rss_peak = _max_rss()
+    result = dict(config)
+    result.update({
+        'forward_time': forward_time,
+        'forward_throughput': batchsize / forward_time,
+        'forward_backward_time': forward_backward_time,
+        'forward_backward_throughput': batchsize / forward_backward_time,
+        'peak_rss': rss_peak,
+        'rss_increase': rss_peak - rss_start,
+        'peak_traced_bytes': peak_traced,
+        'n_function_calls': counter.count,
+    })
+    return result
+
+
+def _run_isolated(config):
+    # New process for each configuration to measure its peak RSS.
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    try:
+        return pool.apply(run_config, (config,))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def parse_arguments():
+    parser = ArgumentParser(description='Model forward/backward benchmark')
+    parser.add_argument('models', nargs='*', default=sorted(MODELS.keys()),
+                        help='models to measure')
+    parser.add_argument('--batchsize', '-b', type=int, nargs='+',
+                        default=[8, 32])
+    parser.add_argument('--n-atoms', '-n', type=int, nargs='+',
+                        default=[16, 32])
+    parser.add_argument('--hidden-dim', '-u', type=int, nargs='+',
+                        default=[32, 64])
+    parser.add_argument('--static-graph', action='store_true',
+                        help='use static graph if the model supports it')
+    parser.add_argument('--repeat', '-r', type=int, default=5,
+                        help='number of runs, median time is reported')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-isolate', action='store_true',
+                        help='run all configurations in this process')
+    parser.add_argument('--out', '-o', type=str, default=None,
+                        help='path to output json')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    run = run_config if args.no_isolate else _run_isolated
+    results = []
+    print('{:<9} {:>5} {:>5} {:>6} {:>12} {:>12} {:>9} {:>10} {:>7}'.format(
+        'model', 'batch', 'atoms', 'hidden', 'fwd mol/s', 'fwdbwd mol/s',
+        'rss(MB)', 'traced(MB)', 'calls'))
+    for model, batchsize, n_atoms, hidden_dim in itertools.product(
+            args.models, args.batchsize, args.n_atoms, args.hidden_dim):
+        result = run({'model': model, 'batchsize': batchsize,
+                      'n_atoms': n_atoms, 'hidden_dim': hidden_dim,
+                      'static_graph': args.static_graph,
+                      'repeat': args.repeat, 'seed': args.seed})
+        results.append(result)
+        print('{:<9} {:>5} {:>5} {:>6} {:>12.1f} {:>12.1f} {:>9.1f} '
+              '{:>10.2f} {:>7}'.format(
+                  model, batchsize, n_atoms, hidden_dim,
+                  result['forward_throughput'],
+                  result['forward_backward_throughput'],
+                  result['peak_rss'] / 2. ** 20,
+                  result['peak_traced_bytes'] / 2. ** 20,
+                  result['n_function_calls']))
+    if args.out is not None:
+        info = {'chainer': chainer.__version__, 'numpy': numpy.__version__,
+                'python': platform.python_version(),
+                'processor': platform.processor()}
+        with open(args.out, 'w') as f:
+            json.dump({'info': info, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
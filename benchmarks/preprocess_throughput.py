@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+"""Preprocessing throughput benchmark of chainer_chemistry
+
+Each preprocessor in `preprocess_method_dict` featurizes an offline set of
+SMILES, and the time of each stage which `DataFrameParser` runs is measured
+separately for molecules grouped by the number of heavy atoms:
+
+- parse: `Chem.MolFromSmiles`
+- canonicalize: `prepare_smiles_and_mol` of the preprocessor
+- featurize: `get_input_features` of the preprocessor
+- array_build: conversion of the feature lists to numpy arrays
+
+Molecules per second, time of each stage per molecule and output bytes per
+molecule are reported, and saved as JSON with `--out` to compare runs.
+
+The SMILES are read from the csv files of `examples/own_dataset` (small
+molecules with up to 9 heavy atoms), and larger molecules are generated
+deterministically by concatenating fragments, so that the benchmark does not
+need network access.
+
+Usage:
+    python benchmarks/preprocess_throughput.py
+    python benchmarks/preprocess_throughput.py nfp ggnn -n 200 --out pp.json
+"""
+
+from __future__ import print_function
+
+from argparse import ArgumentParser
+import csv
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy
+from rdkit import Chem
+from rdkit import RDLogger
+
+import chainer_chemistry
+from chainer_chemistry.dataset.preprocessors import preprocess_method_dict
+from chainer_chemistry.dataset.preprocessors.common import MolFeatureExtractionError  # NOQA
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CSV = os.path.join(ROOT_DIR, 'examples', 'own_dataset',
+                           'dataset_train.csv')
+
+# Ranges of the number of heavy atoms, [min, max]
+SIZE_RANGES = [(1, 9), (10, 19), (20, 39), (40, 79)]
+
+# Fragments to generate larger molecules, any concatenation is valid SMILES
+FRAGMENTS = ['C', 'CC', 'C(=O)N', 'c1ccc(cc1)', 'C(F)(F)', 'O', 'N(C)',
+             'C1CCC(CC1)', 'C(=O)O', 'S']
+
+# Keyword arguments to construct preprocessors, so that large molecules are
+# not rejected by the default `max_atoms`.
+PREPROCESSOR_KWARGS = {'weavenet': {'max_atoms': 200}}
+
+_get_time = getattr(time, 'perf_counter', time.time)
+
+
+def load_smiles(filepath, smiles_col='SMILES'):
+    with open(filepath) as f:
+        return [row[smiles_col] for row in csv.DictReader(f)]
+
+
+def generate_smiles(n_atoms, n_mols, seed=0):
+    """Generate SMILES of molecules with about `n_atoms` heavy atoms"""
+    rs = numpy.random.RandomState(seed)
+    sizes = [Chem.MolFromSmiles(f).GetNumAtoms() for f in FRAGMENTS]
+    smiles_list = []
+    for _ in range(n_mols):
+        smiles = ''
+        count = 0
+        while count < n_atoms:
+            i = rs.randint(len(FRAGMENTS))
+            smiles += FRAGMENTS[i]
+            count += sizes[i]
+        smiles_list.append(smiles)
+    return smiles_list
+
+
+def build_smiles_set(n_per_range=100, csv_path=DEFAULT_CSV, seed=0):
+    """Returns dict which maps size range label to list of SMILES"""
+    smiles_set = {}
+    small = load_smiles(csv_path) if os.path.exists(csv_path) else []
+    for min_atoms, max_atoms in SIZE_RANGES:
+        if max_atoms <= 9 and small:
+            candidates = small
+        else:
+            candidates = []
+            for n_atoms in range(min_atoms, max_atoms + 1):
+                candidates.extend(generate_smiles(
+                    n_atoms, n_per_range // (max_atoms - min_atoms + 1) + 1,
+                    seed=seed + n_atoms))
+        selected = []
+        for smiles in candidates:
+            mol = Chem.MolFromSmiles(smiles)
+            if mol is not None and \
+                    min_atoms <= mol.GetNumAtoms() <= max_atoms:
+                selected.append(smiles)
+            if len(selected) >= n_per_range:
+                break
+        smiles_set['{}-{}'.format(min_atoms, max_atoms)] = selected
+    return smiles_set
+
+
+def _to_array(feature):
+    # Same with `DataFrameParser.parse`
+    try:
+        return numpy.asarray(feature)
+    except ValueError:
+        feat_array = numpy.empty(len(feature), dtype=numpy.ndarray)
+        feat_array[:] = feature[:]
+        return feat_array
+
+
+def _nbytes(array):
+    if array.dtype == object:
+        return sum(numpy.asarray(a).nbytes for a in array)
+    return array.nbytes
+
+
+def measure(preprocessor, smiles_list, repeat=3):
+    """Measure each preprocessing stage for `smiles_list`
+
+    Args:
+        preprocessor (MolPreprocessor): preprocessor to measure.
+        smiles_list (list): list of SMILES.
+        repeat (int): number of runs, minimum time of each stage is taken.
+
+    Returns (dict): time of each stage in seconds, throughput and output
+        bytes per molecule.
+    """
+    best = None
+    for _ in range(repeat):
+        times = {'parse': 0., 'canonicalize': 0., 'featurize': 0.,
+                 'array_build': 0.}
+        features = None
+        n_success = 0
+        for smiles in smiles_list:
+            t0 = _get_time()
+            mol = Chem.MolFromSmiles(smiles)
+            t1 = _get_time()
+            times['parse'] += t1 - t0
+            if mol is None:
+                continue
+            _, mol = preprocessor.prepare_smiles_and_mol(mol)
+            t2 = _get_time()
+            times['canonicalize'] += t2 - t1
+            try:
+                input_features = preprocessor.get_input_features(mol)
+            except MolFeatureExtractionError:
+                continue
+            finally:
+                times['featurize'] += _get_time() - t2
+            if not isinstance(input_features, tuple):
+                input_features = (input_features,)
+            if features is None:
+                features = [[] for _ in input_features]
+            for i, feature in enumerate(input_features):
+                features[i].append(feature)
+            n_success += 1
+        t3 = _get_time()
+        arrays = [_to_array(feature) for feature in features or []]
+        times['array_build'] = _get_time() - t3
+        if best is None:
+            best = times
+        else:
+            best = {k: min(best[k], v) for k, v in times.items()}
+    total = sum(best.values())
+    n_mols = len(smiles_list)
+    return {
+        'n_molecules': n_mols,
+        'n_success': n_success,
+        'molecules_per_sec': n_mols / total if total > 0 else float('inf'),
+        'time_per_molecule': {k: v / max(n_mols, 1)
+                              for k, v in best.items()},
+        'bytes_per_molecule': (sum(_nbytes(a) for a in arrays) /
+                               max(n_success, 1)),
+    }
+
+
+def parse_arguments():
+    parser = ArgumentParser(description='Preprocessing throughput benchmark')
+    parser.add_argument('methods', nargs='*',
+                        default=sorted(preprocess_method_dict.keys()),
+                        help='preprocessor names in preprocess_method_dict')
+    parser.add_argument('--n-molecules', '-n', type=int, default=100,
+                        help='number of molecules in each size range')
+    parser.add_argument('--repeat', '-r', type=int, default=3,
+                        help='number of runs, minimum time is reported')
+    parser.add_argument('--csv', type=str, default=DEFAULT_CSV,
+                        help='csv file with SMILES column for small '
+                        'molecules')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed to generate large molecules')
+    parser.add_argument('--out', '-o', type=str, default=None,
+                        help='path to output json')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    # Suppress warnings of RDKit printed for each molecule
+    RDLogger.DisableLog('rdApp.*')
+    smiles_set = build_smiles_set(args.n_molecules, args.csv, args.seed)
+    results = []
+    print('{:<10} {:>7} {:>10} {:>9} {:>9} {:>9} {:>9} {:>11}'.format(
+        'method', 'atoms', 'mol/sec', 'parse', 'canon', 'feat', 'array',
+        'bytes/mol'))
+    for method in args.methods:
+        kwargs = PREPROCESSOR_KWARGS.get(method, {})
+        preprocessor = preprocess_method_dict[method](**kwargs)
+        for size_range, smiles_list in smiles_set.items():
+            result = measure(preprocessor, smiles_list, repeat=args.repeat)
+            result.update({'method': method, 'size_range': size_range})
+            results.append(result)
+            t = result['time_per_molecule']
+            print('{:<10} {:>7} {:>10.1f} {:>7.1f}us {:>7.1f}us {:>7.1f}us '
+                  '{:>7.1f}us {:>11.1f}'.format(
+                      method, size_range, result['molecules_per_sec'],
+                      t['parse'] * 1e6, t['canonicalize'] * 1e6,
+                      t['featurize'] * 1e6, t['array_build'] * 1e6,
+                      result['bytes_per_molecule']))
+    if args.out is not None:
+        info = {'chainer_chemistry_version': chainer_chemistry.__version__,
+                'python': platform.python_version(),
+                'numpy': numpy.__version__,
+                'rdkit': Chem.rdBase.rdkitVersion}
+        with open(args.out, 'w') as f:
+            json.dump({'info': info, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
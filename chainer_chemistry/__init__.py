@@ -1,19 +1,7 @@
+import sys
 import warnings
 
-from chainer_chemistry import dataset  # NOQA
-try:
-    from chainer_chemistry import datasets  # NOQA
-except ImportError:
-    warnings.warn(
-        'A module chainer_chemistry.datasets was not imported, '
-        'probably because RDKit is not installed. '
-        'To install RDKit, please follow instruction in '
-        'https://github.com/pfnet-research/chainer-chemistry#installation.',
-        UserWarning)
-from chainer_chemistry import functions  # NOQA
-from chainer_chemistry import links  # NOQA
-from chainer_chemistry import models  # NOQA
-from chainer_chemistry import training  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
 
 # --- config variable definitions ---
 from chainer_chemistry.config import *  # NOQA
@@ -23,3 +11,29 @@ from chainer_chemistry import _version  # NOQA
 
 
 __version__ = _version.__version__
+
+# Subpackages are imported on first access, e.g. `chainer_chemistry.datasets`
+# imports RDKit and pandas only when it is used.
+_submodules = [
+    'dataset',
+    'datasets',
+    'functions',
+    'links',
+    'models',
+    'training',
+]
+if sys.version_info < (3, 7):
+    # Subpackages are imported immediately in this version.
+    try:
+        from chainer_chemistry import datasets  # NOQA
+    except ImportError:
+        warnings.warn(
+            'A module chainer_chemistry.datasets was not imported, '
+            'probably because RDKit is not installed. '
+            'To install RDKit, please follow instruction in '
+            'https://github.com/pfnet-research/chainer-chemistry'
+            '#installation.',
+            UserWarning)
+        _submodules.remove('datasets')
+
+__getattr__, __dir__, __all__ = lazy_import(__name__, submodules=_submodules)
@@ -1,4 +1,6 @@
 import chainer
+import numpy
+import scipy.sparse
 
 
 def concat_mols(batch, device=None, padding=0):
@@ -66,3 +68,88 @@ def concat_mols(batch, device=None, padding=0):
         The type depends on the type of each example in the batch.
     """
     return chainer.dataset.concat_examples(batch, device, padding=padding)
+
+
+def concat_mols_with_distance(batch, device=None, padding=0,
+                              coordinates_index=1, atom_index=0):
+    """Concatenates molecules, replacing coordinates by distance matrices.
+
+    This converter is used with datasets which store coordinates of shape
+    (atom, 3) instead of distance matrices, e.g. made by
+    `SchNetPreprocessor(return_coordinates=True)`. After the examples are
+    concatenated by :func:`concat_mols`, distance matrices of shape
+    (minibatch, atom, atom) are computed on ``device`` from the coordinates.
+    Distances from or to the padded atoms, whose atomic number is
+    ``padding``, are zero as in the padded distance matrices.
+
+    Args:
+        batch (list): A list of examples.
+        device (int): Device ID to which each array is sent.
+        padding: Scalar value for extra elements.
+        coordinates_index (int): index of coordinates in each example.
+        atom_index (int): index of atomic numbers in each example.
+
+    Returns (tuple): tuple of arrays where coordinates are replaced by
+        distance matrices.
+    """
+    # Imported here, since the preprocessors require RDKit.
+    from chainer_chemistry.dataset.preprocessors.schnet_preprocessor import distance_matrix_from_coordinates  # NOQA
+
+    arrays = list(concat_mols(batch, device=device, padding=padding))
+    coordinates = arrays[coordinates_index]
+    dists = distance_matrix_from_coordinates(
+        coordinates, atom_mask=arrays[atom_index] != padding)
+    arrays[coordinates_index] = dists.astype(coordinates.dtype)
+    return tuple(arrays)
+
+
+def concat_mols_with_sparse_adj(batch, device=None, padding=0, adj_index=1,
+                                atom_index=0):
+    """Concatenates molecules, building a sparse block diagonal adjacency.
+
+    This converter is used with datasets which store adjacency matrices in
+    COO format, i.e. ``edge_index`` of shape (2, nnz) followed by
+    ``edge_weight`` of shape (nnz,), e.g. made by
+    `RSGCNPreprocessor(sparse=True)`. The other elements are concatenated by
+    :func:`concat_mols`, and the adjacency matrices of the minibatch are
+    stacked into a block diagonal ``scipy.sparse.csr_matrix`` of shape
+    (minibatch * atom, minibatch * atom), where atom is the padded number of
+    atoms. It replaces the two elements of the COO format in the output.
+
+    Sparse matrices are supported only on CPU. If ``device`` is a GPU,
+    dense adjacency matrices of shape (minibatch, atom, atom) are sent
+    instead.
+
+    Args:
+        batch (list): A list of examples.
+        device (int): Device ID to which each array is sent.
+        padding: Scalar value for extra elements.
+        adj_index (int): index of ``edge_index`` in each example, which is
+            followed by ``edge_weight``.
+        atom_index (int): index of atomic numbers in each example. It must
+            be less than ``adj_index``.
+
+    Returns (tuple): tuple of arrays where the adjacency matrix is at
+        ``adj_index``.
+    """
+    others = [example[:adj_index] + example[adj_index + 2:]
+              for example in batch]
+    arrays = list(concat_mols(others, device=device, padding=padding))
+    mb, n_atom = arrays[atom_index].shape[:2]
+    batch_index = numpy.concatenate(
+        [numpy.full(len(example[adj_index + 1]), i, dtype=numpy.int32)
+         for i, example in enumerate(batch)])
+    row, col = numpy.concatenate(
+        [example[adj_index] for example in batch], axis=1)
+    weight = numpy.concatenate([example[adj_index + 1] for example in batch])
+    if device is None or device < 0:
+        offset = batch_index * n_atom
+        adj = scipy.sparse.csr_matrix(
+            (weight, (row + offset, col + offset)),
+            shape=(mb * n_atom, mb * n_atom))
+    else:
+        adj = numpy.zeros((mb, n_atom, n_atom), dtype=weight.dtype)
+        adj[batch_index, row, col] = weight
+        adj = chainer.dataset.to_device(device, adj)
+    arrays.insert(adj_index, adj)
+    return tuple(arrays)
@@ -1,12 +1,22 @@
-from chainer_chemistry.dataset.parsers import base_parser  # NOQA
-from chainer_chemistry.dataset.parsers import csv_file_parser  # NOQA
-from chainer_chemistry.dataset.parsers import data_frame_parser  # NOQA
-from chainer_chemistry.dataset.parsers import sdf_file_parser  # NOQA
-from chainer_chemistry.dataset.parsers import smiles_parser  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
 
-from chainer_chemistry.dataset.parsers.base_parser import BaseFileParser  # NOQA
-from chainer_chemistry.dataset.parsers.base_parser import BaseParser  # NOQA
-from chainer_chemistry.dataset.parsers.csv_file_parser import CSVFileParser  # NOQA
-from chainer_chemistry.dataset.parsers.data_frame_parser import DataFrameParser  # NOQA
-from chainer_chemistry.dataset.parsers.sdf_file_parser import SDFFileParser  # NOQA
-from chainer_chemistry.dataset.parsers.smiles_parser import SmilesParser  # NOQA
+
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'base_parser',
+        'csv_file_parser',
+        'data_frame_parser',
+        'parse_stats',
+        'sdf_file_parser',
+        'smiles_parser',
+    ],
+    attributes={
+        'BaseFileParser': 'chainer_chemistry.dataset.parsers.base_parser',
+        'BaseParser': 'chainer_chemistry.dataset.parsers.base_parser',
+        'CSVFileParser': 'chainer_chemistry.dataset.parsers.csv_file_parser',
+        'DataFrameParser': 'chainer_chemistry.dataset.parsers.data_frame_parser',  # NOQA
+        'ParseStats': 'chainer_chemistry.dataset.parsers.parse_stats',
+        'SDFFileParser': 'chainer_chemistry.dataset.parsers.sdf_file_parser',
+        'SmilesParser': 'chainer_chemistry.dataset.parsers.smiles_parser',
+    })
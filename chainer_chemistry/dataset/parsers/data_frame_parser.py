@@ -5,6 +5,7 @@ from rdkit import Chem
 from tqdm import tqdm
 
 from chainer_chemistry.dataset.parsers.base_parser import BaseFileParser
+from chainer_chemistry.dataset.parsers.parse_stats import get_time, INVALID_MOL, ParseStats  # NOQA
 from chainer_chemistry.dataset.preprocessors.common import MolFeatureExtractionError  # NOQA
 from chainer_chemistry.dataset.preprocessors.mol_preprocessor import MolPreprocessor  # NOQA
 from chainer_chemistry.datasets.numpy_tuple_dataset import NumpyTupleDataset
@@ -26,13 +27,16 @@ class DataFrameParser(BaseFileParser):
         postprocess_label (Callable): post processing function if necessary
         postprocess_fn (Callable): post processing function if necessary
         logger:
+        mol_col (str or None): If specified, `Chem.Mol` instances in this
+            column are used instead of constructing them from `smiles_col`,
+            e.g. molecules which have conformers.
     """
 
     def __init__(self, preprocessor,
                  labels=None,
                  smiles_col='smiles',
                  postprocess_label=None, postprocess_fn=None,
-                 logger=None):
+                 logger=None, mol_col=None):
         super(DataFrameParser, self).__init__(preprocessor)
         if isinstance(labels, str):
             labels = [labels, ]
@@ -41,6 +45,7 @@ class DataFrameParser(BaseFileParser):
         self.postprocess_label = postprocess_label
         self.postprocess_fn = postprocess_fn
         self.logger = logger or getLogger(__name__)
+        self.mol_col = mol_col
 
     def parse(self, df, return_smiles=False, target_index=None,
               return_is_successful=False):
@@ -64,7 +69,8 @@ class DataFrameParser(BaseFileParser):
 
         Returns (dict): dictionary that contains Dataset, 1-d numpy array with
             dtype=object(string) which is a vector of smiles for each example
-            or None.
+            or None. `ParseStats` which holds time of each stage and failures
+            is returned in the key 'stats'.
 
         """
         logger = self.logger
@@ -79,49 +85,68 @@ class DataFrameParser(BaseFileParser):
 
             features = None
             smiles_index = df.columns.get_loc(self.smiles_col)
+            if self.mol_col is None:
+                mol_index = None
+            else:
+                mol_index = df.columns.get_loc(self.mol_col)
             if self.labels is None:
                 labels_index = []  # dummy list
             else:
                 labels_index = [df.columns.get_loc(c) for c in self.labels]
 
-            total_count = df.shape[0]
-            fail_count = 0
-            success_count = 0
+            stats = ParseStats()
+            stats.total_count = df.shape[0]
+            times = stats.times
+            t0 = get_time()
+            pp.prefetch(df.iloc[:, smiles_index if mol_index is None
+                                else mol_index].tolist())
+            times['featurize'] += get_time() - t0
             for row in tqdm(df.itertuples(index=False), total=df.shape[0]):
                 smiles = row[smiles_index]
                 # TODO(Nakago): Check.
                 # currently it assumes list
                 labels = [row[i] for i in labels_index]
                 try:
-                    mol = Chem.MolFromSmiles(smiles)
+                    t0 = get_time()
+                    if mol_index is None:
+                        mol = Chem.MolFromSmiles(smiles)
+                    else:
+                        mol = row[mol_index]
+                    t1 = get_time()
+                    times['parse'] += t1 - t0
                     if mol is None:
-                        fail_count += 1
+                        stats.add_failure(INVALID_MOL, smiles)
                         if return_is_successful:
                             is_successful_list.append(False)
                         continue
                     # Note that smiles expression is not unique.
                     # we obtain canonical smiles
                     canonical_smiles, mol = pp.prepare_smiles_and_mol(mol)
+                    t2 = get_time()
+                    times['canonicalize'] += t2 - t1
                     input_features = pp.get_input_features(mol)
+                    t3 = get_time()
+                    times['featurize'] += t3 - t2
 
                     # Extract label
                     if self.postprocess_label is not None:
                         labels = self.postprocess_label(labels)
+                        times['label'] += get_time() - t3
 
                     if return_smiles:
                         smiles_list.append(canonical_smiles)
                 except MolFeatureExtractionError as e:
                     # This is expected error that extracting feature failed,
                     # skip this molecule.
-                    fail_count += 1
+                    stats.add_failure(type(e).__name__, smiles, str(e))
                     if return_is_successful:
                         is_successful_list.append(False)
                     continue
                 except Exception as e:
-                    logger.warning('parse(), type: {}, {}'
-                                   .format(type(e).__name__, e.args))
-                    logger.info(traceback.format_exc())
-                    fail_count += 1
+                    # Failures are aggregated and logged at the end, not to
+                    # format the error for each row of noisy dataset.
+                    stats.add_failure(type(e).__name__, smiles, str(e.args),
+                                      traceback=traceback.format_exc)
                     if return_is_successful:
                         is_successful_list.append(False)
                     continue
@@ -142,11 +167,12 @@ class DataFrameParser(BaseFileParser):
                     features[0].append(input_features)
                 if self.labels is not None:
                     features[len(features) - 1].append(labels)
-                success_count += 1
+                stats.success_count += 1
                 if return_is_successful:
                     is_successful_list.append(True)
             ret = []
 
+            t0 = get_time()
             for feature in features:
                 try:
                     feat_array = numpy.asarray(feature)
@@ -158,8 +184,8 @@ class DataFrameParser(BaseFileParser):
                     feat_array[:] = feature[:]
                 ret.append(feat_array)
             result = tuple(ret)
-            logger.info('Preprocess finished. FAIL {}, SUCCESS {}, TOTAL {}'
-                        .format(fail_count, success_count, total_count))
+            times['array'] += get_time() - t0
+            stats.log(logger)
         else:
             raise NotImplementedError
 
@@ -179,7 +205,8 @@ class DataFrameParser(BaseFileParser):
             dataset = NumpyTupleDataset(result)
         return {"dataset": dataset,
                 "smiles": smileses,
-                "is_successful": is_successful}
+                "is_successful": is_successful,
+                "stats": stats}
 
     def extract_total_num(self, df):
         """Extracts total number of data which can be parsed
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+import time
+
+# Select the best-resolution timer function
+get_time = getattr(time, 'perf_counter', time.time)
+
+STAGES = ['parse', 'canonicalize', 'featurize', 'label', 'array']
+
+INVALID_MOL = 'InvalidMolecule'
+
+
+class ParseStats(object):
+
+    """Statistics of parsing, returned in the key 'stats' by parsers
+
+    It holds cumulative time of each preprocessing stage and failures
+    aggregated by exception type. The stages are
+
+    - parse: constructing `mol` by RDKit, e.g. `Chem.MolFromSmiles`
+    - canonicalize: `prepare_smiles_and_mol` of the preprocessor
+    - featurize: `get_input_features` of the preprocessor
+    - label: extracting and postprocessing labels
+    - array: assembling numpy arrays of the features
+
+    Failures are counted for each exception type name, where a molecule
+    which RDKit could not construct is counted as 'InvalidMolecule'.
+    At most `max_samples` samples, e.g. SMILES, are kept for each type.
+
+    Args:
+        max_samples (int): number of samples kept for each failure type.
+    """
+
+    def __init__(self, max_samples=3):
+        self.max_samples = max_samples
+        self.total_count = 0
+        self.success_count = 0
+        self.fail_count = 0
+        self.times = OrderedDict((stage, 0.) for stage in STAGES)
+        self.failures = OrderedDict()
+
+    def add_failure(self, error_type, sample=None, message=None,
+                    traceback=None):
+        """Count a failure
+
+        Args:
+            error_type (str): name of the failure type.
+            sample: sample which failed, e.g. SMILES or index.
+            message (str or None): error message of the sample.
+            traceback (callable or None): function which returns traceback
+                string. It is called only for the first failure of each type,
+                to avoid formatting for every failure.
+        """
+        self.fail_count += 1
+        failure = self.failures.get(error_type)
+        if failure is None:
+            failure = {'count': 0, 'samples': [], 'traceback': None}
+            if traceback is not None:
+                failure['traceback'] = traceback()
+            self.failures[error_type] = failure
+        failure['count'] += 1
+        if len(failure['samples']) < self.max_samples:
+            failure['samples'].append((sample, message))
+
+    def to_dict(self):
+        """Returns (dict): statistics as a dict of builtin types"""
+        return {'total_count': self.total_count,
+                'success_count': self.success_count,
+                'fail_count': self.fail_count,
+                'times': dict(self.times),
+                'failures': {k: dict(v) for k, v in self.failures.items()}}
+
+    def log(self, logger):
+        """Write the summary to `logger`
+
+        The counts and times are written in info level, and a warning is
+        written for each unexpected failure type with its samples.
+        """
+        logger.info('Preprocess finished. FAIL {}, SUCCESS {}, TOTAL {}'
+                    .format(self.fail_count, self.success_count,
+                            self.total_count))
+        logger.info('Preprocess time: {}'.format(', '.join(
+            '{} {:.3f}s'.format(k, v) for k, v in self.times.items())))
+        for error_type, failure in self.failures.items():
+            if failure['traceback'] is None:
+                continue
+            logger.warning('parse() error, type: {}, count: {}, samples: {}'
+                           .format(error_type, failure['count'],
+                                   failure['samples']))
+            logger.info(failure['traceback'])
+
+    def __repr__(self):
+        return ('ParseStats(total_count={}, success_count={}, fail_count={}, '
+                'failures={})'.format(
+                    self.total_count, self.success_count, self.fail_count,
+                    {k: v['count'] for k, v in self.failures.items()}))
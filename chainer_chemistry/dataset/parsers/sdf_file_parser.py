@@ -1,10 +1,12 @@
 from logging import getLogger
+import traceback
 
 import numpy
 from rdkit import Chem
 from tqdm import tqdm
 
 from chainer_chemistry.dataset.parsers.base_parser import BaseFileParser
+from chainer_chemistry.dataset.parsers.parse_stats import get_time, INVALID_MOL, ParseStats  # NOQA
 from chainer_chemistry.dataset.preprocessors.common import MolFeatureExtractionError  # NOQA
 from chainer_chemistry.dataset.preprocessors.mol_preprocessor import MolPreprocessor  # NOQA
 from chainer_chemistry.datasets.numpy_tuple_dataset import NumpyTupleDataset
@@ -50,7 +52,9 @@ class SDFFileParser(BaseFileParser):
 
         Returns (dict): dictionary that contains Dataset, 1-d numpy array with
             dtype=object(string) which is a vector of smiles for each example
-            or None.
+            or None. `ParseStats` which holds time of each stage and failures
+            is returned in the key 'stats', where failed samples are indices
+            in the sdf file.
 
         """
         logger = self.logger
@@ -66,15 +70,18 @@ class SDFFileParser(BaseFileParser):
 
             features = None
 
-            total_count = len(mol_supplier)
-            fail_count = 0
-            success_count = 0
+            stats = ParseStats()
+            stats.total_count = len(mol_supplier)
+            times = stats.times
             for index in tqdm(target_index):
                 # `mol_supplier` does not accept numpy.integer, we must use int
+                t0 = get_time()
                 mol = mol_supplier[int(index)]
+                t1 = get_time()
+                times['parse'] += t1 - t0
 
                 if mol is None:
-                    fail_count += 1
+                    stats.add_failure(INVALID_MOL, int(index))
                     if return_is_successful:
                         is_successful_list.append(False)
                     continue
@@ -85,13 +92,18 @@ class SDFFileParser(BaseFileParser):
                         label = pp.get_label(mol, self.labels)
                         if self.postprocess_label is not None:
                             label = self.postprocess_label(label)
+                    t2 = get_time()
+                    times['label'] += t2 - t1
 
                     # Note that smiles expression is not unique.
                     # we obtain canonical smiles
                     smiles = Chem.MolToSmiles(mol)
                     mol = Chem.MolFromSmiles(smiles)
                     canonical_smiles, mol = pp.prepare_smiles_and_mol(mol)
+                    t3 = get_time()
+                    times['canonicalize'] += t3 - t2
                     input_features = pp.get_input_features(mol)
+                    times['featurize'] += get_time() - t3
 
                     # Initialize features: list of list
                     if features is None:
@@ -108,14 +120,16 @@ class SDFFileParser(BaseFileParser):
                 except MolFeatureExtractionError as e:
                     # This is expected error that extracting feature failed,
                     # skip this molecule.
-                    fail_count += 1
+                    stats.add_failure(type(e).__name__, int(index), str(e))
                     if return_is_successful:
                         is_successful_list.append(False)
                     continue
                 except Exception as e:
-                    logger.warning('parse() error, type: {}, {}'
-                                   .format(type(e).__name__, e.args))
-                    fail_count += 1
+                    # Failures are aggregated and logged at the end, not to
+                    # format the error for each molecule of noisy dataset.
+                    stats.add_failure(type(e).__name__, int(index),
+                                      str(e.args),
+                                      traceback=traceback.format_exc)
                     if return_is_successful:
                         is_successful_list.append(False)
                     continue
@@ -127,12 +141,13 @@ class SDFFileParser(BaseFileParser):
                     features[0].append(input_features)
                 if self.labels is not None:
                     features[len(features) - 1].append(label)
-                success_count += 1
+                stats.success_count += 1
                 if return_is_successful:
                     is_successful_list.append(True)
 
             ret = []
 
+            t0 = get_time()
             for feature in features:
                 try:
                     feat_array = numpy.asarray(feature)
@@ -144,11 +159,12 @@ class SDFFileParser(BaseFileParser):
                     feat_array[:] = feature[:]
                 ret.append(feat_array)
             result = tuple(ret)
-            logger.info('Preprocess finished. FAIL {}, SUCCESS {}, TOTAL {}'
-                        .format(fail_count, success_count, total_count))
+            times['array'] += get_time() - t0
+            stats.log(logger)
         else:
             # Spec not finalized yet for general case
             result = pp.process(filepath)
+            stats = None
 
         smileses = numpy.array(smiles_list) if return_smiles else None
         if return_is_successful:
@@ -166,7 +182,8 @@ class SDFFileParser(BaseFileParser):
             dataset = NumpyTupleDataset(result)
         return {"dataset": dataset,
                 "smiles": smileses,
-                "is_successful": is_successful}
+                "is_successful": is_successful,
+                "stats": stats}
 
     def extract_total_num(self, filepath):
         """Extracts total number of data which can be parsed
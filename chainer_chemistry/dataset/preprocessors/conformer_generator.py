@@ -0,0 +1,250 @@
+from logging import getLogger
+import multiprocessing
+import sqlite3
+
+import numpy
+from rdkit import Chem
+from rdkit.Chem import AllChem
+
+
+def _smiles_atom_output_order(mol):
+    # Original atom indices in the order of the last `MolToSmiles` output
+    order = mol.GetProp('_smilesAtomOutputOrder').strip('[]').split(',')
+    return [int(i) for i in order if i]
+
+
+def _canonical_key(mol):
+    """Returns canonical SMILES of `mol` and the order of its atoms
+
+    Explicit hydrogens, e.g. added by `Chem.AddHs`, are kept in the SMILES,
+    so that the coordinates of all the atoms of `mol` are keyed.
+    """
+    key = Chem.MolToSmiles(mol, isomericSmiles=False, canonical=True)
+    return key, _smiles_atom_output_order(mol)
+
+
+def _embed(key, seed, max_attempts):
+    """Embed the molecule of canonical SMILES `key`
+
+    Returns (numpy.ndarray or None): coordinates of the atoms in the order of
+        `key`, or `None` if embedding failed.
+    """
+    params = Chem.SmilesParserParams()
+    params.removeHs = False
+    mol = Chem.MolFromSmiles(key, params)
+    if mol is None:
+        return None
+    try:
+        confid = AllChem.EmbedMolecule(mol, maxAttempts=max_attempts,
+                                       randomSeed=seed)
+    except (RuntimeError, ValueError):
+        return None
+    if confid < 0:
+        return None
+    return mol.GetConformer(confid).GetPositions().astype(numpy.float32)
+
+
+def _embed_task(args):
+    return _embed(*args)
+
+
+class ConformerGenerator(object):
+
+    """Generates 3D coordinates of molecules with cache
+
+    Molecules are embedded by `AllChem.EmbedMolecule` with the fixed random
+    seed, and the coordinates are cached by canonical SMILES of the molecule,
+    in memory and optionally in a sqlite file, so that the same molecule is
+    embedded only once over the runs. Failures (including timeouts) are also
+    cached not to retry pathological molecules.
+
+    `generate_batch` embeds molecules in worker processes. When `timeout` is
+    specified, molecules are always embedded in worker processes, and a
+    worker which exceeds it is terminated. The worker processes are kept
+    alive and reused by the following calls, e.g. `generate` for each
+    molecule, until `close` is called.
+
+    .. admonition:: Example
+
+       >>> generator = ConformerGenerator(n_jobs=4, timeout=10,
+       >>>                                cache_path='conformers.sqlite')
+       >>> pp = SchNetPreprocessor(conformer_generator=generator)
+       >>> dataset = SmilesParser(pp).parse(smiles_list)['dataset']
+
+    Args:
+        seed (int): random seed of embedding.
+        timeout (float or None): timeout in seconds to embed each molecule.
+            It is measured approximately from when the result is waited.
+        n_jobs (int): number of worker processes.
+        cache_path (str or None): path to sqlite file to cache coordinates.
+            Coordinates are keyed by canonical SMILES and `seed`.
+        max_attempts (int): `maxAttempts` of `AllChem.EmbedMolecule`.
+        logger:
+    """
+
+    def __init__(self, seed=0, timeout=None, n_jobs=1, cache_path=None,
+                 max_attempts=0, logger=None):
+        if n_jobs <= 0:
+            raise ValueError('n_jobs must be positive, actual {}'
+                             .format(n_jobs))
+        self.seed = seed
+        self.timeout = timeout
+        self.n_jobs = n_jobs
+        self.cache_path = cache_path
+        self.max_attempts = max_attempts
+        self.logger = logger or getLogger(__name__)
+        self._memory = {}
+        self._connection = None
+        self._pool = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_pool'] = None
+        return state
+
+    # --- Cache ---
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.cache_path)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS conformers (key TEXT, '
+                'seed INTEGER, coordinates BLOB, PRIMARY KEY (key, seed))')
+        return self._connection
+
+    def _lookup(self, keys):
+        """Returns dict of cached coordinates, `None` for failures"""
+        found = {}
+        missing = []
+        for key in keys:
+            if key in self._memory:
+                found[key] = self._memory[key]
+            else:
+                missing.append(key)
+        if missing and self.cache_path is not None:
+            connection = self._connect()
+            for key in missing:
+                row = connection.execute(
+                    'SELECT coordinates FROM conformers '
+                    'WHERE key = ? AND seed = ?', (key, self.seed)).fetchone()
+                if row is None:
+                    continue
+                if row[0] is None:
+                    coordinates = None
+                else:
+                    coordinates = numpy.frombuffer(
+                        row[0], dtype=numpy.float32).reshape(-1, 3)
+                self._memory[key] = coordinates
+                found[key] = coordinates
+        return found
+
+    def _store(self, results):
+        self._memory.update(results)
+        if self.cache_path is not None and results:
+            connection = self._connect()
+            connection.executemany(
+                'INSERT OR REPLACE INTO conformers VALUES (?, ?, ?)',
+                [(key, self.seed,
+                  None if value is None else value.tobytes())
+                 for key, value in results.items()])
+            connection.commit()
+
+    def close(self):
+        """Close the connection to the cache file and the worker processes"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self._terminate_pool()
+
+    # --- Embedding ---
+    def _terminate_pool(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _embed_in_pool(self, keys):
+        results = {}
+        pending = list(keys)
+        while pending:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self.n_jobs)
+            try:
+                tasks = [(key, self._pool.apply_async(
+                    _embed_task, ((key, self.seed, self.max_attempts),)))
+                    for key in pending]
+                pending = []
+                for i, (key, task) in enumerate(tasks):
+                    try:
+                        results[key] = task.get(self.timeout)
+                    except multiprocessing.TimeoutError:
+                        self.logger.warning(
+                            'Embedding {} timed out in {} seconds'
+                            .format(key, self.timeout))
+                        results[key] = None
+                        # Restart the pool, since the worker is still busy.
+                        for rest_key, rest_task in tasks[i + 1:]:
+                            if rest_task.ready():
+                                results[rest_key] = rest_task.get()
+                            else:
+                                pending.append(rest_key)
+                        self._terminate_pool()
+                        break
+            except BaseException:
+                # Tasks left in the pool must not be run after the failure.
+                self._terminate_pool()
+                raise
+        return results
+
+    def _embed_keys(self, keys):
+        keys = list(set(keys))
+        if not keys:
+            return {}
+        if self.timeout is None and (self.n_jobs == 1 or len(keys) == 1):
+            results = {key: _embed(key, self.seed, self.max_attempts)
+                       for key in keys}
+        else:
+            results = self._embed_in_pool(keys)
+        n_failed = sum(value is None for value in results.values())
+        if n_failed > 0:
+            self.logger.info('Embedding failed for {} molecules'
+                             .format(n_failed))
+        self._store(results)
+        return results
+
+    def generate_batch(self, mols):
+        """Generate coordinates of molecules
+
+        Args:
+            mols (list): list of `Chem.Mol`.
+
+        Returns (list): coordinates of the atoms of each molecule, in the
+            order of its atoms, as `numpy.ndarray` of shape (atom, 3).
+            `None` for the molecules whose embedding failed.
+        """
+        keys_orders = [_canonical_key(mol) for mol in mols]
+        keys = [key for key, _ in keys_orders]
+        found = self._lookup(keys)
+        found.update(self._embed_keys(
+            [key for key in keys if key not in found]))
+
+        coordinates_list = []
+        for key, order in keys_orders:
+            coordinates = found[key]
+            if coordinates is not None:
+                cached = coordinates
+                coordinates = numpy.empty_like(cached)
+                coordinates[order] = cached
+            coordinates_list.append(coordinates)
+        return coordinates_list
+
+    def generate(self, mol):
+        """Generate coordinates of a molecule
+
+        Args:
+            mol (Chem.Mol): molecule.
+
+        Returns (numpy.ndarray or None): coordinates of shape (atom, 3), or
+            `None` if embedding failed.
+        """
+        return self.generate_batch([mol])[0]
@@ -39,6 +39,18 @@ class MolPreprocessor(BasePreprocessor):
             Chem.Kekulize(mol)
         return canonical_smiles, mol
 
+    def prefetch(self, molecules):
+        """Compute expensive features of molecules at once in advance.
+
+        This method is called by parser with all the molecules to parse,
+        before each molecule is processed by `prepare_smiles_and_mol` and
+        `get_input_features`. It may be overridden to compute features in
+        parallel and cache them. It does nothing by default.
+
+        Args:
+            molecules (list): list of SMILES or `Chem.Mol`.
+        """
+        pass
 
     def get_label(self, mol, label_names=None):
         """Extracts label information from a molecule.
@@ -1,3 +1,5 @@
+import numpy
+
 from chainer_chemistry.dataset.preprocessors.common import construct_adj_matrix
 from chainer_chemistry.dataset.preprocessors.common \
     import construct_atomic_number_array
@@ -21,11 +23,14 @@ class NFPPreprocessor(MolPreprocessor):
             Setting negative value indicates do not pad returned array.
         add_Hs (bool): If True, implicit Hs are added.
         kekulize (bool): If True, Kekulizes the molecule.
+        return_degree (bool): If True, degree of each atom is also returned,
+            so that `NFP` does not compute it from the adjacency matrix.
+            It is -1 for padded atoms.
 
     """
 
     def __init__(self, max_atoms=-1, out_size=-1, add_Hs=False,
-                 kekulize=False):
+                 kekulize=False, return_degree=False):
         super(NFPPreprocessor, self).__init__(
             add_Hs=add_Hs, kekulize=kekulize)
         if max_atoms >= 0 and out_size >= 0 and max_atoms > out_size:
@@ -33,6 +38,7 @@ class NFPPreprocessor(MolPreprocessor):
                              'out_size {}'.format(max_atoms, out_size))
         self.max_atoms = max_atoms
         self.out_size = out_size
+        self.return_degree = return_degree
 
     def get_input_features(self, mol):
         """get input features
@@ -46,4 +52,8 @@ class NFPPreprocessor(MolPreprocessor):
         type_check_num_atoms(mol, self.max_atoms)
         atom_array = construct_atomic_number_array(mol, out_size=self.out_size)
         adj_array = construct_adj_matrix(mol, out_size=self.out_size)
+        if self.return_degree:
+            # adj_array has self connection
+            degree_array = (adj_array.sum(axis=0) - 1).astype(numpy.int32)
+            return atom_array, adj_array, degree_array
         return atom_array, adj_array
@@ -17,14 +17,18 @@ class RelGCNPreprocessor(GGNNPreprocessor):
             Setting negative value indicates do not pad returned array.
         add_Hs (bool): If True, implicit Hs are added.
         kekulize (bool): If True, Kekulizes the molecule.
+        scale_adj (bool): If True, adjacency matrix is normalized in the same
+            way as `RelGCN(scale_adj=True)`, so that it is not normalized in
+            every forward. Use it with `RelGCN(scale_adj=False)`.
 
     """
 
     def __init__(self, max_atoms=-1, out_size=-1, add_Hs=False,
-                 kekulize=False):
+                 kekulize=False, scale_adj=False):
         super(RelGCNPreprocessor, self).__init__(
             max_atoms=max_atoms, out_size=out_size, add_Hs=add_Hs,
             kekulize=kekulize)
+        self.scale_adj = scale_adj
 
     def get_input_features(self, mol):
         """get input features
@@ -35,4 +39,12 @@ class RelGCNPreprocessor(GGNNPreprocessor):
         Returns:
 
         """
-        return super(RelGCNPreprocessor, self).get_input_features(mol)
+        atom_array, adj_array = super(
+            RelGCNPreprocessor, self).get_input_features(mol)
+        if self.scale_adj:
+            # Same with `rescale_adj`, number of neighbors of each node over
+            # all the edge types
+            num_neighbors = adj_array.sum(axis=(0, 1))
+            num_neighbors[num_neighbors == 0] = 1
+            adj_array = (adj_array / num_neighbors).astype(adj_array.dtype)
+        return atom_array, adj_array
@@ -22,11 +22,15 @@ class RSGCNPreprocessor(MolPreprocessor):
             Setting negative value indicates do not pad returned array.
         add_Hs (bool): If True, implicit Hs are added.
         kekulize (bool): If True, Kekulizes the molecule.
+        sparse (bool): If True, normalized adjacency matrix is returned in
+            COO format, i.e. `edge_index` of shape (2, nnz) in int32 and
+            `edge_weight` of shape (nnz,) in float32, instead of the dense
+            matrix. Use it with `concat_mols_with_sparse_adj` converter.
 
     """
 
     def __init__(self, max_atoms=-1, out_size=-1, add_Hs=False,
-                 kekulize=False):
+                 kekulize=False, sparse=False):
         super(RSGCNPreprocessor, self).__init__(
             add_Hs=add_Hs, kekulize=kekulize)
         if max_atoms >= 0 and out_size >= 0 and max_atoms > out_size:
@@ -34,6 +38,7 @@ class RSGCNPreprocessor(MolPreprocessor):
                              'out_size {}'.format(max_atoms, out_size))
         self.max_atoms = max_atoms
         self.out_size = out_size
+        self.sparse = sparse
 
     def get_input_features(self, mol):
         """get input features
@@ -60,4 +65,9 @@ class RSGCNPreprocessor(MolPreprocessor):
         adj_array[:num_atoms, :num_atoms] *= numpy.broadcast_to(
             degree_sqrt_inv[None, :], (num_atoms, num_atoms))
 
+        if self.sparse:
+            row, col = numpy.nonzero(adj_array)
+            edge_index = numpy.array([row, col], dtype=numpy.int32)
+            edge_weight = adj_array[row, col].astype(numpy.float32)
+            return atom_array, edge_index, edge_weight
         return atom_array, adj_array
@@ -2,23 +2,29 @@ from logging import getLogger
 import traceback
 
 import numpy
+from rdkit import Chem
 from rdkit.Chem import AllChem
 from rdkit.Chem import rdmolops
+from rdkit.Geometry import Point3D
 
 from chainer_chemistry.dataset.preprocessors.common \
     import construct_atomic_number_array
 from chainer_chemistry.dataset.preprocessors.common import MolFeatureExtractionError  # NOQA
 from chainer_chemistry.dataset.preprocessors.common import type_check_num_atoms
+from chainer_chemistry.dataset.preprocessors.conformer_generator import _smiles_atom_output_order  # NOQA
 from chainer_chemistry.dataset.preprocessors.mol_preprocessor \
     import MolPreprocessor
 
 
-def construct_distance_matrix(mol, out_size=-1):
+def construct_distance_matrix(mol, out_size=-1, embed=True):
     """Construct distance matrix
 
     Args:
         mol (Chem.Mol):
         out_size (int):
+        embed (bool): If `True`, 3D coordinates are generated by
+            `AllChem.EmbedMolecule`. If `False`, the conformer which `mol`
+            already has, e.g. DFT-optimized geometry of the dataset, is used.
 
     Returns (numpy.ndarray): 2 dimensional array which represents distance
         between atoms
@@ -27,17 +33,14 @@ def construct_distance_matrix(mol, out_size=-1):
     if mol is None:
         raise MolFeatureExtractionError('mol is None')
     N = mol.GetNumAtoms()
+    size = _padded_size(N, out_size)
 
-    if out_size < 0:
-        size = N
-    elif out_size >= N:
-        size = out_size
+    if embed:
+        confid = AllChem.EmbedMolecule(mol)
+    elif mol.GetNumConformers() == 0:
+        raise MolFeatureExtractionError('mol does not have conformer')
     else:
-        raise MolFeatureExtractionError('out_size {} is smaller than number '
-                                        'of atoms in mol {}'
-                                        .format(out_size, N))
-
-    confid = AllChem.EmbedMolecule(mol)
+        confid = -1
     try:
         dist_matrix = rdmolops.Get3DDistanceMatrix(mol, confId=confid)
     except ValueError as e:
@@ -56,6 +59,78 @@ def construct_distance_matrix(mol, out_size=-1):
     return dists.astype(numpy.float32)
 
 
+def _padded_size(n_atoms, out_size):
+    if out_size < 0:
+        return n_atoms
+    elif out_size >= n_atoms:
+        return out_size
+    else:
+        raise MolFeatureExtractionError('out_size {} is smaller than number '
+                                        'of atoms in mol {}'
+                                        .format(out_size, n_atoms))
+
+
+def _pad(array, size, square=False):
+    """Pad the first axis, and also the second axis if `square`"""
+    if size == array.shape[0]:
+        return array.astype(numpy.float32)
+    if square:
+        shape = (size, size)
+    else:
+        shape = (size,) + array.shape[1:]
+    padded = numpy.zeros(shape, dtype=numpy.float32)
+    padded[tuple(slice(0, d) for d in array.shape)] = array
+    return padded
+
+
+def construct_coordinates(mol, out_size=-1, embed=True):
+    """Construct 3D coordinates of atoms
+
+    Args:
+        mol (Chem.Mol):
+        out_size (int):
+        embed (bool): If `True`, 3D coordinates are generated by
+            `AllChem.EmbedMolecule`. If `False`, the conformer which `mol`
+            already has is used.
+
+    Returns (numpy.ndarray): 2 dimensional array of shape (atom, 3), where
+        coordinates of padded atoms are zero.
+
+    """
+    if mol is None:
+        raise MolFeatureExtractionError('mol is None')
+    size = _padded_size(mol.GetNumAtoms(), out_size)
+    if embed:
+        confid = AllChem.EmbedMolecule(mol)
+        if confid < 0:
+            raise MolFeatureExtractionError('embedding failed')
+    elif mol.GetNumConformers() == 0:
+        raise MolFeatureExtractionError('mol does not have conformer')
+    else:
+        confid = -1
+    return _pad(mol.GetConformer(confid).GetPositions(), size)
+
+
+def distance_matrix_from_coordinates(coordinates, atom_mask=None):
+    """Compute distance matrix from coordinates
+
+    Args:
+        coordinates (numpy.ndarray): coordinates of shape (..., atom, 3).
+            It can be `cupy.ndarray`.
+        atom_mask (numpy.ndarray or None): boolean mask of shape
+            (..., atom), which is `False` for padded atoms. Distances from or
+            to the padded atoms are zero.
+
+    Returns (numpy.ndarray): distance matrix of shape (..., atom, atom).
+
+    """
+    diff = coordinates[..., :, None, :] - coordinates[..., None, :, :]
+    dists = (diff * diff).sum(axis=-1) ** 0.5
+    if atom_mask is not None:
+        dists *= atom_mask[..., :, None] & atom_mask[..., None, :]
+    return dists
+
+
 class SchNetPreprocessor(MolPreprocessor):
     """SchNet Preprocessor
 
@@ -71,11 +146,27 @@ class SchNetPreprocessor(MolPreprocessor):
             Setting negative value indicates do not pad returned array.
         add_Hs (bool): If True, implicit Hs are added.
         kekulize (bool): If True, Kekulizes the molecule.
+        use_geometry (bool): If True, distances are computed from the
+            conformer of the molecule given to the parser, e.g. the stored
+            geometry of QM9 (see `get_qm9`), instead of embedding the
+            molecule by RDKit. The conformer is kept through the
+            canonicalization. When `add_Hs` is True, coordinates of added
+            hydrogens are computed from the heavy atoms.
+        conformer_generator (ConformerGenerator or None): If specified,
+            molecules are embedded by it instead of `AllChem.EmbedMolecule`
+            in each call, i.e. in parallel before parsing, with timeout,
+            fixed seed and cache. It is not used when `use_geometry` is True.
+        return_coordinates (bool): If True, coordinates of shape (atom, 3)
+            are returned instead of the distance matrix of shape
+            (atom, atom), which reduces the size of the dataset. Use
+            `concat_mols_with_distance` as the converter to compute distance
+            matrices for each minibatch.
 
     """
 
     def __init__(self, max_atoms=-1, out_size=-1, add_Hs=False,
-                 kekulize=False):
+                 kekulize=False, use_geometry=False, conformer_generator=None,
+                 return_coordinates=False):
         super(SchNetPreprocessor, self).__init__(
             add_Hs=add_Hs, kekulize=kekulize)
         if max_atoms >= 0 and out_size >= 0 and max_atoms > out_size:
@@ -83,6 +174,61 @@ class SchNetPreprocessor(MolPreprocessor):
                              'out_size {}'.format(max_atoms, out_size))
         self.max_atoms = max_atoms
         self.out_size = out_size
+        self.use_geometry = use_geometry
+        self.conformer_generator = conformer_generator
+        self.return_coordinates = return_coordinates
+
+    def prefetch(self, molecules):
+        """Embed molecules in parallel by `conformer_generator`
+
+        Args:
+            molecules (list): list of SMILES or `Chem.Mol`.
+        """
+        if self.conformer_generator is None or self.use_geometry:
+            return
+        mols = []
+        for mol in molecules:
+            if not isinstance(mol, Chem.Mol):
+                mol = Chem.MolFromSmiles(mol)
+            if mol is None:
+                continue
+            try:
+                _, mol = self.prepare_smiles_and_mol(mol)
+            except Exception:
+                # The failure is handled when it is parsed.
+                continue
+            mols.append(mol)
+        self.conformer_generator.generate_batch(mols)
+
+    def prepare_smiles_and_mol(self, mol):
+        """Prepare `smiles` and `mol` used in following preprocessing.
+
+        When `use_geometry` is True, the conformer of `mol` is reordered
+        to the atoms of the canonicalized `mol`.
+
+        Args:
+            mol (mol): mol instance
+
+        Returns (tuple): (`smiles`, `mol`)
+        """
+        if not (self.use_geometry and mol.GetNumConformers() > 0):
+            return super(SchNetPreprocessor, self).prepare_smiles_and_mol(mol)
+        canonical_smiles = Chem.MolToSmiles(mol, isomericSmiles=False,
+                                            canonical=True)
+        positions = mol.GetConformer().GetPositions()
+        order = _smiles_atom_output_order(mol)
+        mol = Chem.MolFromSmiles(canonical_smiles)
+        conformer = Chem.Conformer(mol.GetNumAtoms())
+        # `Conformer.SetPositions` is not available in old RDKit.
+        for i, (x, y, z) in enumerate(positions[order]):
+            conformer.SetAtomPosition(i, Point3D(float(x), float(y), float(z)))
+        conformer.Set3D(True)
+        mol.AddConformer(conformer, assignId=True)
+        if self.add_Hs:
+            mol = Chem.AddHs(mol, addCoords=True)
+        if self.kekulize:
+            Chem.Kekulize(mol)
+        return canonical_smiles, mol
 
     def get_input_features(self, mol):
         """get input features
@@ -95,5 +241,19 @@ class SchNetPreprocessor(MolPreprocessor):
         """
         type_check_num_atoms(mol, self.max_atoms)
         atom_array = construct_atomic_number_array(mol, out_size=self.out_size)
-        dist_array = construct_distance_matrix(mol, out_size=self.out_size)
+        if self.conformer_generator is not None and not self.use_geometry:
+            coordinates = self.conformer_generator.generate(mol)
+            if coordinates is None:
+                raise MolFeatureExtractionError('embedding failed')
+            size = _padded_size(len(coordinates), self.out_size)
+            if self.return_coordinates:
+                return atom_array, _pad(coordinates, size)
+            dists = distance_matrix_from_coordinates(coordinates)
+            return atom_array, _pad(dists, size, square=True)
+        if self.return_coordinates:
+            coordinates = construct_coordinates(
+                mol, out_size=self.out_size, embed=not self.use_geometry)
+            return atom_array, coordinates
+        dist_array = construct_distance_matrix(
+            mol, out_size=self.out_size, embed=not self.use_geometry)
         return atom_array, dist_array
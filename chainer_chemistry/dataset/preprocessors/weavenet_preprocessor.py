@@ -171,14 +171,20 @@ def construct_atom_feature(mol, add_Hs,
         mol, num_max_atoms, atom_list=atom_list,
         include_unknown_atom=include_unknown_atom)
     # TODO(nakago): Chilarity
-    formal_charge_vec = construct_formal_charge_vec(mol)
-    partial_charge_vec = construct_partial_charge_vec(mol)
-    atom_ring_vec = construct_atom_ring_vec(mol)
-    hybridization_vec = construct_hybridization_vec(mol)
-    hydrogen_bonding = construct_hydrogen_bonding(mol)
-    aromaticity_vec = construct_aromaticity_vec(mol)
+    formal_charge_vec = construct_formal_charge_vec(
+        mol, num_max_atoms=num_max_atoms)
+    partial_charge_vec = construct_partial_charge_vec(
+        mol, num_max_atoms=num_max_atoms)
+    atom_ring_vec = construct_atom_ring_vec(mol, num_max_atoms=num_max_atoms)
+    hybridization_vec = construct_hybridization_vec(
+        mol, num_max_atoms=num_max_atoms)
+    hydrogen_bonding = construct_hydrogen_bonding(
+        mol, num_max_atoms=num_max_atoms)
+    aromaticity_vec = construct_aromaticity_vec(
+        mol, num_max_atoms=num_max_atoms)
     if add_Hs:
-        num_hydrogens_vec = construct_num_hydrogens_vec(mol)
+        num_hydrogens_vec = construct_num_hydrogens_vec(
+            mol, num_max_atoms=num_max_atoms)
         feature = numpy.hstack((atom_type_vec, formal_charge_vec,
                                 partial_charge_vec, atom_ring_vec,
                                 hybridization_vec, hydrogen_bonding,
@@ -266,14 +272,12 @@ class WeaveNetPreprocessor(MolPreprocessor):
 
     """WeaveNetPreprocessor
 
-     WeaveNet must have fixed-size atom list for now, zero_padding option
-     is always set to True.
-
     Args:
         max_atoms (int): Max number of atoms for each molecule, if the
             number of atoms is more than this value, this data is simply
             ignored.
-            Setting negative value indicates no limit for max atoms.
+            Setting negative value indicates no limit for max atoms, which
+            is allowed only when `zero_padding` is False.
         add_Hs (bool): If True, implicit Hs are added.
         use_fixed_atom_feature (bool):
             If True, atom feature is extracted used in original paper.
@@ -286,14 +290,19 @@ class WeaveNetPreprocessor(MolPreprocessor):
             If True, even the atom is not in `atom_list`, `atom_type` is set
             as "unknown" atom.
         kekulize (bool): If True, Kekulizes the molecule.
+        zero_padding (bool): If True, features are padded to `max_atoms`
+            atoms. If False, features have the number of atoms in the
+            molecule, and the pair feature has shape (atom, atom, feature),
+            so that `concat_mols` pads each minibatch to its largest
+            molecule.
     """
 
     def __init__(self, max_atoms=WEAVE_DEFAULT_NUM_MAX_ATOMS, add_Hs=True,
                  use_fixed_atom_feature=False, atom_list=None,
-                 include_unknown_atom=False, kekulize=False):
+                 include_unknown_atom=False, kekulize=False,
+                 zero_padding=True):
         super(WeaveNetPreprocessor, self).__init__(
             add_Hs=add_Hs, kekulize=kekulize)
-        zero_padding = True
         if zero_padding and max_atoms <= 0:
             raise ValueError('max_atoms must be set to positive value when '
                              'zero_padding is True')
@@ -315,14 +324,17 @@ class WeaveNetPreprocessor(MolPreprocessor):
 
         """
         type_check_num_atoms(mol, self.max_atoms)
+        n_atom = mol.GetNumAtoms()
+        size = self.max_atoms if self.zero_padding else n_atom
         if self.use_fixed_atom_feature:
             # original paper feature extraction
             atom_array = construct_atom_feature(mol, self.add_Hs,
-                                                self.max_atoms, self.atom_list,
+                                                size, self.atom_list,
                                                 self.include_unknown_atom)
         else:
             # embed id of atomic numbers
-            atom_array = construct_atomic_number_array(mol, self.max_atoms)
-        pair_feature = construct_pair_feature(mol,
-                                              num_max_atoms=self.max_atoms)
+            atom_array = construct_atomic_number_array(mol, size)
+        pair_feature = construct_pair_feature(mol, num_max_atoms=size)
+        if not self.zero_padding:
+            pair_feature = pair_feature.reshape(n_atom, n_atom, -1)
         return atom_array, pair_feature
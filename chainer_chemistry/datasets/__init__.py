@@ -1,17 +1,23 @@
-from chainer_chemistry.datasets import molnet  # NOQA
-from chainer_chemistry.datasets import qm9  # NOQA
-from chainer_chemistry.datasets import tox21  # NOQA
-from chainer_chemistry.datasets import zinc  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
 
 
-# import class and function
-from chainer_chemistry.datasets.numpy_tuple_dataset import NumpyTupleDataset  # NOQA
-from chainer_chemistry.datasets.qm9 import get_qm9  # NOQA
-from chainer_chemistry.datasets.qm9 import get_qm9_filepath  # NOQA
-from chainer_chemistry.datasets.qm9 import get_qm9_label_names  # NOQA
-from chainer_chemistry.datasets.tox21 import get_tox21  # NOQA
-from chainer_chemistry.datasets.tox21 import get_tox21_filepath  # NOQA
-from chainer_chemistry.datasets.tox21 import get_tox21_label_names  # NOQA
-from chainer_chemistry.datasets.zinc import get_zinc250k  # NOQA
-from chainer_chemistry.datasets.zinc import get_zinc250k_filepath  # NOQA
-from chainer_chemistry.datasets.zinc import get_zinc250k_label_names  # NOQA
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'molnet',
+        'qm9',
+        'tox21',
+        'zinc',
+    ],
+    attributes={
+        'NumpyTupleDataset': 'chainer_chemistry.datasets.numpy_tuple_dataset',
+        'get_qm9': 'chainer_chemistry.datasets.qm9',
+        'get_qm9_filepath': 'chainer_chemistry.datasets.qm9',
+        'get_qm9_label_names': 'chainer_chemistry.datasets.qm9',
+        'get_tox21': 'chainer_chemistry.datasets.tox21',
+        'get_tox21_filepath': 'chainer_chemistry.datasets.tox21',
+        'get_tox21_label_names': 'chainer_chemistry.datasets.tox21',
+        'get_zinc250k': 'chainer_chemistry.datasets.zinc',
+        'get_zinc250k_filepath': 'chainer_chemistry.datasets.zinc',
+        'get_zinc250k_label_names': 'chainer_chemistry.datasets.zinc',
+    })
@@ -1,11 +1,19 @@
-from chainer_chemistry.datasets.molnet import chembl_tasks  # NOQA
-from chainer_chemistry.datasets.molnet import molnet  # NOQA
-from chainer_chemistry.datasets.molnet import molnet_config  # NOQA
-from chainer_chemistry.datasets.molnet import pdbbind_time  # NOQA
-from chainer_chemistry.datasets.molnet import toxcast_tasks  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
 
-from chainer_chemistry.datasets.molnet.molnet import get_molnet_dataframe  # NOQA
-from chainer_chemistry.datasets.molnet.molnet import get_molnet_dataset  # NOQA
-from chainer_chemistry.datasets.molnet.molnet import get_molnet_filepath  # NOQA
-from chainer_chemistry.datasets.molnet.molnet import get_grid_featurized_pdbbind_dataset  # NOQA
-from chainer_chemistry.datasets.molnet.molnet_config import molnet_default_config  # NOQA
+
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'chembl_tasks',
+        'molnet',
+        'molnet_config',
+        'pdbbind_time',
+        'toxcast_tasks',
+    ],
+    attributes={
+        'get_molnet_dataframe': 'chainer_chemistry.datasets.molnet.molnet',
+        'get_molnet_dataset': 'chainer_chemistry.datasets.molnet.molnet',
+        'get_molnet_filepath': 'chainer_chemistry.datasets.molnet.molnet',
+        'get_grid_featurized_pdbbind_dataset': 'chainer_chemistry.datasets.molnet.molnet',  # NOQA
+        'molnet_default_config': 'chainer_chemistry.datasets.molnet.molnet_config',  # NOQA
+    })
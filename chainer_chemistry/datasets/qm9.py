@@ -1,20 +1,21 @@
-import glob
 from logging import getLogger
+import multiprocessing
 import os
-import shutil
 import tarfile
-import tempfile
 
 from chainer.dataset import download
 import numpy
 import pandas
+from rdkit import Chem
+from rdkit.Geometry import Point3D
 from tqdm import tqdm
 
-from chainer_chemistry.dataset.parsers.csv_file_parser import CSVFileParser
+from chainer_chemistry.dataset.parsers.data_frame_parser import DataFrameParser  # NOQA
 from chainer_chemistry.dataset.preprocessors.atomic_number_preprocessor import AtomicNumberPreprocessor  # NOQA
 
 download_url = 'https://ndownloader.figshare.com/files/3195389'
 file_name = 'qm9.csv'
+cache_file_name = 'qm9.npz'
 
 _root = 'pfnet/chainer/qm9'
 
@@ -22,6 +23,10 @@ _label_names = ['A', 'B', 'C', 'mu', 'alpha', 'homo', 'lumo', 'gap', 'r2',
                 'zpve', 'U0', 'U', 'H', 'G', 'Cv']
 _smiles_column_names = ['SMILES1', 'SMILES2']
 
+# Maximum length of bonds (angstrom) to regard the heavy atoms in xyz file
+# are in the same order with SMILES1.
+_max_bond_length = 2.0
+
 
 def get_qm9_label_names():
     """Returns label names of QM9 datasets."""
@@ -32,6 +37,12 @@ def get_qm9(preprocessor=None, labels=None, return_smiles=False,
             target_index=None):
     """Downloads, caches and preprocesses QM9 dataset.
 
+    If `preprocessor` has `use_geometry` attribute which is `True`, e.g.
+    `SchNetPreprocessor(use_geometry=True)`, molecules given to the
+    preprocessor have a conformer of the DFT-optimized geometry of QM9, so
+    that RDKit embedding is not necessary. Molecules whose heavy atoms
+    could not be mapped to the geometry are skipped.
+
     Args:
         preprocessor (BasePreprocessor): Preprocessor.
             This should be chosen based on the network to be trained.
@@ -57,9 +68,21 @@ def get_qm9(preprocessor=None, labels=None, return_smiles=False,
 
     if preprocessor is None:
         preprocessor = AtomicNumberPreprocessor()
-    parser = CSVFileParser(preprocessor, postprocess_label=postprocess_label,
-                           labels=labels, smiles_col='SMILES1')
-    result = parser.parse(get_qm9_filepath(), return_smiles=return_smiles,
+    use_geometry = getattr(preprocessor, 'use_geometry', False)
+    mol_col = None
+    df = _load_qm9_dataframe(geometry=use_geometry)
+    if use_geometry:
+        if target_index is not None:
+            df = df.iloc[target_index]
+            target_index = None
+        mol_col = 'mol'
+        df = df.assign(mol=[_mol_with_conformer(smiles, positions)
+                            for smiles, positions in zip(df['SMILES1'],
+                                                         df['positions'])])
+    parser = DataFrameParser(preprocessor, postprocess_label=postprocess_label,
+                             labels=labels, smiles_col='SMILES1',
+                             mol_col=mol_col)
+    result = parser.parse(df, return_smiles=return_smiles,
                           target_index=target_index)
 
     if return_smiles:
@@ -104,29 +127,267 @@ def _get_qm9_filepath():
     return cache_path
 
 
-def download_and_extract_qm9(save_filepath):
+def _get_qm9_cache_filepath():
+    """Construct a filepath of columnar cache of QM9 dataset in npz
+
+    Returns (str): filepath for qm9 cache
+
+    """
+    cache_root = download.get_dataset_directory(_root)
+    return os.path.join(cache_root, cache_file_name)
+
+
+def _save_columns(filepath, df, positions=None, atom_orders=None):
+    # Each column is saved as a separate array, strings as fixed-length
+    # unicode, so that it is loaded without pickle nor parsing text.
+    # Ragged geometry is saved as concatenated arrays and number of atoms.
+    columns = {}
+    for name in _smiles_column_names:
+        columns[name] = numpy.asarray(df[name].values, dtype=numpy.str_)
+    for name in _label_names:
+        columns[name] = numpy.asarray(df[name].values, dtype=numpy.float64)
+    if positions is not None:
+        columns['n_atoms'] = numpy.array([len(p) for p in positions],
+                                         dtype=numpy.int32)
+        columns['positions'] = numpy.concatenate(positions).astype(
+            numpy.float32)
+        columns['atom_order'] = numpy.concatenate(atom_orders).astype(
+            numpy.int32)
+    numpy.savez(filepath, **columns)
+
+
+def _load_columns(filepath, geometry=False):
+    """Load the columnar cache
+
+    Args:
+        filepath (str): path to the cache.
+        geometry (bool): If `True`, 'positions' and 'atom_order' columns are
+            added, each row of which is an array of the heavy atoms in the
+            order of SMILES1. `None` is returned if the cache does not have
+            geometry.
+
+    Returns (pandas.DataFrame): QM9 dataset.
+
+    """
+    names = _smiles_column_names + _label_names
+    with numpy.load(filepath) as f:
+        if geometry and 'positions' not in f.files:
+            return None
+        columns = {name: f[name] for name in names}
+        if geometry:
+            sections = numpy.cumsum(f['n_atoms'])[:-1]
+            columns['positions'] = numpy.split(f['positions'], sections)
+            columns['atom_order'] = numpy.split(f['atom_order'], sections)
+            names = names + ['positions', 'atom_order']
+    return pandas.DataFrame.from_dict(columns)[names]
+
+
+def _load_qm9_dataframe(geometry=False):
+    """Loads QM9 dataset as `pandas.DataFrame`
+
+    The columnar cache is loaded if it exists. Otherwise, the dataset is
+    downloaded (which also writes the cache), or the cache is built from the
+    csv which was saved by the older version. If `geometry` is `True` and
+    the cache does not have geometry, it is extracted again.
+
+    Args:
+        geometry (bool): If `True`, geometry columns are also loaded.
+
+    Returns (pandas.DataFrame): QM9 dataset.
+
+    """
+    cache_path = _get_qm9_cache_filepath()
+    if not os.path.exists(cache_path):
+        # The cache is also written if the dataset is downloaded here.
+        filepath = get_qm9_filepath()
+        if not os.path.exists(cache_path):
+            if geometry:
+                download_and_extract_qm9(filepath, cache_path)
+            else:
+                _save_columns(cache_path, pandas.read_csv(filepath))
+    df = _load_columns(cache_path, geometry=geometry)
+    if df is None:
+        download_and_extract_qm9(get_qm9_filepath(download_if_not_exist=False),
+                                 cache_path)
+        df = _load_columns(cache_path, geometry=geometry)
+    return df
+
+
+def _mol_with_conformer(smiles, positions):
+    """Construct `Chem.Mol` which has the stored geometry as conformer"""
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None or numpy.isnan(positions).any():
+        return mol
+    conformer = Chem.Conformer(mol.GetNumAtoms())
+    # `Conformer.SetPositions` is not available in old RDKit.
+    for i, (x, y, z) in enumerate(positions):
+        conformer.SetAtomPosition(i, Point3D(float(x), float(y), float(z)))
+    conformer.Set3D(True)
+    mol.AddConformer(conformer, assignId=True)
+    return mol
+
+
+def _heavy_atom_order(smiles, symbols, coordinates):
+    """Map atoms of SMILES to the heavy atoms in xyz file
+
+    In most of QM9, heavy atoms in xyz file are in the same order with the
+    atoms of SMILES1. This is checked by elements and bond lengths, and
+    otherwise the heavy atoms are matched by the connectivity determined
+    from the geometry, which requires RDKit 2022.09 or later.
+
+    Args:
+        smiles (str): SMILES1 of the molecule.
+        symbols (list): element symbols of the atoms in xyz file.
+        coordinates (numpy.ndarray): coordinates of the atoms in xyz file.
+
+    Returns (list or None): xyz indices of the atoms of SMILES, or `None`
+        if they could not be mapped, or the connectivity could not be
+        determined by the installed RDKit.
+
+    """
+    mol = Chem.MolFromSmiles(smiles)
+    heavy = [i for i, symbol in enumerate(symbols) if symbol != 'H']
+    if mol is None or mol.GetNumAtoms() != len(heavy):
+        return None
+    if all(atom.GetSymbol() == symbols[i]
+           for atom, i in zip(mol.GetAtoms(), heavy)):
+        lengths = [numpy.linalg.norm(
+            coordinates[heavy[bond.GetBeginAtomIdx()]] -
+            coordinates[heavy[bond.GetEndAtomIdx()]])
+            for bond in mol.GetBonds()]
+        if all(length < _max_bond_length for length in lengths):
+            return heavy
+
+    try:
+        # Available from RDKit 2022.09
+        from rdkit.Chem import rdDetermineBonds
+    except ImportError:
+        return None
+    block = '{}\n\n'.format(len(heavy)) + '\n'.join(
+        '{} {} {} {}'.format(symbols[i], *coordinates[i]) for i in heavy)
+    xyz_mol = Chem.MolFromXYZBlock(block)
+    if xyz_mol is None:
+        return None
+    try:
+        rdDetermineBonds.DetermineConnectivity(xyz_mol)
+    except ValueError:
+        return None
+    params = Chem.AdjustQueryParameters.NoAdjustments()
+    params.makeBondsGeneric = True
+    query = Chem.AdjustQueryProperties(mol, params)
+    match = xyz_mol.GetSubstructMatch(query)
+    if len(match) != len(heavy):
+        return None
+    return [heavy[i] for i in match]
+
+
+def _parse_xyz(content):
+    """Parse SMILES, properties and geometry from QM9 xyz file
+
+    Args:
+        content (bytes): content of xyz file.
+
+    Returns (tuple): list of SMILES (GDB-17 and relaxed geometry) and
+        properties, coordinates of the heavy atoms in the order of SMILES1,
+        and their indices in xyz file. Coordinates are NaN if the atoms
+        could not be mapped.
+
+    """
+    data = [line.strip() for line in content.decode('utf-8').splitlines()]
+    num_atom = int(data[0])
+    properties = list(map(float, data[1].split('\t')[1:]))
+    # Some values are written like `1.2*^-6` in QM9
+    atoms = [line.replace('*^', 'e').split() for line in data[2:2 + num_atom]]
+    symbols = [atom[0] for atom in atoms]
+    coordinates = numpy.array([list(map(float, atom[1:4])) for atom in atoms],
+                              dtype=numpy.float32)
+    smiles = data[3 + num_atom].split('\t')
+
+    order = _heavy_atom_order(smiles[0], symbols, coordinates)
+    if order is None:
+        n_heavy = sum(symbol != 'H' for symbol in symbols)
+        positions = numpy.full((n_heavy, 3), numpy.nan, dtype=numpy.float32)
+        order = [-1] * n_heavy
+    else:
+        positions = coordinates[order]
+    return smiles + properties, positions, order
+
+
+def _parse_xyz_chunk(chunk):
+    return [(name,) + _parse_xyz(content) for name, content in chunk]
+
+
+def _iter_xyz_chunks(tar_filepath, chunk_size):
+    """Read xyz files from the tar stream, without extracting to the disk
+
+    Args:
+        tar_filepath (str): path to the tar archive of xyz files.
+        chunk_size (int): number of files in each chunk.
+
+    Yields (list): list of tuples of member name and its content.
+
+    """
+    chunk = []
+    with tarfile.open(tar_filepath, 'r|*') as tf:
+        for member in tf:
+            if not (member.isfile() and member.name.endswith('.xyz')):
+                continue
+            chunk.append((member.name, tf.extractfile(member).read()))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def download_and_extract_qm9(save_filepath, cache_filepath=None, n_jobs=None,
+                             chunk_size=1000):
+    """Download QM9 and save it as csv and columnar cache
+
+    The xyz files are read from the tar stream and parsed in parallel chunks,
+    so that ~134k files are not extracted to a temporary directory. The cache
+    also holds the coordinates of the heavy atoms of each molecule, in the
+    order of the atoms of SMILES1.
+
+    Args:
+        save_filepath (str): path to save the csv.
+        cache_filepath (str or None): path to save the columnar cache which
+            is loaded by `get_qm9`. If `None`, default cache path is used.
+        n_jobs (int or None): number of processes to parse xyz files. If
+            `None`, the number of CPUs is used.
+        chunk_size (int): number of xyz files parsed by each task.
+
+    Returns (bool): `True` if succeeded.
+
+    """
     logger = getLogger(__name__)
     logger.warning('Extracting QM9 dataset, it takes time...')
     download_file_path = download.cached_download(download_url)
-    tf = tarfile.open(download_file_path, 'r')
-    temp_dir = tempfile.mkdtemp()
-    tf.extractall(temp_dir)
-    file_re = os.path.join(temp_dir, '*.xyz')
-    file_pathes = glob.glob(file_re)
-    # Make sure the order is sorted
-    file_pathes.sort()
-    ls = []
-    for path in tqdm(file_pathes):
-        with open(path, 'r') as f:
-            data = [line.strip() for line in f]
-
-        num_atom = int(data[0])
-        properties = list(map(float, data[1].split('\t')[1:]))
-        smiles = data[3 + num_atom].split('\t')
-        new_ls = smiles + properties
-        ls.append(new_ls)
-
-    df = pandas.DataFrame(ls, columns=_smiles_column_names + _label_names)
+    if cache_filepath is None:
+        cache_filepath = _get_qm9_cache_filepath()
+    if n_jobs is None:
+        n_jobs = multiprocessing.cpu_count()
+
+    chunks = _iter_xyz_chunks(download_file_path, chunk_size)
+    records = []
+    if n_jobs == 1:
+        for chunk in tqdm(chunks):
+            records.extend(_parse_xyz_chunk(chunk))
+    else:
+        pool = multiprocessing.Pool(n_jobs)
+        try:
+            for parsed in tqdm(pool.imap(_parse_xyz_chunk, chunks)):
+                records.extend(parsed)
+        finally:
+            pool.close()
+            pool.join()
+    # Make sure the order is sorted by file name
+    records.sort(key=lambda record: record[0])
+
+    df = pandas.DataFrame([record[1] for record in records],
+                          columns=_smiles_column_names + _label_names)
+    _save_columns(cache_filepath, df,
+                  positions=[record[2] for record in records],
+                  atom_orders=[record[3] for record in records])
     df.to_csv(save_filepath)
-    shutil.rmtree(temp_dir)
     return True
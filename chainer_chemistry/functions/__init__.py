@@ -7,5 +7,10 @@ from chainer_chemistry.functions.loss.mean_squared_error import mean_squared_err
 from chainer_chemistry.functions.loss.mean_squared_error import MeanSquaredError  # NOQA
 
 from chainer_chemistry.functions.math.matmul import matmul  # NOQA
+from chainer_chemistry.functions.math.relational_matmul import fold_adj  # NOQA
+from chainer_chemistry.functions.math.relational_matmul import relational_matmul  # NOQA
+from chainer_chemistry.functions.math.relational_matmul import RelationalMatMul  # NOQA
+from chainer_chemistry.functions.math.sparse_matmul import sparse_matmul  # NOQA
+from chainer_chemistry.functions.math.sparse_matmul import SparseMatMul  # NOQA
 
 from chainer_chemistry.functions.readout.general_readout import GeneralReadout  # NOQA
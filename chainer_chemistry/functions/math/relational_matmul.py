@@ -0,0 +1,93 @@
+import chainer
+from chainer.backends import cuda
+from chainer import function_node
+from chainer.utils import type_check
+
+
+def fold_adj(adj):
+    """Fold edge type axis of adjacency matrix into its columns
+
+    Args:
+        adj (:class:`chainer.Variable`, or :class:`numpy.ndarray` \
+        or :class:`cupy.ndarray`): adjacency matrix of shape
+            (minibatch, edge_type, node, node).
+
+    Returns:
+        adjacency matrix of shape (minibatch, node, edge_type * node), whose
+        `[b, i, e * node + j]` element is `adj[b, e, i, j]`. It is an array
+        if `adj` is an array, otherwise a :class:`chainer.Variable`.
+    """
+    mb, edge_type, node, _ = adj.shape
+    shape = (mb, node, edge_type * node)
+    if isinstance(adj, chainer.Variable):
+        return chainer.functions.reshape(
+            chainer.functions.transpose(adj, (0, 2, 1, 3)), shape)
+    xp = cuda.get_array_module(adj)
+    return xp.ascontiguousarray(adj.transpose(0, 2, 1, 3)).reshape(shape)
+
+
+class RelationalMatMul(function_node.FunctionNode):
+
+    """Sum of matrix products over edge types."""
+
+    def check_type_forward(self, in_types):
+        type_check.expect(in_types.size() == 2)
+        adj_type, m_type = in_types
+        type_check.expect(
+            adj_type.dtype.kind == 'f',
+            m_type.dtype == adj_type.dtype,
+            adj_type.ndim == 3,
+            m_type.ndim == 3,
+            adj_type.shape[0] == m_type.shape[0],
+            adj_type.shape[2] == m_type.shape[1],
+        )
+
+    def forward(self, inputs):
+        self.retain_inputs((0, 1))
+        adj, m = inputs
+        xp = cuda.get_array_module(adj)
+        return xp.matmul(adj, m),
+
+    def backward(self, indexes, grad_outputs):
+        adj, m = self.get_retained_inputs()
+        gy, = grad_outputs
+        ret = []
+        if 0 in indexes:
+            ret.append(chainer.functions.matmul(gy, m, transb=True))
+        if 1 in indexes:
+            ret.append(chainer.functions.matmul(adj, gy, transa=True))
+        return ret
+
+
+def relational_matmul(adj, m):
+    """Sums matrix products of adjacency matrices and messages of edge types
+
+    It computes ``sum_e matmul(adj[:, e], m[:, e])`` as one batched matrix
+    product, by folding the edge type axis into the contracted axis, i.e.
+    the adjacency matrix is laid out as (minibatch, node, edge_type * node)
+    and the messages as (minibatch, edge_type * node, ch).
+
+    The folded adjacency matrix, given by :func:`fold_adj`, can also be
+    passed to avoid folding it in each call, e.g. when it is shared by
+    several layers.
+
+    Args:
+        adj (:class:`~chainer.Variable` or :class:`numpy.ndarray` or \
+        :class:`cupy.ndarray`): adjacency matrix of shape
+            (minibatch, edge_type, node, node), or folded one of shape
+            (minibatch, node, edge_type * node).
+        m (:class:`~chainer.Variable` or :class:`numpy.ndarray` or \
+        :class:`cupy.ndarray`): messages of shape
+            (minibatch, edge_type, node, ch).
+
+    Returns:
+        ~chainer.Variable: aggregated messages of shape (minibatch, node, ch).
+
+    """
+    if adj.ndim == 4:
+        adj = fold_adj(adj)
+    mb, edge_type, node, ch = m.shape
+    m = chainer.functions.reshape(m, (mb, edge_type * node, ch))
+    if not isinstance(adj, chainer.Variable) and adj.dtype != m.dtype:
+        adj = adj.astype(m.dtype)
+    return RelationalMatMul().apply((adj, m))[0]
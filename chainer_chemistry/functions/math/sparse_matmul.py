@@ -0,0 +1,60 @@
+import numpy
+
+import chainer
+from chainer import function_node
+from chainer.utils import type_check
+
+
+class SparseMatMul(function_node.FunctionNode):
+
+    """Matrix product of constant scipy sparse matrix and dense matrix."""
+
+    def __init__(self, a):
+        self.a = a
+
+    def check_type_forward(self, in_types):
+        type_check.expect(in_types.size() == 1)
+        b_type, = in_types
+        type_check.expect(
+            b_type.dtype.kind == 'f',
+            b_type.ndim == 2,
+            b_type.shape[0] == self.a.shape[1],
+        )
+
+    def forward_cpu(self, inputs):
+        b, = inputs
+        return self.a.dot(b).astype(b.dtype, copy=False),
+
+    def backward(self, indexes, grad_outputs):
+        gy, = grad_outputs
+        return SparseMatMul(self.a.T.tocsr()).apply((gy,))
+
+
+def sparse_matmul(a, b):
+    """Computes the matrix product of a sparse matrix and a dense matrix.
+
+    ``a`` is treated as a constant, i.e. the gradient is propagated only to
+    ``b``. It runs on CPU.
+
+    Args:
+        a (scipy.sparse.spmatrix): sparse matrix of shape (n, m).
+        b (:class:`~chainer.Variable` or :class:`numpy.ndarray`): dense
+            matrix of shape (m, k).
+
+    Returns:
+        ~chainer.Variable: The result of shape (n, k).
+
+    .. admonition:: Example
+
+        >>> a = scipy.sparse.csr_matrix(np.array([[1, 0], [0, 2]], 'f'))
+        >>> b = np.array([[4, 1], [2, 2]], 'f')
+        >>> sparse_matmul(a, b).data
+        array([[ 4.,  1.],
+               [ 4.,  4.]], dtype=float32)
+
+    """
+    b_array = b.array if isinstance(b, chainer.Variable) else b
+    if not isinstance(b_array, numpy.ndarray):
+        raise TypeError('sparse_matmul supports only numpy.ndarray, actual {}'
+                        .format(type(b_array)))
+    return SparseMatMul(a.tocsr()).apply((b,))[0]
@@ -0,0 +1,6 @@
+from chainer_chemistry.inference import numpy_model  # NOQA
+
+# `numpy_exporter` is not imported here because it depends on chainer, while
+# `numpy_model` is used in serving process without chainer.
+from chainer_chemistry.inference.numpy_model import load_numpy_model  # NOQA
+from chainer_chemistry.inference.numpy_model import NumpyInferenceModel  # NOQA
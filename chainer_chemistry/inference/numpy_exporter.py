@@ -0,0 +1,244 @@
+"""
+Export trained chainer models into `NumpyInferenceModel`
+
+The weights are converted for inference when exporting:
+
+- `NFPUpdate`: per-degree `GraphLinear` weights are stacked into one
+  (degree, in, out) tensor and their biases are summed up.
+- `GGNNUpdate`: input-side and hidden-side weights of GRU gates are
+  concatenated so that each side is computed by one matmul.
+- `RSGCN`: `EmbedAtomID` and the first `RSGCNUpdate` are fused into one
+  lookup table, and `GraphBatchNormalization` is folded into the preceding
+  linear weight.
+- `RelGCNUpdate`: self connection and edge-type weights are concatenated.
+"""
+import chainer
+from chainer import cuda
+from chainer import functions
+import numpy
+
+from chainer_chemistry.functions import GeneralReadout
+from chainer_chemistry.inference.numpy_model import _FORMAT_VERSION
+from chainer_chemistry.inference.numpy_model import NumpyInferenceModel
+from chainer_chemistry.models.ggnn import GGNN
+from chainer_chemistry.models.mlp import MLP
+from chainer_chemistry.models.nfp import NFP
+from chainer_chemistry.models.prediction.base import BaseForwardModel
+from chainer_chemistry.models.relgcn import RelGCN
+from chainer_chemistry.models.rsgcn import RSGCN
+
+
+def _to_numpy(x):
+    if isinstance(x, chainer.Variable):
+        x = x.array
+    if x is None:
+        raise ValueError('Parameter is not initialized yet. Forward the model '
+                         'once before export.')
+    return numpy.asarray(cuda.to_cpu(x))
+
+
+def _activation_name(fn):
+    names = {
+        functions.identity: 'identity',
+        functions.relu: 'relu',
+        functions.sigmoid: 'sigmoid',
+        functions.tanh: 'tanh',
+    }
+    for f, name in names.items():
+        if fn is f:
+            return name
+    raise ValueError('Unsupported activation {} for export'.format(fn))
+
+
+def _linear_params(linear):
+    """Returns (W, b) where W is transposed to (in, out)"""
+    W = _to_numpy(linear.W).T
+    if linear.b is None:
+        b = numpy.zeros((W.shape[1],), dtype=W.dtype)
+    else:
+        b = _to_numpy(linear.b)
+    return numpy.ascontiguousarray(W), b
+
+
+def _export_nfp(model, params):
+    if model.concat_hidden:
+        raise NotImplementedError('NFP with concat_hidden=True is not '
+                                  'supported for export')
+    params['embed/W'] = _to_numpy(model.embed.W)
+    for i, (update, readout) in enumerate(zip(model.layers,
+                                              model.read_out_layers)):
+        Ws, bs = zip(*[_linear_params(l) for l in update.graph_linears])
+        params['layers/{}/W'.format(i)] = numpy.stack(Ws)
+        # Bias of every degree is added regardless of the atom degree.
+        params['layers/{}/b'.format(i)] = numpy.sum(bs, axis=0)
+        W, b = _linear_params(readout.output_weight)
+        params['read_out_layers/{}/W'.format(i)] = W
+        params['read_out_layers/{}/b'.format(i)] = b
+    return {'n_layers': model.n_layers,
+            'num_degree_type': model.num_degree_type}
+
+
+def _export_gru(gru, params, prefix):
+    W_z, b_z = _linear_params(gru.W_z)
+    W_h, b_h = _linear_params(gru.W)
+    W_r, b_r = _linear_params(gru.W_r)
+    U_r, c_r = _linear_params(gru.U_r)
+    U_z, c_z = _linear_params(gru.U_z)
+    U, c = _linear_params(gru.U)
+    params[prefix + 'W_cat'] = numpy.concatenate((W_z, W_h, W_r), axis=1)
+    params[prefix + 'b_cat'] = numpy.concatenate((b_z, b_h, b_r))
+    params[prefix + 'U_rz'] = numpy.concatenate((U_r, U_z), axis=1)
+    params[prefix + 'b_rz'] = numpy.concatenate((c_r, c_z))
+    params[prefix + 'U'] = U
+    params[prefix + 'b_U'] = c
+
+
+def _export_ggnn_readout(readout, params, prefix):
+    for name in ['i_layers', 'j_layers']:
+        for i, l in enumerate(getattr(readout, name)):
+            W, b = _linear_params(l)
+            params['{}{}/{}/W'.format(prefix, name, i)] = W
+            params['{}{}/{}/b'.format(prefix, name, i)] = b
+
+
+def _export_ggnn(model, params):
+    update = model.update_layer
+    params['embed/W'] = _to_numpy(model.embed.W)
+    for i, l in enumerate(update.graph_linears):
+        W, b = _linear_params(l)
+        params['update_layer/graph_linears/{}/W'.format(i)] = W
+        params['update_layer/graph_linears/{}/b'.format(i)] = b
+    _export_gru(update.update_layer, params, 'update_layer/update_layer/')
+    _export_ggnn_readout(model.readout_layer, params, 'readout_layer/')
+    return {'n_layers': model.n_layers,
+            'num_edge_type': update.num_edge_type,
+            'weight_tying': model.weight_tying,
+            'concat_hidden': model.concat_hidden,
+            'readout_activation': _activation_name(
+                model.readout_layer.activation)}
+
+
+def _export_rsgcn(model, params):
+    if not isinstance(model.readout, GeneralReadout) or \
+            model.readout.activation is not None:
+        raise NotImplementedError('RSGCN with custom readout is not '
+                                  'supported for export')
+    for i, (gconv, bnorm) in enumerate(zip(model.gconvs, model.bnorms)):
+        W, b = _linear_params(gconv.graph_linear)
+        if bnorm is not None:
+            # Fold batch normalization in test mode into the linear weight.
+            scale = _to_numpy(bnorm.gamma) / numpy.sqrt(
+                _to_numpy(bnorm.avg_var) + bnorm.eps)
+            shift = _to_numpy(bnorm.beta) - _to_numpy(bnorm.avg_mean) * scale
+            W = W * scale
+            b = b * scale + shift
+        params['gconvs/{}/W'.format(i)] = W.astype(numpy.float32)
+        params['gconvs/{}/b'.format(i)] = b.astype(numpy.float32)
+    params['embed_fused/W'] = numpy.dot(_to_numpy(model.embed.W),
+                                        params['gconvs/0/W'])
+    return {'n_layers': model.n_layers,
+            'readout_mode': model.readout.mode}
+
+
+def _export_relgcn(model, params):
+    if model.input_type == 'int':
+        params['embed/W'] = _to_numpy(model.embed.W)
+    else:
+        W, b = _linear_params(model.embed)
+        params['embed/W'] = W
+        params['embed/b'] = b
+    for i, conv in enumerate(model.rgcn_convs):
+        W_s, b_s = _linear_params(conv.graph_linear_self)
+        W_e, b_e = _linear_params(conv.graph_linear_edge)
+        params['rgcn_convs/{}/W'.format(i)] = numpy.concatenate(
+            (W_s, W_e), axis=1)
+        params['rgcn_convs/{}/b'.format(i)] = numpy.concatenate((b_s, b_e))
+    _export_ggnn_readout(model.rgcn_readout, params, 'rgcn_readout/')
+    return {'n_layers': len(model.rgcn_convs),
+            'num_edge_type': model.rgcn_convs[0].num_edge_type,
+            'input_type': model.input_type,
+            'scale_adj': model.scale_adj}
+
+
+def _export_mlp(model, params):
+    for i, l in enumerate(model.layers):
+        W, b = _linear_params(l)
+        params['layers/{}/W'.format(i)] = W
+        params['layers/{}/b'.format(i)] = b
+    W, b = _linear_params(model.l_out)
+    params['l_out/W'] = W
+    params['l_out/b'] = b
+    return {'n_layers': len(model.layers) + 1,
+            'activation': _activation_name(model.activation)}
+
+
+_graph_conv_exporters = [
+    (NFP, 'nfp', _export_nfp),
+    (GGNN, 'ggnn', _export_ggnn),
+    (RSGCN, 'rsgcn', _export_rsgcn),
+    (RelGCN, 'relgcn', _export_relgcn),
+]
+
+
+def _export_graph_conv(model, params):
+    for cls, name, fn in _graph_conv_exporters:
+        if isinstance(model, cls):
+            sub_params = {}
+            config = fn(model, sub_params)
+            for k, v in sub_params.items():
+                params['graph_conv/' + k] = v
+            return {'type': name, 'config': config}
+    raise NotImplementedError('Export of {} is not supported'
+                              .format(type(model).__name__))
+
+
+def export_numpy_model(model):
+    """Compile a trained chainer model into `NumpyInferenceModel`
+
+    Supported `model` is one of `NFP`, `GGNN`, `RSGCN`, `RelGCN` and `MLP`,
+    or a "graph conv predictor" chain which has `graph_conv` attribute of
+    these graph convolution models and optional `mlp` attribute of `MLP`.
+    `Classifier` and `Regressor` are also accepted, in which case their
+    `predictor` is exported.
+
+    .. admonition:: Example
+
+       >>> from chainer_chemistry.inference.numpy_exporter import export_numpy_model  # NOQA
+       >>> numpy_model = export_numpy_model(regressor)
+       >>> numpy_model.save('model.npz')
+       >>> # In serving process, chainer is not necessary.
+       >>> from chainer_chemistry.inference import load_numpy_model
+       >>> numpy_model = load_numpy_model('model.npz')
+       >>> y = numpy_model(atom_array, adj)
+
+    Args:
+        model (chainer.Chain): trained model to export.
+
+    Returns (NumpyInferenceModel): exported model
+    """
+    if isinstance(model, BaseForwardModel):
+        model = model.predictor
+    params = {}
+    graph_conv = None
+    mlp = None
+    if isinstance(model, MLP):
+        mlp_link = model
+    else:
+        graph_conv_link = getattr(model, 'graph_conv', model)
+        mlp_link = getattr(model, 'mlp', None)
+        graph_conv = _export_graph_conv(graph_conv_link, params)
+    if mlp_link is not None:
+        if not isinstance(mlp_link, MLP):
+            raise NotImplementedError('Export of {} is not supported'
+                                      .format(type(mlp_link).__name__))
+        sub_params = {}
+        mlp = {'config': _export_mlp(mlp_link, sub_params)}
+        for k, v in sub_params.items():
+            params['mlp/' + k] = v
+    params = {k: numpy.ascontiguousarray(v, dtype=numpy.float32)
+              for k, v in params.items()}
+    spec = {'version': _FORMAT_VERSION,
+            'dtype': 'float32',
+            'graph_conv': graph_conv,
+            'mlp': mlp}
+    return NumpyInferenceModel(spec, params)
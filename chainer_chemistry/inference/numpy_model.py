@@ -0,0 +1,305 @@
+"""
+NumPy-only inference runtime for exported graph convolution models
+
+This module depends only on `numpy` and `json`. A model exported by
+`chainer_chemistry.inference.numpy_exporter.export_numpy_model` can be loaded
+and forwarded without building chainer `Variable` / `FunctionNode` graph.
+"""
+import json
+
+import numpy
+
+_FORMAT_VERSION = 1
+_SPEC_KEY = '__spec__'
+
+
+# --- Elementwise functions ---
+def _identity(x):
+    return x
+
+
+def _relu(x):
+    return numpy.maximum(x, 0, dtype=x.dtype)
+
+
+def _sigmoid(x):
+    # Same formulation with `chainer.functions.sigmoid`
+    return numpy.tanh(x * 0.5) * 0.5 + 0.5
+
+
+def _softmax(x, axis):
+    y = x - x.max(axis=axis, keepdims=True)
+    numpy.exp(y, out=y)
+    y /= y.sum(axis=axis, keepdims=True)
+    return y
+
+
+_activations = {
+    'identity': _identity,
+    'relu': _relu,
+    'sigmoid': _sigmoid,
+    'tanh': numpy.tanh,
+}
+
+
+def _linear(x, W, b=None):
+    """Affine transformation along the last axis. `W` is (in, out)."""
+    y = numpy.matmul(x, W)
+    if b is not None:
+        y += b
+    return y
+
+
+def _embed(W, x):
+    if x.dtype.kind in 'iu':
+        return W[x]
+    return x
+
+
+def _general_readout(h, mode, axis=1):
+    if mode == 'sum':
+        return h.sum(axis=axis)
+    elif mode == 'max':
+        return h.max(axis=axis)
+    elif mode == 'summax':
+        return numpy.concatenate((h.sum(axis=axis), h.max(axis=axis)),
+                                 axis=axis)
+    raise ValueError('mode {} is not supported'.format(mode))
+
+
+# --- Graph convolution forward ---
+def _nfp_forward(p, cfg, atom_array, adj):
+    h = _embed(p['embed/W'], atom_array)
+    num_degree_type = cfg['num_degree_type']
+
+    # Degree of each atom, `num_degree_type` indicates unmatched degree whose
+    # stacked weight is zero.
+    degree = adj.sum(axis=1)
+    deg_index = numpy.rint(degree).astype(numpy.int32) - 1
+    invalid = ((degree != numpy.rint(degree)) | (deg_index < 0) |
+               (deg_index >= num_degree_type))
+    deg_index[invalid] = num_degree_type
+    degrees = [d for d in numpy.unique(deg_index) if d < num_degree_type]
+    masks = [deg_index == d for d in degrees]
+
+    g = 0
+    for i in range(cfg['n_layers']):
+        fv = numpy.matmul(adj, h)
+        W = p['layers/{}/W'.format(i)]
+        out = numpy.empty(fv.shape[:2] + (W.shape[2],), dtype=fv.dtype)
+        out[...] = p['layers/{}/b'.format(i)]
+        for d, mask in zip(degrees, masks):
+            out[mask] += numpy.matmul(fv[mask], W[d])
+        h = _sigmoid(out)
+        i_ = _linear(h, p['read_out_layers/{}/W'.format(i)],
+                     p['read_out_layers/{}/b'.format(i)])
+        g = g + _softmax(i_, axis=2).sum(axis=1)
+    return g
+
+
+def _gru_forward(p, prefix, x, state):
+    # W_cat: (in, 3 * out) ordered as [z, h_bar, r]
+    out_size = p[prefix + 'U'].shape[0]
+    wx = _linear(x, p[prefix + 'W_cat'], p[prefix + 'b_cat'])
+    wx_z = wx[:, :out_size]
+    wx_h = wx[:, out_size:2 * out_size]
+    if state is None:
+        return _sigmoid(wx_z) * numpy.tanh(wx_h)
+    wx_r = wx[:, 2 * out_size:]
+    uh = _linear(state, p[prefix + 'U_rz'], p[prefix + 'b_rz'])
+    r = _sigmoid(wx_r + uh[:, :out_size])
+    z = _sigmoid(wx_z + uh[:, out_size:])
+    h_bar = numpy.tanh(wx_h + _linear(r * state, p[prefix + 'U'],
+                                      p[prefix + 'b_U']))
+    return z * h_bar + (1 - z) * state
+
+
+def _ggnn_readout(p, prefix, activation, h, h0, index):
+    h1 = numpy.concatenate((h, h0), axis=2) if h0 is not None else h
+    g1 = _sigmoid(_linear(h1, p[prefix + 'i_layers/{}/W'.format(index)],
+                          p[prefix + 'i_layers/{}/b'.format(index)]))
+    g2 = activation(_linear(h1, p[prefix + 'j_layers/{}/W'.format(index)],
+                            p[prefix + 'j_layers/{}/b'.format(index)]))
+    return activation((g1 * g2).sum(axis=1))
+
+
+def _ggnn_forward(p, cfg, atom_array, adj):
+    h = _embed(p['embed/W'], atom_array)
+    h0 = h
+    mb, atom, ch = h.shape
+    num_edge_type = cfg['num_edge_type']
+    activation = _activations[cfg['readout_activation']]
+    state = None
+    g_list = []
+    for step in range(cfg['n_layers']):
+        index = 0 if cfg['weight_tying'] else step
+        m = _linear(h, p['update_layer/graph_linears/{}/W'.format(index)],
+                    p['update_layer/graph_linears/{}/b'.format(index)])
+        m = m.reshape(mb, atom, ch, num_edge_type).transpose(0, 3, 1, 2)
+        m = numpy.matmul(adj, m).sum(axis=1)
+        x = numpy.concatenate((h.reshape(mb * atom, ch),
+                               m.reshape(mb * atom, ch)), axis=1)
+        state = _gru_forward(p, 'update_layer/update_layer/', x, state)
+        h = state.reshape(mb, atom, ch)
+        if cfg['concat_hidden']:
+            g_list.append(_ggnn_readout(p, 'readout_layer/', activation,
+                                        h, h0, step))
+    if cfg['concat_hidden']:
+        return numpy.concatenate(g_list, axis=1)
+    return _ggnn_readout(p, 'readout_layer/', activation, h, h0, 0)
+
+
+def _rsgcn_forward(p, cfg, graph, adj):
+    n_layers = cfg['n_layers']
+    for i in range(n_layers):
+        W = p['gconvs/{}/W'.format(i)]
+        if i == 0 and graph.dtype.kind in 'iu':
+            # Embedding and the first linear layer are fused into one table.
+            h = p['embed_fused/W'][graph]
+        else:
+            h = _linear(graph if i == 0 else h, W)
+        h = numpy.matmul(adj, h)
+        h += p['gconvs/{}/b'.format(i)]
+        if i < n_layers - 1:
+            h = _relu(h)
+    return _general_readout(h, cfg['readout_mode'])
+
+
+def _rescale_adj(adj):
+    num_neighbors = adj.sum(axis=(1, 2))
+    num_neighbors[num_neighbors == 0] = 1
+    return adj / num_neighbors[:, None, None, :]
+
+
+def _relgcn_forward(p, cfg, x, adj):
+    if cfg['input_type'] == 'int':
+        h = p['embed/W'][x]
+    else:
+        h = _linear(x, p['embed/W'], p['embed/b'])
+    if cfg['scale_adj']:
+        adj = _rescale_adj(adj)
+    num_edge_type = cfg['num_edge_type']
+    for i in range(cfg['n_layers']):
+        W = p['rgcn_convs/{}/W'.format(i)]
+        out_ch = W.shape[1] // (num_edge_type + 1)
+        mb, node, _ = h.shape
+        # Self connection and edge messages are computed in one matmul.
+        hw = _linear(h, W, p['rgcn_convs/{}/b'.format(i)])
+        hs = hw[:, :, :out_ch]
+        m = hw[:, :, out_ch:].reshape(mb, node, out_ch, num_edge_type)
+        m = m.transpose(0, 3, 1, 2)
+        h = numpy.tanh(hs + numpy.matmul(adj, m).sum(axis=1))
+    return _ggnn_readout(p, 'rgcn_readout/', numpy.tanh, h, None, 0)
+
+
+def _mlp_forward(p, cfg, x):
+    activation = _activations[cfg['activation']]
+    h = x
+    for i in range(cfg['n_layers'] - 1):
+        h = activation(_linear(h, p['layers/{}/W'.format(i)],
+                               p['layers/{}/b'.format(i)]))
+    return _linear(h, p['l_out/W'], p['l_out/b'])
+
+
+_graph_conv_forward = {
+    'nfp': _nfp_forward,
+    'ggnn': _ggnn_forward,
+    'rsgcn': _rsgcn_forward,
+    'relgcn': _relgcn_forward,
+}
+
+
+def _sub_params(params, prefix):
+    n = len(prefix)
+    return {k[n:]: v for k, v in params.items() if k.startswith(prefix)}
+
+
+class NumpyInferenceModel(object):
+
+    """Inference-only graph convolution model computed by NumPy
+
+    It is constructed by `export_numpy_model` or `load_numpy_model`, and
+    reproduces the forward of the original chainer model in test mode
+    (`chainer.config.train=False`).
+
+    Args:
+        spec (dict): architecture description of the model.
+        params (dict): dictionary of parameter name to `numpy.ndarray`.
+    """
+
+    def __init__(self, spec, params):
+        if spec.get('version') != _FORMAT_VERSION:
+            raise ValueError('Unsupported format version {}'
+                             .format(spec.get('version')))
+        graph_conv = spec.get('graph_conv')
+        if graph_conv is not None and \
+                graph_conv['type'] not in _graph_conv_forward:
+            raise ValueError('Unsupported graph_conv type {}'
+                             .format(graph_conv['type']))
+        self.spec = spec
+        self.params = params
+        self._graph_conv_params = _sub_params(params, 'graph_conv/')
+        self._mlp_params = _sub_params(params, 'mlp/')
+
+    def __call__(self, *inputs):
+        """Forward propagation
+
+        Args:
+            inputs (numpy.ndarray): same inputs with the original model, e.g.
+                `(atom_array, adj)` for graph convolution models.
+
+        Returns (numpy.ndarray): output of the model
+        """
+        graph_conv = self.spec.get('graph_conv')
+        if graph_conv is not None:
+            inputs = [numpy.asarray(x) for x in inputs]
+            inputs = [x if x.dtype.kind in 'iu' else
+                      x.astype(self.spec['dtype'], copy=False)
+                      for x in inputs]
+            h = _graph_conv_forward[graph_conv['type']](
+                self._graph_conv_params, graph_conv['config'], *inputs)
+        else:
+            h, = inputs
+            h = numpy.asarray(h, dtype=self.spec['dtype'])
+        mlp = self.spec.get('mlp')
+        if mlp is not None:
+            h = _mlp_forward(self._mlp_params, mlp['config'], h)
+        return h
+
+    def predict(self, inputs, batchsize=16):
+        """Forward tuple of input arrays by iterating with batch
+
+        Args:
+            inputs (tuple): tuple of numpy.ndarray whose first axis is batch.
+            batchsize (int): batch size
+
+        Returns (numpy.ndarray): concatenated forward result
+        """
+        n = len(inputs[0])
+        outputs = [self(*[x[i:i + batchsize] for x in inputs])
+                   for i in range(0, n, batchsize)]
+        return numpy.concatenate(outputs)
+
+    def save(self, filepath):
+        """Save the model to `filepath` in npz format
+
+        Args:
+            filepath (str): file path of npz file.
+        """
+        arrays = dict(self.params)
+        arrays[_SPEC_KEY] = numpy.array(json.dumps(self.spec))
+        numpy.savez(filepath, **arrays)
+
+
+def load_numpy_model(filepath):
+    """Load `NumpyInferenceModel` saved by `NumpyInferenceModel.save`
+
+    Args:
+        filepath (str): file path of npz file.
+
+    Returns (NumpyInferenceModel): loaded model
+    """
+    with numpy.load(filepath, allow_pickle=False) as f:
+        spec = json.loads(str(f[_SPEC_KEY]))
+        params = {k: f[k] for k in f.files if k != _SPEC_KEY}
+    return NumpyInferenceModel(spec, params)
@@ -1,6 +1,8 @@
 try:
+    from chainer_chemistry.link_hooks import link_profile_hook  # NOQA
     from chainer_chemistry.link_hooks import variable_monitor_link_hook  # NOQA
 
+    from chainer_chemistry.link_hooks.link_profile_hook import LinkProfileHook  # NOQA
     from chainer_chemistry.link_hooks.variable_monitor_link_hook import VariableMonitorLinkHook  # NOQA
     is_link_hooks_available = True
 except ImportError:
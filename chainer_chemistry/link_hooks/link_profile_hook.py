@@ -0,0 +1,202 @@
+import collections
+import sys
+import time
+
+import chainer
+from chainer import cuda
+import numpy
+
+
+# Select the best-resolution timer function
+_get_time = getattr(time, 'perf_counter', time.time)
+
+_keys = ['count', 'forward_time', 'backward_time', 'forward_bytes',
+         'backward_bytes']
+
+
+def _nbytes(x):
+    """Total bytes of arrays contained in `x`"""
+    if x is None:
+        return 0
+    if isinstance(x, chainer.Variable):
+        x = x.array
+    if isinstance(x, (tuple, list)):
+        return sum(_nbytes(e) for e in x)
+    if isinstance(x, dict):
+        return sum(_nbytes(e) for e in x.values())
+    return getattr(x, 'nbytes', 0)
+
+
+class _BackwardProfileFunctionHook(chainer.FunctionHook):
+
+    """Function hook to attribute functions and their backward to links
+
+    Functions called in the forward of links are marked by the link paths
+    running at that time, and the elapsed time and the gradient bytes of
+    their backward are added to all of the paths.
+    """
+
+    def __init__(self, link_hook):
+        self.name = link_hook.name + '/backward'
+        self.link_hook = link_hook
+        self._start_stack = []
+
+    def forward_preprocess(self, function, in_data):
+        paths = self.link_hook._path_stack
+        if paths:
+            function._profile_link_paths = tuple(paths)
+
+    def backward_preprocess(self, function, in_data, out_grad):
+        xp = cuda.get_array_module(*in_data)
+        self._start_stack.append(self.link_hook._time(xp))
+
+    def backward_postprocess(self, function, in_data, out_grad):
+        xp = cuda.get_array_module(*in_data)
+        elapsed_time = self.link_hook._time(xp) - self._start_stack.pop()
+        paths = getattr(function, '_profile_link_paths', ())
+        # Gradients of the inputs have the same size as the inputs.
+        nbytes = _nbytes(in_data)
+        for path in paths:
+            record = self.link_hook._record(path)
+            record['backward_time'] += elapsed_time
+            record['backward_bytes'] += nbytes
+
+
+class LinkProfileHook(chainer.LinkHook):
+
+    """Profile elapsed time and memory of each link in forward and backward
+
+    Wall time, number of calls and total bytes of the output arrays of each
+    link are recorded for each link path, e.g.
+    `predictor/graph_conv/update_layers/0`. Functions called inside the
+    forward of a link are also tracked, and the time and the gradient bytes of
+    their backward are recorded for the link, so backward profile is
+    available when `backward` is called inside the `with` statement.
+
+    Call graph of links is hierarchical, so the values of a link include the
+    values of its child links.
+
+    .. admonition:: Example
+
+       >>> hook = LinkProfileHook(root=model)
+       >>> with hook:
+       >>>     loss = model(*inputs)
+       >>>     loss.backward()
+       >>> hook.print_report()
+       >>> summary = hook.summary()
+       >>> summary['predictor/graph_conv']['forward_time']
+
+    Args:
+        root (chainer.Link or None): root link to name each link by its path
+            from `root`. Links which are not under `root`, or all the links
+            when `root` is `None`, are named by their class name.
+        name (str): name of this link hook
+        synchronize (bool): If `True`, CUDA device is synchronized before
+            measuring time, so that elapsed time of GPU computation is
+            measured correctly.
+    """
+
+    def __init__(self, root=None, name='LinkProfileHook', synchronize=True):
+        super(LinkProfileHook, self).__init__()
+        self.name = name
+        self.synchronize = synchronize
+        self._paths = {}
+        if root is not None:
+            for path, link in root.namedlinks(skipself=True):
+                self._paths[id(link)] = path.lstrip('/')
+            self._paths[id(root)] = root.__class__.__name__
+        self._function_hook = _BackwardProfileFunctionHook(self)
+        self._path_stack = []
+        self._start_stack = []
+        self.reset()
+
+    def reset(self):
+        """Clear the recorded values"""
+        self.records = collections.OrderedDict()
+
+    def _record(self, path):
+        if path not in self.records:
+            self.records[path] = {key: 0 for key in _keys}
+        return self.records[path]
+
+    def _path(self, link):
+        return self._paths.get(id(link), link.__class__.__name__)
+
+    def _time(self, xp):
+        if self.synchronize and xp is not numpy:
+            cuda.Device().synchronize()
+        return _get_time()
+
+    def __enter__(self):
+        super(LinkProfileHook, self).__enter__()
+        self._function_hook.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self._function_hook.__exit__(*args)
+        super(LinkProfileHook, self).__exit__(*args)
+
+    def forward_preprocess(self, args):
+        self._path_stack.append(self._path(args.link))
+        self._start_stack.append(self._time(args.link.xp))
+
+    def forward_postprocess(self, args):
+        elapsed_time = self._time(args.link.xp) - self._start_stack.pop()
+        path = self._path_stack.pop()
+        record = self._record(path)
+        record['count'] += 1
+        record['forward_time'] += elapsed_time
+        record['forward_bytes'] += _nbytes(args.out)
+
+    def summary(self, sort_by=None):
+        """Returns recorded values of each link
+
+        Args:
+            sort_by (str or None): If specified, links are sorted by the
+                value in descending order. One of 'count', 'forward_time',
+                'backward_time', 'total_time', 'forward_bytes' or
+                'backward_bytes'.
+
+        Returns (collections.OrderedDict): dict which maps link path to dict
+            of 'count', 'forward_time', 'backward_time', 'total_time',
+            'forward_bytes' and 'backward_bytes'. Time is in seconds.
+        """
+        summary = collections.OrderedDict()
+        for path, record in self.records.items():
+            record = dict(record)
+            record['total_time'] = (record['forward_time'] +
+                                    record['backward_time'])
+            summary[path] = record
+        if sort_by is not None:
+            if sort_by not in _keys + ['total_time']:
+                raise ValueError('sort_by {} is not supported'
+                                 .format(sort_by))
+            summary = collections.OrderedDict(sorted(
+                summary.items(), key=lambda item: -item[1][sort_by]))
+        return summary
+
+    def print_report(self, sort_by='total_time', file=sys.stdout):
+        """Prints a table of recorded values of each link
+
+        Args:
+            sort_by (str or None): key to sort links, see `summary`.
+            file: output file.
+        """
+        entries = [['LinkPath', 'Count', 'Forward(ms)', 'Backward(ms)',
+                    'Total(ms)', 'Forward(MB)', 'Backward(MB)']]
+        for path, record in self.summary(sort_by=sort_by).items():
+            entries.append([
+                path, str(record['count']),
+                '{:.3f}'.format(record['forward_time'] * 1e3),
+                '{:.3f}'.format(record['backward_time'] * 1e3),
+                '{:.3f}'.format(record['total_time'] * 1e3),
+                '{:.3f}'.format(record['forward_bytes'] / 1e6),
+                '{:.3f}'.format(record['backward_bytes'] / 1e6)])
+        widths = [max(len(entry[i]) for entry in entries)
+                  for i in range(len(entries[0]))]
+        template = '{:<%d}  ' % widths[0] + '  '.join(
+            '{:>%d}' % w for w in widths[1:])
+        for entry in entries:
+            file.write(template.format(*entry))
+            file.write('\n')
+        file.flush()
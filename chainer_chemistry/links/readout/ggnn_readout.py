@@ -47,7 +47,14 @@ class GGNNReadout(chainer.Chain):
         h1 = functions.concat((h, h0), axis=2) if h0 is not None else h
 
         g1 = functions.sigmoid(self.i_layers[index](h1))
-        g2 = self.activation(self.j_layers[index](h1))
+        g2 = self._activate(self.j_layers[index](h1))
         # sum along atom's axis
-        g = self.activation(functions.sum(g1 * g2, axis=1))
+        g = self._activate(functions.sum(g1 * g2, axis=1))
         return g
+
+    def _activate(self, x):
+        # functions.identity is not called, since it returns the input array
+        # as it is, which cannot be recorded in a static graph.
+        if self.activation is functions.identity:
+            return x
+        return self.activation(x)
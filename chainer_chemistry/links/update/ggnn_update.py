@@ -45,15 +45,9 @@ class GGNNUpdate(chainer.Chain):
         m = functions.transpose(m, (0, 3, 1, 2))
         # m: (minibatch, edge_type, atom, ch)
 
-        adj = functions.reshape(adj, (mb * self.num_edge_type, atom, atom))
-        # (minibatch * edge_type, atom, out_ch)
-        m = functions.reshape(m, (mb * self.num_edge_type, atom, out_ch))
-
-        m = chainer_chemistry.functions.matmul(adj, m)
-
-        # (minibatch * edge_type, atom, out_ch)
-        m = functions.reshape(m, (mb, self.num_edge_type, atom, out_ch))
-        m = functions.sum(m, axis=1)
+        # adj: (minibatch, edge_type, atom, atom), or folded one of shape
+        # (minibatch, atom, edge_type * atom)
+        m = chainer_chemistry.functions.relational_matmul(adj, m)
         # (minibatch, atom, out_ch)
 
         # --- Update part ---
@@ -1,4 +1,5 @@
 import chainer
+from chainer import cuda
 from chainer import functions
 import numpy
 
@@ -6,9 +7,49 @@ import chainer_chemistry
 from chainer_chemistry.links import GraphLinear
 
 
+def compute_degree(adj):
+    """Compute degree of each atom from adjacency matrix
+
+    The adjacency matrix is assumed to have self connection, i.e. degree
+    is the number of adjacent atoms minus 1. It is -1 for padded atoms.
+
+    Args:
+        adj (numpy.ndarray): adjacency matrix of shape
+            (minibatch, atom, atom).
+
+    Returns (numpy.ndarray): degree of shape (minibatch, atom) in int32.
+    """
+    xp = cuda.get_array_module(adj)
+    return (xp.rint(xp.sum(adj, axis=1)) - 1).astype(numpy.int32)
+
+
+def get_degree_indices(degree, num_degree_type):
+    """Flattened indices of atoms for each degree
+
+    Args:
+        degree (numpy.ndarray): degree of shape (minibatch, atom).
+        num_degree_type (int): number of degree types.
+
+    Returns (list): list of `num_degree_type` arrays, where `d`-th array
+        has indices of atoms whose degree is `d` in flattened
+        (minibatch * atom) axis.
+    """
+    xp = cuda.get_array_module(degree)
+    degree = degree.ravel()
+    return [xp.nonzero(degree == d)[0].astype(numpy.int32)
+            for d in range(num_degree_type)]
+
+
 class NFPUpdate(chainer.Chain):
     """NFP submodule for update part.
 
+    Messages are transformed by `GraphLinear` of the degree of each atom.
+    When `deg_conds` is given, each `GraphLinear` is applied to the whole
+    messages masked by the degree. Otherwise, atoms are gathered for each
+    degree by `degree_indices`, so that each `GraphLinear` is applied only
+    to the atoms of its degree, and scattered back. Both give the same
+    result, i.e. biases of all the degrees are added to each atom.
+
     Args:
         in_channels (int): input channel dimension
         out_channels (int): output channel dimension
@@ -26,7 +67,24 @@ class NFPUpdate(chainer.Chain):
         self.in_channels = in_channels
         self.out_channels = out_channels
 
-    def __call__(self, h, adj, deg_conds):
+    def __call__(self, h, adj, deg_conds=None, degree_indices=None):
+        """Forward propagation
+
+        Args:
+            h (numpy.ndarray): atom features of shape (minibatch, atom, ch).
+            adj (numpy.ndarray): adjacency matrix of shape
+                (minibatch, atom, atom).
+            deg_conds (list or None): boolean masks of shape
+                (minibatch, atom, ch) for each degree. Float masks of shape
+                (minibatch, atom, 1) are also accepted, which are multiplied
+                to the messages.
+            degree_indices (list or None): indices of atoms for each degree,
+                given by `get_degree_indices`. If both `deg_conds` and
+                `degree_indices` are `None`, it is computed from `adj`.
+
+        Returns:
+            ~chainer.Variable: updated atom features.
+        """
         # h: (minibatch, atom, ch)
         # h encodes each atom's info in ch axis of size hidden_dim
         # adjs: (minibatch, atom, atom)
@@ -38,17 +96,63 @@ class NFPUpdate(chainer.Chain):
         fv = chainer_chemistry.functions.matmul(adj, h)
 
         # --- Update part ---
+        if deg_conds is not None:
+            out_h = self._update_masked(fv, deg_conds)
+        else:
+            if degree_indices is None:
+                adj_array = adj.array if isinstance(adj, chainer.Variable) \
+                    else adj
+                degree_indices = get_degree_indices(
+                    compute_degree(adj_array), self.max_degree + 1)
+            out_h = self._update_bucketed(fv, degree_indices)
+
+        # out_h shape (minibatch, max_num_atoms, hidden_dim)
+        out_h = functions.sigmoid(out_h)
+        return out_h
+
+    def _update_masked(self, fv, deg_conds):
         if self.xp is numpy:
             zero_array = numpy.zeros(fv.shape, dtype=numpy.float32)
         else:
             zero_array = self.xp.zeros_like(fv)
 
-        fvds = [functions.where(cond, fv, zero_array) for cond in deg_conds]
+        fvds = []
+        for cond in deg_conds:
+            if cond.dtype.kind == 'f':
+                # Float mask computed by Chainer functions. It is tiled
+                # instead of broadcast, since static graph cannot record
+                # read-only outputs of `broadcast_to`.
+                fvds.append(fv * functions.tile(cond, (1, 1, fv.shape[2])))
+            else:
+                fvds.append(functions.where(cond, fv, zero_array))
 
         out_h = 0
         for graph_linear, fvd in zip(self.graph_linears, fvds):
             out_h = out_h + graph_linear(fvd)
+        return out_h
 
-        # out_h shape (minibatch, max_num_atoms, hidden_dim)
-        out_h = functions.sigmoid(out_h)
+    def _update_bucketed(self, fv, degree_indices):
+        mb, atom, ch = fv.shape
+        fv = functions.reshape(fv, (mb * atom, ch))
+        indices = []
+        outs = []
+        bias = 0
+        for graph_linear, index in zip(self.graph_linears, degree_indices):
+            if graph_linear.b is not None:
+                bias = bias + graph_linear.b
+            if len(index) == 0:
+                continue
+            indices.append(index)
+            outs.append(functions.linear(
+                functions.get_item(fv, index), graph_linear.W))
+        out_h = self.xp.zeros((mb * atom, self.out_channels), dtype=fv.dtype)
+        if outs:
+            # Atoms of different degrees are disjoint, so it is scattered
+            # at once.
+            out_h = functions.scatter_add(
+                out_h, self.xp.concatenate(indices),
+                functions.concat(outs, axis=0))
+        out_h = functions.reshape(out_h, (mb, atom, self.out_channels))
+        if not isinstance(bias, int):
+            out_h = functions.bias(out_h, bias, axis=2)
         return out_h
@@ -1,6 +1,8 @@
 import chainer
 from chainer import functions
 
+import chainer_chemistry
+
 from chainer_chemistry.links import GraphLinear
 
 
@@ -28,7 +30,9 @@ class RelGCNUpdate(chainer.Chain):
 
         Args:
             h: (batchsize, num_nodes, in_channels)
-            adj: (batchsize, num_edge_type, num_nodes, num_nodes)
+            adj: (batchsize, num_edge_type, num_nodes, num_nodes), or
+                folded one of shape
+                (batchsize, num_nodes, num_edge_type * num_nodes)
 
         Returns:
             (batchsize, num_nodes, ch)
@@ -47,8 +51,6 @@ class RelGCNUpdate(chainer.Chain):
             m, (mb, node, self.out_channels, self.num_edge_type))
         m = functions.transpose(m, (0, 3, 1, 2))
         # m: (batchsize, edge_type, node, ch)
-        # hrL (batchsize, edge_type, node, ch)
-        hr = functions.matmul(adj, m)
         # hr: (batchsize, node, ch)
-        hr = functions.sum(hr, axis=1)
+        hr = chainer_chemistry.functions.relational_matmul(adj, m)
         return hs + hr
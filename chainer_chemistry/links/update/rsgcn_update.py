@@ -1,5 +1,6 @@
 import chainer
 from chainer import functions
+import scipy.sparse
 
 import chainer_chemistry
 from chainer_chemistry.links import GraphLinear
@@ -22,8 +23,27 @@ class RSGCNUpdate(chainer.Chain):
         self.out_channels = out_channels
 
     def __call__(self, h, adj):
+        """Forward propagation
+
+        Args:
+            h (numpy.ndarray): atom features of shape (minibatch, atom, ch).
+            adj (numpy.ndarray or scipy.sparse.spmatrix): normalized
+                adjacency matrix of shape (minibatch, atom, atom), or sparse
+                block diagonal one of shape
+                (minibatch * atom, minibatch * atom) given by
+                `concat_mols_with_sparse_adj`.
+
+        Returns:
+            ~chainer.Variable: updated atom features.
+        """
         # --- Message part ---
-        h = chainer_chemistry.functions.matmul(adj, h)
+        if scipy.sparse.issparse(adj):
+            mb, atom, ch = h.shape
+            h = functions.reshape(h, (mb * atom, ch))
+            h = chainer_chemistry.functions.sparse_matmul(adj, h)
+            h = functions.reshape(h, (mb, atom, ch))
+        else:
+            h = chainer_chemistry.functions.matmul(adj, h)
         # --- Update part ---
         h = self.graph_linear(h)
         return h
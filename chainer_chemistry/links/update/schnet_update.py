@@ -10,14 +10,64 @@ See: https://arxiv.org/abs/1706.08566
 import chainer
 from chainer import functions
 from chainer import links
+import numpy
 
 from chainer_chemistry.links import GraphLinear
 
 
+def cosine_cutoff(dist, cutoff):
+    """Cosine cutoff function
+
+    It smoothly decays from 1 at distance 0 to 0 at `cutoff`, and is 0
+    beyond `cutoff`, i.e. :math:`0.5 (\\cos(\\pi d / r_c) + 1)` for
+    :math:`d < r_c`.
+
+    Args:
+        dist (chainer.Variable or numpy.ndarray): distances.
+        cutoff (float): cutoff radius.
+
+    Returns (chainer.Variable): values of the same shape with `dist`.
+
+    """
+    dist_array = dist.array if isinstance(dist, chainer.Variable) else dist
+    mask = (dist_array < cutoff).astype(dist_array.dtype)
+    return 0.5 * (functions.cos(dist * (numpy.pi / cutoff)) + 1) * mask
+
+
 class CFConv(chainer.Chain):
+    """Continuous-filter convolution of SchNet
+
+    By default, the filter network is evaluated on all the pairs of atoms
+    at once, which takes memory proportional to
+    `minibatch * atom ** 2 * num_rbf`. Two modes bound the memory.
+
+    - `cutoff`: only the pairs of atoms within `cutoff` are gathered as a
+      neighbor list, and the filter multiplied by `cosine_cutoff` is
+      evaluated only on them.
+    - `chunk_size`: the filter is evaluated on the pairs of `chunk_size`
+      source atoms at a time, and intermediate results are recomputed in
+      backward by `functions.forget` instead of being kept.
+
+    Args:
+        num_rbf (int): number of radial basis functions.
+        radius_resolution (float): interval of centers of the radial basis
+            functions.
+        gamma (float): coefficient of the radial basis functions.
+        hidden_dim (int): dimension of feature vector.
+        cutoff (float or None): cutoff radius.
+        chunk_size (int or None): number of source atoms evaluated at a time
+            when `cutoff` is `None`.
+    """
+
     def __init__(self, num_rbf=300, radius_resolution=0.1, gamma=10.0,
-                 hidden_dim=64):
+                 hidden_dim=64, cutoff=None, chunk_size=None):
         super(CFConv, self).__init__()
+        if cutoff is not None and cutoff <= 0:
+            raise ValueError('cutoff must be positive, actual {}'
+                             .format(cutoff))
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError('chunk_size must be positive, actual {}'
+                             .format(chunk_size))
         with self.init_scope():
             self.dense1 = links.Linear(num_rbf, hidden_dim)
             self.dense2 = links.Linear(hidden_dim)
@@ -25,6 +75,64 @@ class CFConv(chainer.Chain):
         self.num_rbf = num_rbf
         self.radius_resolution = radius_resolution
         self.gamma = gamma
+        self.cutoff = cutoff
+        self.chunk_size = chunk_size
+
+    def _filter(self, dist):
+        """Filter network, which maps (...) distances to (..., hidden_dim)"""
+        shape = dist.shape
+        embedlist = self.xp.arange(
+            self.num_rbf).astype('f') * self.radius_resolution
+        dist = functions.reshape(dist, (-1, 1))
+        dist = functions.broadcast_to(dist, (dist.shape[0], self.num_rbf))
+        dist = functions.exp(- self.gamma * (dist - embedlist) ** 2)
+        dist = self.dense1(dist)
+        dist = functions.softplus(dist)
+        dist = self.dense2(dist)
+        dist = functions.softplus(dist)
+        return functions.reshape(dist, shape + (self.hidden_dim,))
+
+    def _convolve(self, h, dist):
+        # h: (mb, src, ch), dist: (mb, src, dst) -> (mb, dst, ch)
+        mb, src, dst = dist.shape
+        w = self._filter(dist)
+        h = functions.reshape(h, (mb, src, 1, self.hidden_dim))
+        h = functions.broadcast_to(h, (mb, src, dst, self.hidden_dim))
+        return functions.sum(h * w, axis=1)
+
+    def _convolve_chunked(self, h, dist):
+        y = None
+        atom = h.shape[1]
+        for start in range(0, atom, self.chunk_size):
+            end = min(start + self.chunk_size, atom)
+            h_chunk = h[:, start:end]
+            dist_chunk = dist[:, start:end]
+            if chainer.config.enable_backprop:
+                y_chunk = functions.forget(self._convolve, h_chunk,
+                                           dist_chunk)
+            else:
+                y_chunk = self._convolve(h_chunk, dist_chunk)
+            y = y_chunk if y is None else y + y_chunk
+        return y
+
+    def _convolve_cutoff(self, h, dist):
+        mb, atom, ch = h.shape
+        dist_array = dist.array if isinstance(dist, chainer.Variable) \
+            else dist
+        # Neighbor list of pairs (b, i, j) within the cutoff radius
+        b, i, j = self.xp.nonzero(dist_array < self.cutoff)
+        src = b * atom + i
+        dst = b * atom + j
+        dist_pairs = functions.get_item(
+            functions.reshape(dist, (-1,)), src * atom + j)
+        w = self._filter(dist_pairs)
+        w = w * functions.reshape(
+            cosine_cutoff(dist_pairs, self.cutoff), (-1, 1))
+        messages = functions.get_item(
+            functions.reshape(h, (mb * atom, ch)), src) * w
+        y = self.xp.zeros((mb * atom, ch), dtype=messages.dtype)
+        y = functions.scatter_add(y, dst, messages)
+        return functions.reshape(y, (mb, atom, ch))
 
     def __call__(self, h, dist):
         """
@@ -40,30 +148,29 @@ class CFConv(chainer.Chain):
         if ch != self.hidden_dim:
             raise ValueError('h.shape[2] {} and hidden_dim {} must be same!'
                              .format(ch, self.hidden_dim))
-        embedlist = self.xp.arange(
-            self.num_rbf).astype('f') * self.radius_resolution
-        dist = functions.reshape(dist, (mb, atom, atom, 1))
-        dist = functions.broadcast_to(dist, (mb, atom, atom, self.num_rbf))
-        dist = functions.exp(- self.gamma * (dist - embedlist) ** 2)
-        dist = functions.reshape(dist, (-1, self.num_rbf))
-        dist = self.dense1(dist)
-        dist = functions.softplus(dist)
-        dist = self.dense2(dist)
-        dist = functions.softplus(dist)
-        dist = functions.reshape(dist, (mb, atom, atom, self.hidden_dim))
-        h = functions.reshape(h, (mb, atom, 1, self.hidden_dim))
-        h = functions.broadcast_to(h, (mb, atom, atom, self.hidden_dim))
-        h = functions.sum(h * dist, axis=1)
-        return h
+        if self.cutoff is not None:
+            return self._convolve_cutoff(h, dist)
+        if self.chunk_size is not None and self.chunk_size < atom:
+            return self._convolve_chunked(h, dist)
+        return self._convolve(h, dist)
 
 
 class SchNetUpdate(chainer.Chain):
-    def __init__(self, hidden_dim=64):
+    """Update submodule of SchNet
+
+    Args:
+        hidden_dim (int): dimension of feature vector.
+        cutoff (float or None): cutoff radius of `CFConv`.
+        chunk_size (int or None): chunk size of `CFConv`.
+    """
+
+    def __init__(self, hidden_dim=64, cutoff=None, chunk_size=None):
         super(SchNetUpdate, self).__init__()
         with self.init_scope():
             self.linear = chainer.ChainList(
                 *[GraphLinear(hidden_dim) for _ in range(3)])
-            self.cfconv = CFConv(hidden_dim=hidden_dim)
+            self.cfconv = CFConv(hidden_dim=hidden_dim, cutoff=cutoff,
+                                 chunk_size=chunk_size)
         self.hidden_dim = hidden_dim
 
     def __call__(self, x, dist):
@@ -1,19 +1,27 @@
-from chainer_chemistry.models import ggnn  # NOQA
-from chainer_chemistry.models import mlp  # NOQA
-from chainer_chemistry.models import nfp  # NOQA
-from chainer_chemistry.models import prediction  # NOQA
-from chainer_chemistry.models import relgcn  # NOQA
-from chainer_chemistry.models import schnet  # NOQA
-from chainer_chemistry.models import weavenet  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
 
-from chainer_chemistry.models.ggnn import GGNN  # NOQA
-from chainer_chemistry.models.mlp import MLP  # NOQA
-from chainer_chemistry.models.nfp import NFP  # NOQA
-from chainer_chemistry.models.relgcn import RelGCN  # NOQA
-from chainer_chemistry.models.rsgcn import RSGCN  # NOQA
-from chainer_chemistry.models.schnet import SchNet  # NOQA
-from chainer_chemistry.models.weavenet import WeaveNet  # NOQA
 
-from chainer_chemistry.models.prediction.base import BaseForwardModel  # NOQA
-from chainer_chemistry.models.prediction.classifier import Classifier  # NOQA
-from chainer_chemistry.models.prediction.regressor import Regressor  # NOQA
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'ggnn',
+        'mlp',
+        'nfp',
+        'prediction',
+        'relgcn',
+        'rsgcn',
+        'schnet',
+        'weavenet',
+    ],
+    attributes={
+        'GGNN': 'chainer_chemistry.models.ggnn',
+        'MLP': 'chainer_chemistry.models.mlp',
+        'NFP': 'chainer_chemistry.models.nfp',
+        'RelGCN': 'chainer_chemistry.models.relgcn',
+        'RSGCN': 'chainer_chemistry.models.rsgcn',
+        'SchNet': 'chainer_chemistry.models.schnet',
+        'WeaveNet': 'chainer_chemistry.models.weavenet',
+        'BaseForwardModel': 'chainer_chemistry.models.prediction.base',
+        'Classifier': 'chainer_chemistry.models.prediction.classifier',
+        'Regressor': 'chainer_chemistry.models.prediction.regressor',
+    })
@@ -1,11 +1,12 @@
 import chainer
-from chainer import cuda
 from chainer import functions
 
 from chainer_chemistry.config import MAX_ATOMIC_NUM
+from chainer_chemistry.functions import fold_adj
 from chainer_chemistry.links import EmbedAtomID
 from chainer_chemistry.links import GGNNReadout
 from chainer_chemistry.links import GGNNUpdate
+from chainer_chemistry.models.static_graph import call_static_graph
 
 
 class GGNN(chainer.Chain):
@@ -24,13 +25,17 @@ class GGNN(chainer.Chain):
         concat_hidden (bool): If set to True, readout is executed in each layer
             and the result is concatenated
         weight_tying (bool): enable weight_tying or not
+        use_static_graph (bool): If True, the computational graph is
+            recorded at the first call and replayed for the following
+            minibatches of the same shape, see
+            :mod:`chainer_chemistry.models.static_graph`.
 
     """
     NUM_EDGE_TYPE = 4
 
     def __init__(self, out_dim, hidden_dim=16,
                  n_layers=4, n_atom_types=MAX_ATOMIC_NUM, concat_hidden=False,
-                 weight_tying=True):
+                 weight_tying=True, use_static_graph=False):
         super(GGNN, self).__init__()
         n_readout_layer = n_layers if concat_hidden else 1
         n_message_layer = 1 if weight_tying else n_layers
@@ -50,6 +55,7 @@ class GGNN(chainer.Chain):
         self.n_layers = n_layers
         self.concat_hidden = concat_hidden
         self.weight_tying = weight_tying
+        self.use_static_graph = use_static_graph
 
     def __call__(self, atom_array, adj):
         """Forward propagation
@@ -60,18 +66,32 @@ class GGNN(chainer.Chain):
                 `atom_array[mol_index, atom_index]` represents `mol_index`-th
                 molecule's `atom_index`-th atomic number
             adj (numpy.ndarray): minibatch of adjancency matrix with edge-type
-                information
+                information, of shape (minibatch, edge_type, atom, atom) or
+                folded one of shape (minibatch, atom, edge_type * atom)
 
         Returns:
             ~chainer.Variable: minibatch of fingerprint
         """
+        if self.use_static_graph:
+            return call_static_graph(self, self._forward, atom_array, adj)
+        return self._forward(atom_array, adj)
+
+    def static_forward(self, atom_array, adj):
+        return self._forward(atom_array, adj)
+
+    def _forward(self, atom_array, adj):
         # reset state
         self.update_layer.reset_state()
         if atom_array.dtype == self.xp.int32:
             h = self.embed(atom_array)  # (minibatch, max_num_atoms)
         else:
             h = atom_array
-        h0 = functions.copy(h, cuda.get_device_from_array(h.data).id)
+        # Variables are not modified in place, so that the initial features
+        # are kept without copy.
+        h0 = h
+        if adj.ndim == 4:
+            # Fold once, which is shared by all the steps
+            adj = fold_adj(adj)
         g_list = []
         for step in range(self.n_layers):
             h = self.update_layer(h, adj, step)
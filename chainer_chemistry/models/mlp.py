@@ -2,6 +2,8 @@ import chainer
 from chainer.functions import relu
 from chainer import links
 
+from chainer_chemistry.models.static_graph import call_static_graph
+
 
 class MLP(chainer.Chain):
 
@@ -13,9 +15,14 @@ class MLP(chainer.Chain):
             associated to each atom
         n_layers (int): number of layers
         activation (chainer.functions): activation function
+        use_static_graph (bool): If True, the computational graph is
+            recorded at the first call and replayed for the following
+            inputs of the same shape, see
+            :mod:`chainer_chemistry.models.static_graph`.
     """
 
-    def __init__(self, out_dim, hidden_dim=16, n_layers=2, activation=relu):
+    def __init__(self, out_dim, hidden_dim=16, n_layers=2, activation=relu,
+                 use_static_graph=False):
         super(MLP, self).__init__()
         if n_layers <= 0:
             raise ValueError('n_layers must be a positive integer, but it was '
@@ -25,8 +32,17 @@ class MLP(chainer.Chain):
             self.layers = chainer.ChainList(*layers)
             self.l_out = links.Linear(None, out_dim)
         self.activation = activation
+        self.use_static_graph = use_static_graph
 
     def __call__(self, x):
+        if self.use_static_graph:
+            return call_static_graph(self, self._forward, x)
+        return self._forward(x)
+
+    def static_forward(self, x):
+        return self._forward(x)
+
+    def _forward(self, x):
         h = x
         for l in self.layers:
             h = self.activation(l(h))
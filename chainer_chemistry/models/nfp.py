@@ -10,6 +10,9 @@ from chainer_chemistry.config import MAX_ATOMIC_NUM
 from chainer_chemistry.links import EmbedAtomID
 from chainer_chemistry.links import NFPReadout
 from chainer_chemistry.links import NFPUpdate
+from chainer_chemistry.links.update.nfp_update import compute_degree
+from chainer_chemistry.links.update.nfp_update import get_degree_indices
+from chainer_chemistry.models.static_graph import call_static_graph
 
 
 class NFP(chainer.Chain):
@@ -24,10 +27,16 @@ class NFP(chainer.Chain):
             when molecules are regarded as graphs
         n_atom_types (int): number of types of atoms
         n_layer (int): number of layers
+        use_static_graph (bool): If True, the computational graph is
+            recorded at the first call and replayed for the following
+            minibatches of the same shape. Atoms are selected by
+            degree masks instead of indices in this mode, see
+            :mod:`chainer_chemistry.models.static_graph`.
     """
 
     def __init__(self, out_dim, hidden_dim=16, n_layers=4, max_degree=6,
-                 n_atom_types=MAX_ATOMIC_NUM, concat_hidden=False):
+                 n_atom_types=MAX_ATOMIC_NUM, concat_hidden=False,
+                 use_static_graph=False):
         super(NFP, self).__init__()
         num_degree_type = max_degree + 1
         with self.init_scope():
@@ -44,8 +53,9 @@ class NFP(chainer.Chain):
         self.num_degree_type = num_degree_type
         self.n_layers = n_layers
         self.concat_hidden = concat_hidden
+        self.use_static_graph = use_static_graph
 
-    def __call__(self, atom_array, adj):
+    def __call__(self, atom_array, adj, degree=None):
         """Forward propagation
 
         Args:
@@ -56,10 +66,34 @@ class NFP(chainer.Chain):
             adj (numpy.ndarray): minibatch of adjancency matrix
                 `adj[mol_index]` represents `mol_index`-th molecule's
                 adjacency matrix
+            degree (numpy.ndarray or None): minibatch of degree of each atom
+                given by `NFPPreprocessor` with `return_degree=True`.
+                If `None`, it is computed from `adj`.
 
         Returns:
             ~chainer.Variable: minibatch of fingerprint
         """
+        if self.use_static_graph:
+            args = (atom_array, adj) if degree is None else \
+                (atom_array, adj, degree)
+            return call_static_graph(self, self._forward, *args)
+        return self._forward(atom_array, adj, degree)
+
+    def static_forward(self, atom_array, adj, degree=None):
+        # Degree masks are computed by Chainer functions to be recorded,
+        # instead of the indices of atoms computed by numpy.
+        if degree is None:
+            degree = functions.sum(adj, axis=1) - 1
+        else:
+            degree = functions.cast(degree, adj.dtype)
+        # mask is 1 for the atoms of degree `d` and 0 otherwise
+        deg_conds = [
+            functions.expand_dims(functions.relu(
+                1 - functions.absolute(degree - d)), axis=2)
+            for d in range(self.num_degree_type)]
+        return self._forward(atom_array, adj, deg_conds=deg_conds)
+
+    def _forward(self, atom_array, adj, degree=None, deg_conds=None):
         if atom_array.dtype == self.xp.int32:
             # atom_array: (minibatch, atom)
             h = self.embed(atom_array)
@@ -69,19 +103,24 @@ class NFP(chainer.Chain):
         g = 0
 
         # --- NFP update & readout ---
-        # degree_mat: (minibatch, max_num_atoms)
-        if isinstance(adj, Variable):
-            adj_array = adj.data
+        # Atoms are gathered by their degree once, and shared by all the
+        # layers.
+        if deg_conds is not None:
+            degree_indices = None
         else:
-            adj_array = adj
-        degree_mat = self.xp.sum(adj_array, axis=1)
-        # deg_conds: (minibatch, atom, ch)
-        deg_conds = [self.xp.broadcast_to(
-            ((degree_mat - degree) == 0)[:, :, None], h.shape)
-            for degree in range(1, self.num_degree_type + 1)]
+            if degree is None:
+                if isinstance(adj, Variable):
+                    adj_array = adj.data
+                else:
+                    adj_array = adj
+                degree = compute_degree(adj_array)
+            elif isinstance(degree, Variable):
+                degree = degree.data
+            degree_indices = get_degree_indices(degree, self.num_degree_type)
         g_list = []
         for update, readout in zip(self.layers, self.read_out_layers):
-            h = update(h, adj, deg_conds)
+            h = update(h, adj, deg_conds=deg_conds,
+                       degree_indices=degree_indices)
             dg = readout(h)
             g = g + dg
             if self.concat_hidden:
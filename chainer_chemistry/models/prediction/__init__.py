@@ -1,7 +1,20 @@
-from chainer_chemistry.models.prediction import base  # NOQA
-from chainer_chemistry.models.prediction import classifier  # NOQA
-from chainer_chemistry.models.prediction import regressor  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
 
-from chainer_chemistry.models.prediction.base import BaseForwardModel  # NOQA
-from chainer_chemistry.models.prediction.classifier import Classifier  # NOQA
-from chainer_chemistry.models.prediction.regressor import Regressor  # NOQA
+
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'artifact',
+        'base',
+        'classifier',
+        'regressor',
+        'smiles_pipeline',
+    ],
+    attributes={
+        'BaseForwardModel': 'chainer_chemistry.models.prediction.base',
+        'Classifier': 'chainer_chemistry.models.prediction.classifier',
+        'Regressor': 'chainer_chemistry.models.prediction.regressor',
+        'SmilesPredictionPipeline': 'chainer_chemistry.models.prediction.smiles_pipeline',  # NOQA
+    },
+    # It requires RDKit.
+    lazy_only=['smiles_pipeline', 'SmilesPredictionPipeline'])
@@ -0,0 +1,211 @@
+"""
+Model artifact format which does not depend on `pickle`
+
+An artifact is a directory consists of
+
+- `model.json`: architecture descriptor. It contains the import path of the
+  builder function and its keyword arguments to construct the model, and
+  the name, shape and dtype of each parameter and persistent value.
+- `arrays/*.npy`: uncompressed parameter and persistent arrays.
+
+Since each array is stored as a plain `.npy` file, it can be loaded with
+`numpy.load(mmap_mode='r')`. Memory mapped parameters are not copied into
+process memory, so that many serving processes on the same host share one
+copy of the weights through OS page cache, and loading time does not depend
+on the model size.
+"""
+import importlib
+import json
+import os
+
+from chainer import cuda
+import numpy
+import six
+
+from chainer_chemistry._version import __version__
+
+_FORMAT_VERSION = 1
+DESCRIPTOR_FILENAME = 'model.json'
+_ARRAY_DIRNAME = 'arrays'
+
+
+def _builder_path(builder):
+    if isinstance(builder, six.string_types):
+        if ':' not in builder:
+            raise ValueError('builder must be specified as '
+                             '"module.path:function_name", actual {}'
+                             .format(builder))
+        return builder
+    name = getattr(builder, '__qualname__', builder.__name__)
+    if '<' in name:
+        # lambda or function defined inside function can not be imported.
+        raise ValueError('builder {} is not importable'.format(builder))
+    return '{}:{}'.format(builder.__module__, name)
+
+
+def _import_builder(path):
+    module_name, name = path.split(':')
+    obj = importlib.import_module(module_name)
+    for attr in name.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _class_path(obj):
+    cls = type(obj)
+    return '{}.{}'.format(cls.__module__, cls.__name__)
+
+
+def _iter_arrays(model):
+    """Yields (kind, key, link, name) of each parameter and persistent"""
+    for path, link in model.namedlinks():
+        prefix = path.rstrip('/') + '/'
+        for name in sorted(link._params):
+            yield 'param', prefix + name, link, name
+        for name in sorted(link._persistent):
+            yield 'persistent', prefix + name, link, name
+
+
+def save_artifact(model, dirpath, builder=None, builder_kwargs=None):
+    """Save `model` to `dirpath` in the artifact format
+
+    .. admonition:: Example
+
+       >>> # mypackage/models.py
+       >>> def build_regressor(hidden_dim):
+       >>>     return Regressor(GraphConvPredictor(
+       >>>         NFP(out_dim=hidden_dim), MLP(out_dim=1)))
+       >>>
+       >>> save_artifact(regressor, 'model_dir',
+       >>>               builder='mypackage.models:build_regressor',
+       >>>               builder_kwargs={'hidden_dim': 16})
+       >>> # In serving process
+       >>> model = load_artifact('model_dir')
+
+    Args:
+        model (chainer.Link): model to save.
+        dirpath (str): directory path of the artifact. It is created if not
+            exist.
+        builder (str or callable): function to construct `model` without
+            parameters, specified as "module.path:function_name" or a module
+            level function. If None, the model to load parameters must be
+            given when loading the artifact.
+        builder_kwargs (dict or None): keyword arguments of `builder`. It
+            must be JSON serializable.
+    """
+    if builder is None and builder_kwargs is not None:
+        raise ValueError('builder_kwargs is specified without builder')
+    array_dir = os.path.join(dirpath, _ARRAY_DIRNAME)
+    if not os.path.exists(array_dir):
+        os.makedirs(array_dir)
+
+    entries = []
+    for i, (kind, key, link, name) in enumerate(_iter_arrays(model)):
+        value = getattr(link, name)
+        if kind == 'param':
+            value = value.array
+        is_scalar = isinstance(value, numpy.generic)
+        entry = {'key': key, 'kind': kind}
+        if value is None:
+            # Uninitialized parameter
+            entry['file'] = None
+        elif isinstance(value, (bool, int, float)):
+            entry['file'] = None
+            entry['value'] = value
+        else:
+            value = numpy.asarray(cuda.to_cpu(value))
+            entry['file'] = '{}/{:05d}.npy'.format(_ARRAY_DIRNAME, i)
+            entry['shape'] = list(value.shape)
+            entry['dtype'] = value.dtype.str
+            entry['scalar'] = is_scalar
+            numpy.save(os.path.join(dirpath, entry['file']),
+                       numpy.ascontiguousarray(value), allow_pickle=False)
+        entries.append(entry)
+
+    descriptor = {
+        'format_version': _FORMAT_VERSION,
+        'chainer_chemistry_version': __version__,
+        'class': _class_path(model),
+        'builder': None if builder is None else _builder_path(builder),
+        'builder_kwargs': builder_kwargs or {},
+        'arrays': entries,
+    }
+    # Descriptor is written at last, so that partially written artifact is
+    # not loaded.
+    with open(os.path.join(dirpath, DESCRIPTOR_FILENAME), 'w') as f:
+        json.dump(descriptor, f, indent=2, sort_keys=True)
+
+
+def load_descriptor(dirpath):
+    """Load architecture descriptor of the artifact
+
+    Args:
+        dirpath (str): directory path of the artifact.
+
+    Returns (dict): descriptor
+    """
+    with open(os.path.join(dirpath, DESCRIPTOR_FILENAME)) as f:
+        descriptor = json.load(f)
+    if descriptor.get('format_version') != _FORMAT_VERSION:
+        raise ValueError('Unsupported format version {}'
+                         .format(descriptor.get('format_version')))
+    return descriptor
+
+
+def load_artifact(dirpath, model=None, device=-1, mmap_mode='r'):
+    """Load the model saved by `save_artifact`
+
+    Args:
+        dirpath (str): directory path of the artifact.
+        model (chainer.Link or None): model to set parameters. If None, the
+            model is constructed by the builder recorded in the artifact.
+        device (int): GPU device id of this model to be used.
+            -1 indicates to use in CPU.
+        mmap_mode (str or None): `mmap_mode` of `numpy.load`. With default
+            'r', parameters in CPU are read-only memory mapped arrays which
+            are shared among processes. Use 'c' (copy-on-write) or None to
+            update the parameters, e.g. to fine-tune the loaded model.
+
+    Returns (chainer.Link): loaded model
+    """
+    descriptor = load_descriptor(dirpath)
+    if model is None:
+        if descriptor['builder'] is None:
+            raise ValueError('builder is not recorded in {}, model must be '
+                             'specified'.format(dirpath))
+        builder = _import_builder(descriptor['builder'])
+        model = builder(**descriptor['builder_kwargs'])
+    if _class_path(model) != descriptor['class']:
+        raise TypeError('Unexpected type {}, expected {}'
+                        .format(_class_path(model), descriptor['class']))
+
+    entries = {entry['key']: entry for entry in descriptor['arrays']}
+    targets = list(_iter_arrays(model))
+    keys = set(key for _, key, _, _ in targets)
+    if keys != set(entries.keys()):
+        raise ValueError('Model structure mismatch. missing: {}, unexpected: '
+                         '{}'.format(sorted(set(entries.keys()) - keys),
+                                     sorted(keys - set(entries.keys()))))
+
+    for kind, key, link, name in targets:
+        entry = entries[key]
+        if entry['file'] is None:
+            if 'value' in entry:
+                setattr(link, name, entry['value'])
+            continue
+        value = numpy.load(os.path.join(dirpath, entry['file']),
+                           mmap_mode=mmap_mode, allow_pickle=False)
+        if kind == 'param':
+            param = getattr(link, name)
+            if param.array is not None and param.shape != value.shape:
+                raise ValueError('Shape mismatch of {}: {} and {}'.format(
+                    key, param.shape, value.shape))
+            param.array = value
+        elif entry['scalar']:
+            setattr(link, name, value[()])
+        else:
+            setattr(link, name, value)
+
+    if device >= 0:
+        model.to_gpu(device)
+    return model
@@ -7,6 +7,8 @@ from chainer.iterators import SerialIterator
 from chainer import link
 import numpy
 
+from chainer_chemistry.models.prediction import artifact
+
 
 def _to_tuple(x):
     if not isinstance(x, tuple):
@@ -146,8 +148,8 @@ class BaseForwardModel(link.Chain):
         specific class or attribute structure when saved. The file may not be
         loaded in different environment (version of python or dependent
         libraries), or after large refactoring of the pickled object class.
-        If you want to avoid it, use `chainer.serializers.save_npz`
-        method instead to save only model parameters.
+        If you want to avoid it, use `save_artifact` method instead, which
+        saves the architecture descriptor in JSON and parameters in `.npy`.
 
     .. admonition:: Example
 
@@ -194,6 +196,7 @@ class BaseForwardModel(link.Chain):
         to load when loading from different develop environment or after
         updating library version.
         See `save_pickle` method for the transportability of the saved file.
+        Use `save_artifact` and `load_artifact` for long-lived models.
 
     .. admonition:: Example
 
@@ -217,3 +220,69 @@ class BaseForwardModel(link.Chain):
         # --- Revert the model to specified device ---
         model.initialize(device)
         return model
+
+    def save_artifact(self, dirpath, builder=None, builder_kwargs=None):
+        """Save the model to `dirpath` in the artifact format
+
+        Unlike `save_pickle`, the artifact consists of JSON architecture
+        descriptor and uncompressed `.npy` parameter files, which do not
+        depend on the class structure of the model when saved. Parameters
+        can be memory mapped when loading by `load_artifact`.
+        See `chainer_chemistry.models.prediction.artifact` for the format.
+
+    .. admonition:: Example
+
+       >>> # mypackage/models.py
+       >>> def build_regressor(hidden_dim):
+       >>>     return Regressor(NFP(out_dim=1, hidden_dim=hidden_dim))
+       >>>
+       >>> regressor.save_artifact(
+       >>>     'model_dir', builder='mypackage.models:build_regressor',
+       >>>     builder_kwargs={'hidden_dim': 16})
+
+        Args:
+            dirpath (str): directory path of the artifact.
+            builder (str or callable): function to construct the model
+                without parameters, specified as "module.path:function_name"
+                or a module level function. If None, the model must be given
+                to `load_artifact`.
+            builder_kwargs (dict or None): JSON serializable keyword arguments
+                of `builder`.
+
+        """
+        artifact.save_artifact(self, dirpath, builder=builder,
+                               builder_kwargs=builder_kwargs)
+
+    @staticmethod
+    def load_artifact(dirpath, device=-1, model=None, mmap_mode='r'):
+        """Load the model from `dirpath` saved by `save_artifact`
+
+        Only the module of the builder function is imported, and parameters
+        in CPU are memory mapped by default so that the processes loading the
+        same artifact share one copy of the weights.
+
+    .. admonition:: Example
+
+       >>> from chainer_chemistry.models import BaseForwardModel
+       >>> model = BaseForwardModel.load_artifact('model_dir')
+
+        Args:
+            dirpath (str): directory path of the artifact.
+            device (int): GPU device id of this model to be used.
+                -1 indicates to use in CPU.
+            model (BaseForwardModel or None): model to set parameters. If
+                None, the model is constructed by the builder recorded in the
+                artifact.
+            mmap_mode (str or None): `mmap_mode` of `numpy.load`. Parameters
+                are read-only with default 'r'. Use 'c' or None to update
+                them.
+
+        """
+        model = artifact.load_artifact(dirpath, model=model,
+                                       mmap_mode=mmap_mode)
+        if not isinstance(model, BaseForwardModel):
+            raise TypeError('Unexpected type {}'.format(type(model)))
+
+        # --- Send the model to specified device ---
+        model.initialize(device)
+        return model
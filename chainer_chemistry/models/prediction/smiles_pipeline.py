@@ -0,0 +1,291 @@
+"""
+Pipelined prediction from SMILES
+
+`SmilesParser.parse` followed by `predict` featurizes the whole input before
+the first forward starts, and keeps the whole intermediate dataset in memory.
+`SmilesPredictionPipeline` instead streams SMILES through a featurization
+stage, which runs in a process pool, and a batching stage, which feeds the
+model forward in the main process. Both stages run concurrently, connected
+by a bounded queue of pending chunks.
+"""
+from collections import deque
+from logging import getLogger
+import multiprocessing
+
+import chainer
+import numpy
+from rdkit import Chem
+
+from chainer_chemistry.dataset.converters import concat_mols
+from chainer_chemistry.dataset.preprocessors.common import MolFeatureExtractionError  # NOQA
+from chainer_chemistry.models.prediction.base import _extract_numpy
+from chainer_chemistry.models.prediction.base import _to_tuple
+
+
+# Preprocessor used inside each worker process, set by `_init_worker`.
+_worker_preprocessor = None
+
+
+def _init_worker(preprocessor):
+    global _worker_preprocessor
+    _worker_preprocessor = preprocessor
+
+
+def _featurize(preprocessor, smiles):
+    """Featurize one SMILES with `preprocessor`
+
+    Returns (tuple or None): (canonical_smiles, input_features) where
+        `input_features` is a tuple of arrays, or `None` when featurization
+        failed.
+    """
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        return None
+    try:
+        canonical_smiles, mol = preprocessor.prepare_smiles_and_mol(mol)
+        input_features = preprocessor.get_input_features(mol)
+    except MolFeatureExtractionError:
+        return None
+    except Exception:
+        # Unexpected error is treated as failure, same as parsers.
+        return None
+    return canonical_smiles, _to_tuple(input_features)
+
+
+def _featurize_chunk(smiles_chunk):
+    return [_featurize(_worker_preprocessor, smiles)
+            for smiles in smiles_chunk]
+
+
+class _SyncResult(object):
+    """`AsyncResult` compatible wrapper used when `n_workers=0`"""
+
+    def __init__(self, preprocessor, smiles_chunk):
+        self.preprocessor = preprocessor
+        self.smiles_chunk = smiles_chunk
+
+    def get(self):
+        return [_featurize(self.preprocessor, smiles)
+                for smiles in self.smiles_chunk]
+
+
+def _iter_chunks(smiles_iterable, chunksize):
+    chunk = []
+    for smiles in smiles_iterable:
+        chunk.append(smiles)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk
+
+
+class SmilesPredictionPipeline(object):
+
+    """Streams SMILES into model prediction with overlapped featurization
+
+    Featurization (RDKit parsing, canonicalization and
+    `preprocessor.get_input_features`) runs in `n_workers` processes, while
+    the main process assembles minibatches and runs the forward of
+    `predictor`. At most `max_pending_chunks` chunks are featurized ahead of
+    the forward, so memory usage is bounded regardless of the input size and
+    throughput approaches the slower of the two stages instead of their sum.
+
+    .. admonition:: Example
+
+       >>> from chainer_chemistry.dataset.preprocessors import NFPPreprocessor
+       >>> from chainer_chemistry.models.prediction.smiles_pipeline import SmilesPredictionPipeline  # NOQA
+       >>> pipeline = SmilesPredictionPipeline(
+       >>>     regressor.predictor, NFPPreprocessor(), batchsize=32)
+       >>> result = pipeline.predict(smiles_list, return_is_successful=True)
+       >>> result['prediction'], result['is_successful']
+
+    Args:
+        predictor (Callable): Function to forward, typically `predictor`
+            attribute of `Regressor` or `Classifier`. It takes the arrays
+            converted by `converter` and returns Variable.
+        preprocessor (MolPreprocessor): preprocessor instance. It must be
+            picklable when `n_workers` is positive.
+        batchsize (int): batch size of the forward.
+        converter (Callable): convert from list of features to `inputs`.
+        device (int): device id to which `converter` sends the minibatch.
+            -1 indicates to use in CPU.
+        n_workers (int or None): number of featurization processes.
+            If `None`, number of CPUs is used. If 0, featurization runs in the
+            main process without overlapping.
+        chunksize (int): number of SMILES sent to a worker at once.
+        max_pending_chunks (int or None): size of the bounded queue between
+            featurization and forward. If `None`, `2 * n_workers` is used.
+        postprocess_fn (Callable): Its input argument is Variable,
+            but this method may return either Variable, cupy.ndarray or
+            numpy.ndarray.
+        logger:
+    """
+
+    def __init__(self, predictor, preprocessor, batchsize=16,
+                 converter=concat_mols, device=-1, n_workers=None,
+                 chunksize=32, max_pending_chunks=None, postprocess_fn=None,
+                 logger=None):
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+        if n_workers < 0:
+            raise ValueError('n_workers must be non-negative, actual {}'
+                             .format(n_workers))
+        if chunksize <= 0:
+            raise ValueError('chunksize must be positive, actual {}'
+                             .format(chunksize))
+        if max_pending_chunks is None:
+            max_pending_chunks = max(2 * n_workers, 1)
+        if max_pending_chunks <= 0:
+            raise ValueError('max_pending_chunks must be positive, actual {}'
+                             .format(max_pending_chunks))
+        self.predictor = predictor
+        self.preprocessor = preprocessor
+        self.batchsize = batchsize
+        self.converter = converter
+        self.device = device
+        self.n_workers = n_workers
+        self.chunksize = chunksize
+        self.max_pending_chunks = max_pending_chunks
+        self.postprocess_fn = postprocess_fn
+        self.logger = logger or getLogger(__name__)
+
+    def _forward_batch(self, examples):
+        inputs = _to_tuple(self.converter(examples, self.device))
+        with chainer.no_backprop_mode(), chainer.using_config('train', False):
+            outputs = _to_tuple(self.predictor(*inputs))
+            if self.postprocess_fn:
+                outputs = _to_tuple(self.postprocess_fn(*outputs))
+        return tuple(_extract_numpy(output) for output in outputs)
+
+    def _submit(self, pool, chunk):
+        if pool is None:
+            return _SyncResult(self.preprocessor, chunk)
+        return pool.apply_async(_featurize_chunk, (chunk,))
+
+    def iter_predict(self, smiles_iterable):
+        """Predict SMILES in streaming manner
+
+        Args:
+            smiles_iterable: iterable of SMILES strings. It is consumed
+                lazily, so generator can be used for large input.
+
+        Yields (tuple): (`indices`, `smiles`, `outputs`) for each minibatch.
+            `indices` is 1-dim int array of the position of each example in
+            `smiles_iterable`, `smiles` is 1-dim array of canonical smiles and
+            `outputs` is a tuple of numpy arrays returned by the forward.
+            SMILES which failed to be featurized do not appear.
+        """
+        pool = None
+        if self.n_workers > 0:
+            pool = multiprocessing.Pool(
+                self.n_workers, initializer=_init_worker,
+                initargs=(self.preprocessor,))
+        try:
+            chunks = _iter_chunks(smiles_iterable, self.chunksize)
+            pending = deque()
+            offset = 0
+            buf_indices = []
+            buf_smiles = []
+            buf_features = []
+            exhausted = False
+            while True:
+                # --- Keep the bounded queue of featurization full ---
+                while not exhausted and len(pending) < self.max_pending_chunks:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    pending.append((offset, self._submit(pool, chunk)))
+                    offset += len(chunk)
+                if len(pending) == 0:
+                    break
+
+                # --- Collect the oldest chunk and forward full batches ---
+                start, async_result = pending.popleft()
+                for i, result in enumerate(async_result.get()):
+                    if result is None:
+                        continue
+                    buf_indices.append(start + i)
+                    buf_smiles.append(result[0])
+                    buf_features.append(result[1])
+                while len(buf_features) >= self.batchsize:
+                    n = self.batchsize
+                    yield (numpy.asarray(buf_indices[:n], dtype=numpy.int64),
+                           numpy.asarray(buf_smiles[:n]),
+                           self._forward_batch(buf_features[:n]))
+                    del buf_indices[:n], buf_smiles[:n], buf_features[:n]
+            if len(buf_features) > 0:
+                yield (numpy.asarray(buf_indices, dtype=numpy.int64),
+                       numpy.asarray(buf_smiles),
+                       self._forward_batch(buf_features))
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+    def predict(self, smiles_iterable, return_smiles=False,
+                return_is_successful=False):
+        """Predict all SMILES and concatenate the results
+
+        Args:
+            smiles_iterable: iterable of SMILES strings.
+            return_smiles (bool): If set to `True`, canonical smiles of
+                successfully featurized examples are returned in the key
+                'smiles'. If set to `False`, `None` is returned.
+            return_is_successful (bool): If set to `True`, boolean array is
+                returned in the key 'is_successful'. It represents
+                featurization has succeeded or not for each SMILES.
+                If set to `False`, `None` is returned.
+
+        Returns (dict): dictionary that contains forward result in the key
+            'prediction', which is numpy.ndarray or list of numpy.ndarray
+            when the forward returns multiple outputs.
+        """
+        # Count the input while it is consumed, without materializing it.
+        total_count = [0]
+
+        def _counted(iterable):
+            for s in iterable:
+                total_count[0] += 1
+                yield s
+
+        index_list = []
+        smiles_list = []
+        output_list = None
+        for indices, smileses, outputs in self.iter_predict(
+                _counted(smiles_iterable)):
+            if output_list is None:
+                output_list = [[] for _ in range(len(outputs))]
+            for j, output in enumerate(outputs):
+                output_list[j].append(output)
+            index_list.append(indices)
+            if return_smiles:
+                smiles_list.append(smileses)
+
+        if output_list is None:
+            result = None
+            success_indices = numpy.zeros((0,), dtype=numpy.int64)
+        else:
+            result = [numpy.concatenate(output) for output in output_list]
+            if len(result) == 1:
+                result = result[0]
+            success_indices = numpy.concatenate(index_list)
+        success_count = len(success_indices)
+        self.logger.info('Pipeline prediction finished. FAIL {}, SUCCESS {}, '
+                         'TOTAL {}'.format(total_count[0] - success_count,
+                                           success_count, total_count[0]))
+
+        smileses = None
+        if return_smiles:
+            if len(smiles_list) > 0:
+                smileses = numpy.concatenate(smiles_list)
+            else:
+                smileses = numpy.array([])
+        is_successful = None
+        if return_is_successful:
+            is_successful = numpy.zeros((total_count[0],), dtype=numpy.bool_)
+            is_successful[success_indices] = True
+        return {'prediction': result,
+                'smiles': smileses,
+                'is_successful': is_successful}
@@ -3,10 +3,12 @@ from chainer import cuda
 from chainer import functions
 
 from chainer_chemistry.config import MAX_ATOMIC_NUM
+from chainer_chemistry.functions import fold_adj
 from chainer_chemistry.links import EmbedAtomID
 from chainer_chemistry.links import GGNNReadout
 from chainer_chemistry.links import GraphLinear
 from chainer_chemistry.links import RelGCNUpdate
+from chainer_chemistry.models.static_graph import call_static_graph
 
 
 def rescale_adj(adj):
@@ -48,14 +50,25 @@ class RelGCN(chainer.Chain):
         n_atom_types (int): number of types of atoms
         input_type (str): type of input vector
         scale_adj (bool): If ``True``, then this network normalizes
-            adjacency matrix
+            adjacency matrix. Set ``False`` when the adjacency matrix is
+            already normalized, e.g. by
+            ``RelGCNPreprocessor(scale_adj=True)``.
+        use_static_graph (bool): If True, the computational graph is
+            recorded at the first call and replayed for the following
+            minibatches of the same shape, see
+            :mod:`chainer_chemistry.models.static_graph`. It cannot be
+            used with ``scale_adj=True``.
     """
 
     def __init__(self, out_channels=64, num_edge_type=4, ch_list=None,
                  n_atom_types=MAX_ATOMIC_NUM, input_type='int',
-                 scale_adj=False):
+                 scale_adj=False, use_static_graph=False):
 
         super(RelGCN, self).__init__()
+        if scale_adj and use_static_graph:
+            raise ValueError('use_static_graph cannot be used with '
+                             'scale_adj, normalize adj by '
+                             'RelGCNPreprocessor(scale_adj=True) instead')
         if ch_list is None:
             ch_list = [16, 128, 64]
         with self.init_scope():
@@ -76,24 +89,41 @@ class RelGCN(chainer.Chain):
         # self.num_relations = num_edge_type
         self.input_type = input_type
         self.scale_adj = scale_adj
+        self.use_static_graph = use_static_graph
 
     def __call__(self, x, adj):
         """
 
         Args:
             x: (batchsize, num_nodes, in_channels)
-            adj: (batchsize, num_edge_type, num_nodes, num_nodes)
+            adj: (batchsize, num_edge_type, num_nodes, num_nodes), or
+                folded one of shape
+                (batchsize, num_nodes, num_edge_type * num_nodes)
 
         Returns: (batchsize, out_channels)
 
         """
+        if self.use_static_graph:
+            return call_static_graph(self, self._forward, x, adj)
+        return self._forward(x, adj)
+
+    def static_forward(self, x, adj):
+        return self._forward(x, adj)
+
+    def _forward(self, x, adj):
         if x.dtype == self.xp.int32:
             assert self.input_type == 'int'
         else:
             assert self.input_type == 'float'
         h = self.embed(x)  # (minibatch, max_num_atoms)
-        if self.scale_adj:
-            adj = rescale_adj(adj)
+        if adj.ndim == 4:
+            if self.scale_adj:
+                adj = rescale_adj(adj)
+            # Fold once, which is shared by all the layers
+            adj = fold_adj(adj)
+        elif self.scale_adj:
+            raise ValueError('folded adj cannot be rescaled, rescale it '
+                             'before folding')
         for rgcn_conv in self.rgcn_convs:
             h = functions.tanh(rgcn_conv(h, adj))
         h = self.rgcn_readout(h)
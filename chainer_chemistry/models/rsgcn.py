@@ -9,11 +9,13 @@ See: Thomas N. Kipf and Max Welling, \
 import chainer
 from chainer import functions
 from chainer import Variable
+import scipy.sparse
 
 import chainer_chemistry
 from chainer_chemistry.config import MAX_ATOMIC_NUM
 from chainer_chemistry.functions import GeneralReadout
 from chainer_chemistry.links import RSGCNUpdate
+from chainer_chemistry.models.static_graph import call_static_graph
 
 
 class RSGCN(chainer.Chain):
@@ -45,12 +47,20 @@ class RSGCN(chainer.Chain):
             not give any suggestion on readout.
         dropout_ratio (float): ratio used in dropout function.
             If 0 or negative value is set, dropout function is skipped.
+        use_static_graph (bool): If True, the computational graph is
+            recorded at the first call and replayed for the following
+            minibatches of the same shape, see
+            :mod:`chainer_chemistry.models.static_graph`. In training
+            mode, it is used only when neither dropout nor batch
+            normalization is used, since they are not replayed correctly.
+            Sparse ``adj`` is always computed in define-by-run manner.
 
     """
 
     def __init__(self, out_dim, hidden_dim=32, n_layers=4,
                  n_atom_types=MAX_ATOMIC_NUM,
-                 use_batch_norm=False, readout=None, dropout_ratio=0.5):
+                 use_batch_norm=False, readout=None, dropout_ratio=0.5,
+                 use_static_graph=False):
         super(RSGCN, self).__init__()
         in_dims = [hidden_dim for _ in range(n_layers)]
         out_dims = [hidden_dim for _ in range(n_layers)]
@@ -75,6 +85,8 @@ class RSGCN(chainer.Chain):
         self.hidden_dim = hidden_dim
         self.n_layers = n_layers
         self.dropout_ratio = dropout_ratio
+        self.use_batch_norm = use_batch_norm
+        self.use_static_graph = use_static_graph
 
     def __call__(self, graph, adj):
         """Forward propagation
@@ -86,24 +98,45 @@ class RSGCN(chainer.Chain):
                 molecule's `atom_index`-th atomic number
             adj (numpy.ndarray): minibatch of adjancency matrix
                 `adj[mol_index]` represents `mol_index`-th molecule's
-                adjacency matrix
+                adjacency matrix. Sparse block diagonal adjacency matrix
+                given by `concat_mols_with_sparse_adj` is also accepted.
 
         Returns:
             ~chainer.Variable: minibatch of fingerprint
         """
+        # Dropout masks and batch statistics are not replayed correctly in
+        # training mode.
+        if self.use_static_graph and (not chainer.config.train or (
+                self.dropout_ratio <= 0. and not self.use_batch_norm)):
+            return call_static_graph(self, self._forward, graph, adj)
+        return self._forward(graph, adj)
+
+    def static_forward(self, graph, adj):
+        # adj is not wrapped again, so that it is recorded as the input.
+        return self._propagate(self._embed(graph), adj)
+
+    def _embed(self, graph):
         if graph.dtype == self.xp.int32:
             # atom_array: (minibatch, nodes)
             h = self.embed(graph)
         else:
             h = graph
         # h: (minibatch, nodes, ch)
+        return h
 
-        if isinstance(adj, Variable):
-            w_adj = adj.data
+    def _forward(self, graph, adj):
+        h = self._embed(graph)
+        if scipy.sparse.issparse(adj):
+            w_adj = adj.tocsr()
         else:
-            w_adj = adj
-        w_adj = Variable(w_adj, requires_grad=False)
+            if isinstance(adj, Variable):
+                w_adj = adj.data
+            else:
+                w_adj = adj
+            w_adj = Variable(w_adj, requires_grad=False)
+        return self._propagate(h, w_adj)
 
+    def _propagate(self, h, w_adj):
         # --- RSGCN update ---
         for i, (gconv, bnorm) in enumerate(zip(self.gconvs,
                                                self.bnorms)):
@@ -28,16 +28,24 @@ class SchNet(chainer.Chain):
         n_atom_types (int): number of types of atoms
         concat_hidden (bool): If set to True, readout is executed in each layer
             and the result is concatenated
+        cutoff (float or None): If specified, interactions are computed only
+            between atoms within this radius, smoothed by cosine cutoff.
+            See `CFConv`.
+        chunk_size (int or None): If specified, interactions are computed
+            for this number of atoms at a time to bound memory. See
+            `CFConv`.
     """
 
     def __init__(self, out_dim=1, hidden_dim=64, n_layers=3,
                  readout_hidden_dim=32, n_atom_types=MAX_ATOMIC_NUM,
-                 concat_hidden=False):
+                 concat_hidden=False, cutoff=None, chunk_size=None):
         super(SchNet, self).__init__()
         with self.init_scope():
             self.embed = EmbedAtomID(out_size=hidden_dim, in_size=n_atom_types)
             self.update_layers = chainer.ChainList(
-                *[SchNetUpdate(hidden_dim) for _ in range(n_layers)])
+                *[SchNetUpdate(hidden_dim, cutoff=cutoff,
+                               chunk_size=chunk_size)
+                  for _ in range(n_layers)])
             self.readout_layer = SchNetReadout(out_dim, readout_hidden_dim)
         self.out_dim = out_dim
         self.hidden_dim = hidden_dim
@@ -0,0 +1,85 @@
+"""Static graph fast path of models
+
+Padded minibatches of a fixed `out_size` run the same computational graph
+every iteration, while Chainer builds it again in define-by-run manner. With
+`chainer.graph_optimizations.static_graph`, the functions called in the
+first iteration are recorded as a static schedule, and it is replayed in the
+following iterations without the Python overhead to build the graph.
+
+The recorded schedule only replays `FunctionNode` calls, so the code of
+`static_forward` of each model must compute everything which depends on the
+inputs by Chainer functions, e.g. it must not compute masks or indices from
+`adj.array` by numpy. Functions which return their input array as it is,
+e.g. `functions.copy` on the same device, cannot be recorded either.
+"""
+import chainer
+from chainer import cuda
+import numpy
+
+_static_call = None
+
+
+def _forward_outputs(chain, *args):
+    outputs = chain.static_forward(*args)
+    # The backward of a function which retains its output, e.g. tanh, is not
+    # replayed correctly when its output is returned as it is, so that the
+    # outputs are always computed by a function which allocates new arrays.
+    if isinstance(outputs, tuple):
+        return tuple(y + 0 for y in outputs)
+    return outputs + 0
+
+
+def _get_static_call():
+    # static_graph is imported lazily, since it is available from Chainer v5
+    # and the models are used without it on older versions.
+    global _static_call
+    if _static_call is None:
+        try:
+            from chainer.graph_optimizations.static_graph import static_graph  # NOQA
+        except ImportError:
+            raise ImportError('use_static_graph requires Chainer v5 or '
+                              'later, actual {}'.format(chainer.__version__))
+        _static_call = static_graph(_forward_outputs)
+    return _static_call
+
+
+def _signature(args):
+    signature = []
+    for x in args:
+        if isinstance(x, chainer.Variable):
+            x = x.array
+        if not isinstance(x, (numpy.ndarray, cuda.ndarray)):
+            return None
+        signature.append((x.shape, x.dtype))
+    return tuple(signature)
+
+
+def call_static_graph(chain, forward, *args):
+    """Call `chain.static_forward` as a static graph if possible
+
+    The static schedule is recorded for the shapes and dtypes of the inputs
+    of the first call. When they are different, e.g. in the last minibatch
+    of an epoch, or the inputs are not arrays, e.g. sparse matrices, it falls
+    back to `forward` in define-by-run manner.
+
+    As `chainer.graph_optimizations.static_graph` requires, backward must be
+    performed after each forward in training mode. Otherwise, call
+    `chain.schedule_manager.end_forward()` after each forward.
+
+    It requires Chainer v5 or later, otherwise ``ImportError`` is raised.
+
+    Args:
+        chain (chainer.Chain): model which implements `static_forward`.
+        forward (callable): define-by-run forward of the model.
+        *args: inputs of the model.
+
+    Returns:
+        outputs of `chain.static_forward` or `forward`.
+    """
+    signature = _signature(args)
+    static_signature = getattr(chain, '_static_graph_signature', None)
+    if signature is None or static_signature not in (None, signature):
+        return forward(*args)
+    static_call = _get_static_call()
+    chain._static_graph_signature = signature
+    return static_call(chain, *args)
@@ -1,3 +1,5 @@
+import math
+
 import chainer
 from chainer import functions
 from chainer import links
@@ -31,8 +33,37 @@ class LinearLayer(chainer.Chain):
         return x
 
 
+def _n_atom_from_n_pair(n_pair):
+    n_atom = int(round(math.sqrt(n_pair)))
+    if n_atom * n_atom != n_pair:
+        raise ValueError('number of pairs {} must be square of number of '
+                         'atoms'.format(n_pair))
+    return n_atom
+
+
 class AtomToPair(chainer.Chain):
-    def __init__(self, n_channel, n_layer, n_atom):
+    """Computes pair features from atom features
+
+    The pair feature of atoms (i, j) is the sum of the outputs of the linear
+    stack for concatenation of atom features in both orders, (x_i, x_j) and
+    (x_j, x_i).
+
+    In the factorized path, the first layer is applied to each atom instead
+    of each pair, since the first linear layer of the concatenation is sum of
+    the projections of x_i and x_j. Also the output for (x_j, x_i) is the
+    transpose of the output for (x_i, x_j), so the rest of the stack is
+    evaluated only once.
+
+    Args:
+        n_channel (int): output dimension.
+        n_layer (int): number of linear layers.
+        n_atom (int or None): not used, the number of atoms is given by the
+            input. It is kept for backward compatibility.
+        factorized (bool): If True, the factorized path is used. Otherwise,
+            the concatenated pair features are materialized.
+    """
+
+    def __init__(self, n_channel, n_layer, n_atom=None, factorized=True):
         super(AtomToPair, self).__init__()
         with self.init_scope():
             self.linear_layers = chainer.ChainList(
@@ -40,8 +71,41 @@ class AtomToPair(chainer.Chain):
             )
         self.n_atom = n_atom
         self.n_channel = n_channel
+        self.factorized = factorized
 
     def forward(self, x):
+        if self.factorized:
+            return self._forward_factorized(x)
+        return self._forward_concat(x)
+
+    def _forward_factorized(self, x):
+        n_batch, n_atom, n_feature = x.shape
+        first = self.linear_layers[0]
+        if first.W.array is None:
+            first._initialize_params(n_feature * 2)
+        x = functions.reshape(x, (n_batch * n_atom, n_feature))
+        # First layer for (x_i, x_j): W_0 x_i + W_1 x_j + b
+        w0, w1 = functions.split_axis(first.W, 2, axis=1)
+        h0 = functions.linear(x, w0)
+        h1 = functions.linear(x, w1, first.b)
+        shape = (n_batch, n_atom, n_atom, self.n_channel)
+        h0 = functions.broadcast_to(functions.reshape(
+            h0, (n_batch, n_atom, 1, self.n_channel)), shape)
+        h1 = functions.broadcast_to(functions.reshape(
+            h1, (n_batch, 1, n_atom, self.n_channel)), shape)
+        pair_x = functions.relu(h0 + h1)
+        pair_x = functions.reshape(
+            pair_x, (n_batch * n_atom * n_atom, self.n_channel))
+        for l in self.linear_layers[1:]:
+            pair_x = l(pair_x)
+            pair_x = functions.relu(pair_x)
+        pair_x = functions.reshape(pair_x, shape)
+        # Output for (x_j, x_i) is the transpose of that for (x_i, x_j)
+        pair_x = pair_x + functions.transpose(pair_x, (0, 2, 1, 3))
+        return functions.reshape(pair_x,
+                                 (n_batch, n_atom * n_atom, self.n_channel))
+
+    def _forward_concat(self, x):
         n_batch, n_atom, n_feature = x.shape
         atom_repeat = functions.reshape(x, (n_batch, 1, n_atom, n_feature))
         atom_repeat = functions.broadcast_to(
@@ -76,7 +140,7 @@ class AtomToPair(chainer.Chain):
 
 
 class PairToAtom(chainer.Chain):
-    def __init__(self, n_channel, n_layer, n_atom, mode='sum'):
+    def __init__(self, n_channel, n_layer, n_atom=None, mode='sum'):
         super(PairToAtom, self).__init__()
         with self.init_scope():
             self.linearLayer = chainer.ChainList(
@@ -89,13 +153,12 @@ class PairToAtom(chainer.Chain):
 
     def forward(self, x):
         n_batch, n_pair, n_feature = x.shape
-        a = functions.reshape(
-            x, (n_batch * (self.n_atom * self.n_atom), n_feature))
+        n_atom = _n_atom_from_n_pair(n_pair)
+        a = functions.reshape(x, (n_batch * n_pair, n_feature))
         for l in self.linearLayer:
             a = l(a)
             a = functions.relu(a)
-        a = functions.reshape(a, (n_batch, self.n_atom, self.n_atom,
-                                  self.n_channel))
+        a = functions.reshape(a, (n_batch, n_atom, n_atom, self.n_channel))
         a = self.readout(a, axis=2)
         return a
 
@@ -103,14 +166,15 @@ class PairToAtom(chainer.Chain):
 class WeaveModule(chainer.Chain):
 
     def __init__(self, n_atom, output_channel, n_sub_layer,
-                 readout_mode='sum'):
+                 readout_mode='sum', factorized=True):
         super(WeaveModule, self).__init__()
         with self.init_scope():
             self.atom_layer = LinearLayer(output_channel, n_sub_layer)
             self.pair_layer = LinearLayer(output_channel, n_sub_layer)
             self.atom_to_atom = LinearLayer(output_channel, n_sub_layer)
             self.pair_to_pair = LinearLayer(output_channel, n_sub_layer)
-            self.atom_to_pair = AtomToPair(output_channel, n_sub_layer, n_atom)
+            self.atom_to_pair = AtomToPair(output_channel, n_sub_layer, n_atom,
+                                           factorized=factorized)
             self.pair_to_atom = PairToAtom(output_channel, n_sub_layer, n_atom,
                                            mode=readout_mode)
         self.n_atom = n_atom
@@ -141,20 +205,29 @@ class WeaveNet(chainer.Chain):
         weave_channels (list): list of int, output dimension for each weave
             module
         hidden_dim (int): hidden dim
-        n_atom (int): number of atom of input array
+        n_atom (int): number of atom of input array. It is not used, since
+            the number of atoms is given by the input of each minibatch.
+            It is kept for backward compatibility.
         n_sub_layer (int): number of layer for each `AtomToPair`, `PairToAtom`
             layer
         n_atom_types (int): number of atom id
         readout_mode (str): 'sum' or 'max' or 'summax'
+        factorized (bool): If True, `AtomToPair` evaluates the first layer
+            per atom instead of per pair. See `AtomToPair`.
+
+    The pair feature `pair_x` is an array of shape (minibatch, atom * atom,
+    feature) or (minibatch, atom, atom, feature), so the number of atoms can
+    vary between minibatches.
     """
 
     def __init__(self, weave_channels=None, hidden_dim=16,
                  n_atom=WEAVE_DEFAULT_NUM_MAX_ATOMS,
                  n_sub_layer=1, n_atom_types=MAX_ATOMIC_NUM,
-                 readout_mode='sum'):
+                 readout_mode='sum', factorized=True):
         weave_channels = weave_channels or WEAVENET_DEFAULT_WEAVE_CHANNELS
         weave_module = [
-            WeaveModule(n_atom, c, n_sub_layer, readout_mode=readout_mode)
+            WeaveModule(n_atom, c, n_sub_layer, readout_mode=readout_mode,
+                        factorized=factorized)
             for c in weave_channels
         ]
 
@@ -169,6 +242,11 @@ class WeaveNet(chainer.Chain):
         if atom_x.dtype == self.xp.int32:
             # atom_array: (minibatch, atom)
             atom_x = self.embed(atom_x)
+        if pair_x.ndim == 4:
+            # pair_x: (minibatch, atom, atom, feature)
+            n_batch, n_atom, _, n_feature = pair_x.shape
+            pair_x = functions.reshape(
+                pair_x, (n_batch, n_atom * n_atom, n_feature))
 
         for i in range(len(self.weave_module)):
             if i == len(self.weave_module) - 1:
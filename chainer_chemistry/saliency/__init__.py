@@ -1,2 +1,9 @@
-from chainer_chemistry.saliency import calculator  # NOQA
-from chainer_chemistry.saliency import visualizer  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
+
+
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'calculator',
+        'visualizer',
+    ])
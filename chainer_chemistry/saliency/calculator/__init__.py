@@ -1,12 +1,19 @@
-from chainer_chemistry.saliency.calculator import base_calculator  # NOQA
-from chainer_chemistry.saliency.calculator import calculator_utils  # NOQA
-from chainer_chemistry.saliency.calculator import gradient_calculator  # NOQA
-from chainer_chemistry.saliency.calculator import integrated_gradients_calculator  # NOQA
-from chainer_chemistry.saliency.calculator import occlusion_calculator  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
 
-from chainer_chemistry.saliency.calculator.base_calculator import BaseCalculator  # NOQA
-from chainer_chemistry.saliency.calculator.gradient_calculator import GradientCalculator  # NOQA
-from chainer_chemistry.saliency.calculator.integrated_gradients_calculator import IntegratedGradientsCalculator  # NOQA
-from chainer_chemistry.saliency.calculator.occlusion_calculator import OcclusionCalculator  # NOQA
 
-from chainer_chemistry.saliency.calculator.calculator_utils import GaussianNoiseSampler  # NOQA
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'base_calculator',
+        'calculator_utils',
+        'gradient_calculator',
+        'integrated_gradients_calculator',
+        'occlusion_calculator',
+    ],
+    attributes={
+        'BaseCalculator': 'chainer_chemistry.saliency.calculator.base_calculator',  # NOQA
+        'GradientCalculator': 'chainer_chemistry.saliency.calculator.gradient_calculator',  # NOQA
+        'IntegratedGradientsCalculator': 'chainer_chemistry.saliency.calculator.integrated_gradients_calculator',  # NOQA
+        'OcclusionCalculator': 'chainer_chemistry.saliency.calculator.occlusion_calculator',  # NOQA
+        'GaussianNoiseSampler': 'chainer_chemistry.saliency.calculator.calculator_utils',  # NOQA
+    })
@@ -46,6 +46,68 @@ def _concat(batch_list):
         return _concat_arrays_with_padding(elem_list, padding=0)
 
 
+def _concat_samples(batch_list):
+    """Concatenate arrays of shape (M, batchsize, ...) along batch axis"""
+    h = _concat([numpy.swapaxes(batch, 0, 1) for batch in batch_list])
+    return numpy.swapaxes(h, 0, 1)
+
+
+def _replicate(x, n):
+    """Replicate `x` for `n` times along batch axis"""
+    if isinstance(x, chainer.Variable):
+        x = x.array
+    xp = cuda.get_array_module(x)
+    return xp.concatenate([x] * n, axis=0)
+
+
+def _transform(saliency_arrays, method, ch_axis):
+    """Transform saliency samples by `method` and reduce `ch_axis`"""
+    if method == 'raw':
+        h = saliency_arrays  # do nothing
+    elif method == 'abs':
+        h = numpy.abs(saliency_arrays)
+    elif method == 'square':
+        h = saliency_arrays ** 2
+    else:
+        raise ValueError("[ERROR] Unexpected value method={}"
+                         .format(method))
+
+    if ch_axis is not None:
+        h = numpy.sum(h, axis=ch_axis)
+    return h
+
+
+class _RunningMoments(object):
+
+    """Running mean and variance along sampling axis (Welford's algorithm)
+
+    Chunk of samples is merged at once by Chan et al.'s parallel algorithm.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+
+    def update(self, samples):
+        n = samples.shape[_sampling_axis]
+        samples = samples.astype(numpy.float64)
+        batch_mean = samples.mean(axis=_sampling_axis)
+        batch_m2 = ((samples - batch_mean) ** 2).sum(axis=_sampling_axis)
+        if self.count == 0:
+            self.mean = batch_mean
+            self.m2 = batch_m2
+        else:
+            total = self.count + n
+            delta = batch_mean - self.mean
+            self.mean += delta * (float(n) / total)
+            self.m2 += batch_m2 + delta ** 2 * (float(self.count) * n / total)
+        self.count += n
+
+    def std(self):
+        return numpy.sqrt(self.m2 / self.count)
+
+
 def add_linkhook(linkhook, prefix='', logger=None):
     link_hooks = chainer._get_link_hooks()
     name = prefix + linkhook.name
@@ -115,7 +177,8 @@ class BaseCalculator(object):
     def compute(self, data, M=1, batchsize=16,
                 converter=concat_examples, retain_inputs=False,
                 preprocess_fn=None, postprocess_fn=None, train=False,
-                noise_sampler=None, show_progress=True):
+                noise_sampler=None, show_progress=True,
+                sample_chunksize=None):
         """computes saliency_samples
 
         Args:
@@ -136,23 +199,94 @@ class BaseCalculator(object):
                 used to calculate SmoothGrad.
                 If `None`, noise is not sampled.
             show_progress (bool): Show progress bar or not.
+            sample_chunksize (int or None): If specified, each minibatch is
+                replicated `sample_chunksize` times along batch axis, and
+                that many samples are computed by one forward/backward with
+                noise or dropout masks drawn at once. The dataset is iterated
+                `ceil(M / sample_chunksize)` times instead of `M` times.
+                It assumes that each example in a minibatch is computed
+                independently, e.g. batch normalization in train mode breaks
+                this assumption.
 
         Returns:
             saliency_samples (numpy.ndarray): M samples of saliency array.
                 Its shape is (M,) + target_var.shape, i.e., sampling axis is
                 added to the first axis.
         """
-        saliency_list = []
-        for _ in tqdm(range(M), disable=not show_progress):
+        saliency_list = list(self._iter_samples(
+            data, M=M, sample_chunksize=sample_chunksize, train=train,
+            show_progress=show_progress, batchsize=batchsize,
+            converter=converter, retain_inputs=retain_inputs,
+            preprocess_fn=preprocess_fn, postprocess_fn=postprocess_fn,
+            noise_sampler=noise_sampler))
+        return numpy.concatenate(saliency_list, axis=_sampling_axis)
+
+    def _iter_samples(self, data, M, sample_chunksize, train, show_progress,
+                      **kwargs):
+        """Yields saliency samples whose first axis is sampling axis
+
+        `M` samples are yielded one by one if `sample_chunksize` is None,
+        otherwise by chunk of `sample_chunksize` samples.
+        """
+        if sample_chunksize is None:
+            chunk_sizes = [None] * M
+        elif sample_chunksize <= 0:
+            raise ValueError('sample_chunksize must be positive, actual {}'
+                             .format(sample_chunksize))
+        else:
+            chunk_sizes = [min(sample_chunksize, M - start)
+                           for start in range(0, M, sample_chunksize)]
+        for n_replicas in tqdm(chunk_sizes, disable=not show_progress):
             with chainer.using_config('train', train):
-                saliency = self._forward(
-                    data, batchsize=batchsize,
-                    converter=converter,
-                    retain_inputs=retain_inputs, preprocess_fn=preprocess_fn,
-                    postprocess_fn=postprocess_fn, noise_sampler=noise_sampler)
-            saliency_array = cuda.to_cpu(saliency)
-            saliency_list.append(saliency_array)
-        return numpy.stack(saliency_list, axis=_sampling_axis)
+                saliency = self._forward(data, n_replicas=n_replicas,
+                                         **kwargs)
+            saliency = cuda.to_cpu(saliency)
+            if n_replicas is None:
+                saliency = numpy.expand_dims(saliency, axis=_sampling_axis)
+            yield saliency
+
+    def compute_aggregate(self, data, M=1, method='raw', ch_axis=None,
+                          return_std=False, batchsize=16,
+                          converter=concat_examples, retain_inputs=False,
+                          preprocess_fn=None, postprocess_fn=None,
+                          train=False, noise_sampler=None, show_progress=True,
+                          sample_chunksize=None):
+        """computes and aggregates saliency without storing all samples
+
+        It returns same saliency with `aggregate(compute(data, M), method,
+        ch_axis)`, but each sample is reduced into running mean and variance
+        (Welford's algorithm) as soon as it is computed. Extra memory does
+        not depend on `M`.
+
+        Args:
+            data: dataset to calculate saliency
+            M (int): sampling size.
+            method (str): aggregation method, 'raw', 'abs' or 'square'.
+                See `aggregate`.
+            ch_axis (int, tuple or None): channel axis. See `aggregate`.
+            return_std (bool): If `True`, standard deviation of the samples
+                after the `method` and `ch_axis` reduction is also returned
+                as an uncertainty map of the saliency.
+            sample_chunksize (int or None): number of samples computed at
+                once. See `compute`.
+            Other arguments are same with `compute`.
+
+        Returns:
+            saliency (numpy.ndarray): saliency score. If `return_std` is
+                `True`, tuple of saliency score and its standard deviation.
+        """
+        moments = _RunningMoments()
+        for saliency in self._iter_samples(
+                data, M=M, sample_chunksize=sample_chunksize, train=train,
+                show_progress=show_progress, batchsize=batchsize,
+                converter=converter, retain_inputs=retain_inputs,
+                preprocess_fn=preprocess_fn, postprocess_fn=postprocess_fn,
+                noise_sampler=noise_sampler):
+            moments.update(_transform(saliency, method, ch_axis))
+        mean = moments.mean.astype(saliency.dtype)
+        if return_std:
+            return mean, moments.std().astype(saliency.dtype)
+        return mean
 
     def aggregate(self, saliency_arrays, method='raw', ch_axis=None):
         """Aggregate saliency samples into one saliency score.
@@ -170,18 +304,7 @@ class BaseCalculator(object):
         Returns:
             saliency (numpy.ndarray): saliency score
         """
-        if method == 'raw':
-            h = saliency_arrays  # do nothing
-        elif method == 'abs':
-            h = numpy.abs(saliency_arrays)
-        elif method == 'square':
-            h = saliency_arrays ** 2
-        else:
-            raise ValueError("[ERROR] Unexpected value method={}"
-                             .format(method))
-
-        if ch_axis is not None:
-            h = numpy.sum(h, axis=ch_axis)
+        h = _transform(saliency_arrays, method, ch_axis)
         sampling_axis = _sampling_axis
         return numpy.mean(h, axis=sampling_axis)
 
@@ -222,7 +345,8 @@ class BaseCalculator(object):
 
     def _forward(self, data, batchsize=16,
                  converter=concat_examples, retain_inputs=False,
-                 preprocess_fn=None, postprocess_fn=None, noise_sampler=None):
+                 preprocess_fn=None, postprocess_fn=None, noise_sampler=None,
+                 n_replicas=None):
         """Forward data by iterating with batch
 
         Args:
@@ -237,6 +361,9 @@ class BaseCalculator(object):
             postprocess_fn (Callable): Its input argument is Variable,
                 but this method may return either Variable, cupy.ndarray or
                 numpy.ndarray.
+            n_replicas (int or None): If specified, each minibatch is
+                replicated `n_replicas` times along batch axis, and the
+                result has sampling axis of size `n_replicas` at first.
 
         Returns (tuple or numpy.ndarray): forward result
         """
@@ -259,6 +386,10 @@ class BaseCalculator(object):
                 inputs = preprocess_fn(*inputs)
                 inputs = _to_tuple(inputs)
 
+            if retain_inputs:
+                original_inputs = [_extract_numpy(x) for x in inputs]
+            if n_replicas is not None:
+                inputs = [_replicate(x, n_replicas) for x in inputs]
             inputs = [_to_variable(x) for x in inputs]
 
             # --- Main saliency computation ----
@@ -287,8 +418,8 @@ class BaseCalculator(object):
             if retain_inputs:
                 if input_list is None:
                     input_list = [[] for _ in range(len(inputs))]
-                for j, input in enumerate(inputs):
-                    input_list[j].append(cuda.to_cpu(input))
+                for j, input in enumerate(original_inputs):
+                    input_list[j].append(input)
 
             if output_list is None:
                 output_list = [[] for _ in range(len(outputs))]
@@ -297,7 +428,11 @@ class BaseCalculator(object):
                 outputs = postprocess_fn(*outputs)
                 outputs = _to_tuple(outputs)
             for j, output in enumerate(outputs):
-                output_list[j].append(_extract_numpy(output))
+                output = _extract_numpy(output)
+                if n_replicas is not None:
+                    output = output.reshape((n_replicas, -1) +
+                                            output.shape[1:])
+                output_list[j].append(output)
 
         if isinstance(self.target_extractor, LinkHook):
             delete_linkhook(self.target_extractor, prefix='/saliency/target/',
@@ -310,7 +445,10 @@ class BaseCalculator(object):
             self.inputs = [numpy.concatenate(
                 in_array) for in_array in input_list]
 
-        result = [_concat(output) for output in output_list]
+        if n_replicas is None:
+            result = [_concat(output) for output in output_list]
+        else:
+            result = [_concat_samples(output) for output in output_list]
         if len(result) == 1:
             return result[0]
         else:
@@ -1,3 +1,5 @@
+from chainer import cuda
+
 from chainer_chemistry.saliency.calculator.base_calculator import BaseCalculator  # NOQA
 
 
@@ -46,6 +48,11 @@ class GradientCalculator(BaseCalculator):
         target_var = self.get_target_var(inputs)
         target_var.grad = None  # Need to reset grad beforehand of backward.
         output_var = self.get_output_var(outputs)
+        if output_var.grad is None and output_var.size > 1:
+            # Each example in the minibatch is computed independently, so
+            # the gradient of sum is the gradient of each output.
+            xp = cuda.get_array_module(output_var.array)
+            output_var.grad = xp.ones_like(output_var.array)
 
         output_var.backward(retain_grad=True)
         saliency = target_var.grad
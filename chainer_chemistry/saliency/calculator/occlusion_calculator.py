@@ -3,6 +3,7 @@ import six
 
 import chainer
 from chainer import cuda
+import numpy
 
 from chainer_chemistry.saliency.calculator.base_calculator import BaseCalculator  # NOQA
 
@@ -44,10 +45,23 @@ class OcclusionCalculator(BaseCalculator):
         slide_axis (int or tuple): slide axis which occlusion window moves.
         device (int or None): device id to calculate saliency.
             If `None`, device id is inferred automatically from `model`.
+        window_batchsize (int or None): If specified, occluded variants of
+            the minibatch for many window positions are stacked along batch
+            axis, and `window_batchsize` variants are evaluated in one
+            forward. If `None` and `atom_mask` is also `None`, each window
+            position is evaluated one by one.
+        atom_mask (callable or None): If specified, only real atoms are
+            occluded one by one and padded atoms are skipped (atom-mask
+            mode). It receives input arrays of the minibatch and returns
+            boolean array of shape (batchsize, atom) which is `True` for real
+            atoms, e.g. `lambda atom_array, adj: atom_array != 0`.
+            `slide_axis` must be the atom axis and `size` must be 1.
+            Saliency of padded atoms is 0.
     """
     def __init__(self, model, target_extractor=None, output_extractor=None,
                  eval_fun=None, device=None,
-                 enable_backprop=False, size=1, slide_axis=(2, 3)):
+                 enable_backprop=False, size=1, slide_axis=(2, 3),
+                 window_batchsize=None, atom_mask=None):
         super(OcclusionCalculator, self).__init__(
             model, target_extractor=target_extractor,
             output_extractor=output_extractor, device=device)
@@ -59,8 +73,20 @@ class OcclusionCalculator(BaseCalculator):
         if len(self.slide_axis) != size:
             size = size * len(self.slide_axis)
         self.size = size
+        if window_batchsize is not None and window_batchsize <= 0:
+            raise ValueError('window_batchsize must be positive, actual {}'
+                             .format(window_batchsize))
+        if atom_mask is not None and (len(self.slide_axis) != 1 or
+                                      self.size[0] != 1):
+            raise ValueError('atom_mask requires single slide_axis and '
+                             'size=1, actual slide_axis={} size={}'
+                             .format(self.slide_axis, self.size))
+        self.window_batchsize = window_batchsize
+        self.atom_mask = atom_mask
 
     def _compute_core(self, *inputs):
+        if self.window_batchsize is not None or self.atom_mask is not None:
+            return self._compute_core_batched(*inputs)
         # Usually, backward() is not necessary for calculating occlusion
         with chainer.using_config('enable_backprop', self.enable_backprop):
             original_result = self.eval_fun(*inputs)
@@ -121,9 +147,83 @@ class OcclusionCalculator(BaseCalculator):
 
             occluded_score = self.get_output_var(occluded_result)
             score_diff_var = original_score - occluded_score  # (bs, 1)
-            # expand_dim for ch_axis
+            # expand_dim for ch_axis, broadcasted to the occlusion window
             score_diff = xp.reshape(score_diff_var.array,
-                                    occlusion_window_shape)
+                                    (batch_size,) + (1,) * (target_dim - 1))
             occlusion_scores[occlude_index] += score_diff
         outputs = (occlusion_scores,)
         return outputs
+
+    def _window_index(self, ndim, start_indices):
+        """Index of the occlusion window except batch axis"""
+        index = [slice(None)] * (ndim - 1)
+        for axis, size, start in zip(self.slide_axis, self.size,
+                                     start_indices):
+            index[axis - 1] = slice(start, start + size, 1)
+        return tuple(index)
+
+    def _compute_core_batched(self, *inputs):
+        with chainer.using_config('enable_backprop', self.enable_backprop):
+            original_result = self.eval_fun(*inputs)
+        target_var = self.get_target_var(inputs)
+        original_target_array = target_var.array.copy()
+        original_score = self.get_output_var(original_result).array
+
+        xp = cuda.get_array_module(original_target_array)
+        value = 0.
+        target_dim = original_target_array.ndim
+        batch_size = original_target_array.shape[0]
+        occlusion_scores_shape = [1] * target_dim
+        occlusion_scores_shape[0] = batch_size
+        for axis in self.slide_axis:
+            occlusion_scores_shape[axis] = original_target_array.shape[axis]
+        occlusion_scores = xp.zeros(occlusion_scores_shape, dtype=xp.float32)
+
+        # --- List up occluded variants as (example index, window start) ---
+        if self.atom_mask is None:
+            end_list = [original_target_array.shape[axis] - size + 1
+                        for axis, size in zip(self.slide_axis, self.size)]
+            variants = [(b, start) for start in itertools.product(
+                *[six.moves.range(end) for end in end_list])
+                for b in six.moves.range(batch_size)]
+        else:
+            mask = self.atom_mask(*[x.array for x in inputs])
+            mask = numpy.asarray(cuda.to_cpu(mask), dtype=bool)
+            variants = [(b, (atom,)) for b, atom in zip(*numpy.nonzero(mask))]
+        chunksize = self.window_batchsize or max(len(variants), 1)
+
+        for i in six.moves.range(0, len(variants), chunksize):
+            chunk = variants[i:i + chunksize]
+            example_index = xp.asarray([b for b, _ in chunk], dtype=xp.int32)
+            occluded_array = original_target_array[example_index]
+            for j, (_, start) in enumerate(chunk):
+                occluded_array[(j,) + self._window_index(
+                    target_dim, start)] = value
+            chunk_inputs = [chainer.Variable(x.array[example_index])
+                            for x in inputs]
+
+            if self.target_extractor is None:
+                chunk_inputs[0] = chainer.Variable(occluded_array)
+                with chainer.using_config('enable_backprop',
+                                          self.enable_backprop):
+                    occluded_result = self.eval_fun(*chunk_inputs)
+            else:
+                def mask_target_var(hook, args, _target_var):
+                    _target_var.array = occluded_array
+
+                self.target_extractor.add_process(
+                    '/saliency/mask_target_var', mask_target_var)
+                with chainer.using_config('enable_backprop',
+                                          self.enable_backprop):
+                    occluded_result = self.eval_fun(*chunk_inputs)
+                self.target_extractor.delete_process(
+                    '/saliency/mask_target_var')
+
+            occluded_score = self.get_output_var(occluded_result).array
+            score_diff = original_score[example_index] - occluded_score
+            score_diff = cuda.to_cpu(score_diff).reshape(len(chunk))
+            for j, (b, start) in enumerate(chunk):
+                occlusion_scores[(b,) + self._window_index(
+                    target_dim, start)] += score_diff[j]
+        outputs = (occlusion_scores,)
+        return outputs
@@ -1,16 +1,23 @@
-from chainer_chemistry.saliency.visualizer import base_visualizer  # NOQA
-from chainer_chemistry.saliency.visualizer import visualizer_utils  # NOQA
-from chainer_chemistry.saliency.visualizer import image_visualizer  # NOQA
-from chainer_chemistry.saliency.visualizer import mol_visualizer  # NOQA
-from chainer_chemistry.saliency.visualizer import table_visualizer  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
 
-from chainer_chemistry.saliency.visualizer.base_visualizer import BaseVisualizer  # NOQA
-from chainer_chemistry.saliency.visualizer.image_visualizer import ImageVisualizer  # NOQA
-from chainer_chemistry.saliency.visualizer.mol_visualizer import MolVisualier  # NOQA
-from chainer_chemistry.saliency.visualizer.mol_visualizer import SmilesVisualizer  # NOQA
-from chainer_chemistry.saliency.visualizer.table_visualizer import TableVisualizer  # NOQA
 
-from chainer_chemistry.saliency.visualizer.visualizer_utils import abs_max_scaler  # NOQA
-from chainer_chemistry.saliency.visualizer.visualizer_utils import min_max_scaler  # NOQA
-from chainer_chemistry.saliency.visualizer.visualizer_utils import normalize_scaler  # NOQA
-from chainer_chemistry.saliency.visualizer.visualizer_utils import red_blue_cmap  # NOQA
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'base_visualizer',
+        'visualizer_utils',
+        'image_visualizer',
+        'mol_visualizer',
+        'table_visualizer',
+    ],
+    attributes={
+        'BaseVisualizer': 'chainer_chemistry.saliency.visualizer.base_visualizer',  # NOQA
+        'ImageVisualizer': 'chainer_chemistry.saliency.visualizer.image_visualizer',  # NOQA
+        'MolVisualier': 'chainer_chemistry.saliency.visualizer.mol_visualizer',
+        'SmilesVisualizer': 'chainer_chemistry.saliency.visualizer.mol_visualizer',  # NOQA
+        'TableVisualizer': 'chainer_chemistry.saliency.visualizer.table_visualizer',  # NOQA
+        'abs_max_scaler': 'chainer_chemistry.saliency.visualizer.visualizer_utils',  # NOQA
+        'min_max_scaler': 'chainer_chemistry.saliency.visualizer.visualizer_utils',  # NOQA
+        'normalize_scaler': 'chainer_chemistry.saliency.visualizer.visualizer_utils',  # NOQA
+        'red_blue_cmap': 'chainer_chemistry.saliency.visualizer.visualizer_utils',  # NOQA
+    })
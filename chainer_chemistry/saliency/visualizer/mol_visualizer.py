@@ -1,10 +1,15 @@
 from logging import getLogger
+import multiprocessing
+import os
+import time
 
 import numpy
 
 from rdkit import Chem
 from rdkit.Chem import rdDepictor
 from rdkit.Chem.Draw import rdMolDraw2D
+import six
+from tqdm import tqdm
 
 
 from chainer_chemistry.saliency.visualizer.base_visualizer import BaseVisualizer  # NOQA
@@ -33,6 +38,123 @@ def is_visible(begin, end):
         return (begin + end) * 0.5
 
 
+def _highlight_kwargs(saliency, mol, visualize_ratio=1.0,
+                      color_fn=red_blue_cmap, scaler=abs_max_scaler):
+    """Prepare `mol` for drawing and compute highlight colors of saliency
+
+    Returns (dict): keyword arguments of `rdMolDraw2D.DrawMolecule` for
+        highlighting atoms and bonds.
+    """
+    rdDepictor.Compute2DCoords(mol)
+    Chem.SanitizeMol(mol)
+    Chem.Kekulize(mol)
+    num_atoms = mol.GetNumAtoms()
+
+    # --- type check ---
+    if saliency.ndim != 1:
+        raise ValueError("Unexpected value saliency.shape={}"
+                         .format(saliency.shape))
+
+    # Cut saliency array for unnecessary tail part
+    saliency = saliency[:num_atoms]
+    if scaler is not None:
+        # Normalize to [-1, 1] or [0, 1]
+        saliency = scaler(saliency)
+
+    abs_saliency = numpy.abs(saliency)
+    if visualize_ratio < 1.0:
+        threshold_index = int(num_atoms * visualize_ratio)
+        idx = numpy.argsort(abs_saliency)
+        idx = numpy.flip(idx, axis=0)
+        # set threshold to top `visualize_ratio` saliency
+        threshold = abs_saliency[idx[threshold_index]]
+        saliency = numpy.where(abs_saliency < threshold, 0., saliency)
+    else:
+        threshold = numpy.min(saliency)
+
+    highlight_atoms = list(map(lambda g: g.__int__(), numpy.where(
+        abs_saliency >= threshold)[0]))
+    atom_colors = {i: color_fn(e) for i, e in enumerate(saliency)}
+    bondlist = [bond.GetIdx() for bond in mol.GetBonds()]
+
+    def color_bond(bond):
+        begin = saliency[bond.GetBeginAtomIdx()]
+        end = saliency[bond.GetEndAtomIdx()]
+        return color_fn(is_visible(begin, end))
+    bondcolorlist = {i: color_bond(bond)
+                     for i, bond in enumerate(mol.GetBonds())}
+    return {'highlightAtoms': highlight_atoms,
+            'highlightAtomColors': atom_colors,
+            'highlightBonds': bondlist,
+            'highlightBondColors': bondcolorlist}
+
+
+def _save_svg(svg, save_filepath, logger):
+    """Save `svg` text to svg or png file
+
+    Returns (bool): `False` if png is not saved because cairosvg is missing.
+    """
+    extention = save_filepath.split('.')[-1]
+    if extention == 'svg':
+        with open(save_filepath, 'w') as f:
+            f.write(svg)
+    elif extention == 'png':
+        # TODO (nakago): check it is possible without cairosvg or not
+        try:
+            import cairosvg
+            cairosvg.svg2png(bytestring=svg, write_to=save_filepath)
+        except ImportError:
+            logger.error(
+                'cairosvg is not installed! '
+                'Please install cairosvg to save by png format.\n'
+                'pip install cairosvg')
+            return False
+    else:
+        raise ValueError(
+            'Unsupported extention {} for save_filepath {}'
+            .format(extention, save_filepath))
+    return True
+
+
+def _render(task):
+    """Draw one image (single molecule or grid sheet) and save it
+
+    `task` is a tuple of `(saliencies, mols, legends, save_filepath,
+    options)`, where saliencies are already scaled. It is run in the worker
+    processes of `MolVisualier.visualize_batch`.
+
+    Returns (tuple): `save_filepath` and error message, which is `None` when
+        the image is saved successfully.
+    """
+    saliencies, mols, legends, save_filepath, options = task
+    try:
+        kwargs_list = [
+            _highlight_kwargs(saliency, mol,
+                              visualize_ratio=options['visualize_ratio'],
+                              color_fn=options['color_fn'], scaler=None)
+            for saliency, mol in zip(saliencies, mols)]
+        width, height = options['image_size']
+        grid_shape = options['grid_shape']
+        if grid_shape is None:
+            drawer = rdMolDraw2D.MolDraw2DSVG(width, height)
+            drawer.DrawMolecule(mols[0], legend=legends[0], **kwargs_list[0])
+        else:
+            nrows, ncols = grid_shape
+            drawer = rdMolDraw2D.MolDraw2DSVG(
+                width * ncols, height * nrows, width, height)
+            drawer.DrawMolecules(
+                list(mols), legends=list(legends),
+                **{key: [kwargs[key] for kwargs in kwargs_list]
+                   for key in kwargs_list[0]})
+        drawer.FinishDrawing()
+        if not _save_svg(drawer.GetDrawingText(), save_filepath,
+                         getLogger(__name__)):
+            return save_filepath, 'cairosvg is not installed'
+    except Exception as e:
+        return save_filepath, '{}: {}'.format(type(e).__name__, e)
+    return save_filepath, None
+
+
 class MolVisualier(BaseVisualizer):
 
     """Saliency visualizer for mol data
@@ -60,71 +182,16 @@ class MolVisualier(BaseVisualizer):
                 scaled `x`, for plotting.
             legend (str): legend for the plot
         """
-        rdDepictor.Compute2DCoords(mol)
-        Chem.SanitizeMol(mol)
-        Chem.Kekulize(mol)
-        num_atoms = mol.GetNumAtoms()
-
-        # --- type check ---
-        if saliency.ndim != 1:
-            raise ValueError("Unexpected value saliency.shape={}"
-                             .format(saliency.shape))
-
-        # Cut saliency array for unnecessary tail part
-        saliency = saliency[:num_atoms]
-        if scaler is not None:
-            # Normalize to [-1, 1] or [0, 1]
-            saliency = scaler(saliency)
-
-        abs_saliency = numpy.abs(saliency)
-        if visualize_ratio < 1.0:
-            threshold_index = int(num_atoms * visualize_ratio)
-            idx = numpy.argsort(abs_saliency)
-            idx = numpy.flip(idx, axis=0)
-            # set threshold to top `visualize_ratio` saliency
-            threshold = abs_saliency[idx[threshold_index]]
-            saliency = numpy.where(abs_saliency < threshold, 0., saliency)
-        else:
-            threshold = numpy.min(saliency)
-
-        highlight_atoms = list(map(lambda g: g.__int__(), numpy.where(
-            abs_saliency >= threshold)[0]))
-        atom_colors = {i: color_fn(e) for i, e in enumerate(saliency)}
-        bondlist = [bond.GetIdx() for bond in mol.GetBonds()]
-
-        def color_bond(bond):
-            begin = saliency[bond.GetBeginAtomIdx()]
-            end = saliency[bond.GetEndAtomIdx()]
-            return color_fn(is_visible(begin, end))
-        bondcolorlist = {i: color_bond(bond)
-                         for i, bond in enumerate(mol.GetBonds())}
+        highlight_kwargs = _highlight_kwargs(
+            saliency, mol, visualize_ratio=visualize_ratio,
+            color_fn=color_fn, scaler=scaler)
         drawer = rdMolDraw2D.MolDraw2DSVG(500, 375)
-        drawer.DrawMolecule(
-            mol, highlightAtoms=highlight_atoms,
-            highlightAtomColors=atom_colors, highlightBonds=bondlist,
-            highlightBondColors=bondcolorlist, legend=legend)
+        drawer.DrawMolecule(mol, legend=legend, **highlight_kwargs)
         drawer.FinishDrawing()
         svg = drawer.GetDrawingText()
         if save_filepath:
-            extention = save_filepath.split('.')[-1]
-            if extention == 'svg':
-                with open(save_filepath, 'w') as f:
-                    f.write(svg)
-            elif extention == 'png':
-                # TODO (nakago): check it is possible without cairosvg or not
-                try:
-                    import cairosvg
-                    cairosvg.svg2png(bytestring=svg, write_to=save_filepath)
-                except ImportError:
-                    self.logger.error(
-                        'cairosvg is not installed! '
-                        'Please install cairosvg to save by png format.\n'
-                        'pip install cairosvg')
-                    return None
-            else:
-                raise ValueError(
-                    'Unsupported extention {} for save_filepath {}'
-                    .format(extention, save_filepath))
+            if not _save_svg(svg, save_filepath, self.logger):
+                return None
         else:
             try:
                 from IPython.core.display import SVG
@@ -135,6 +202,158 @@ class MolVisualier(BaseVisualizer):
                     'please install by "pip install ipython"')
                 return None
 
+    def visualize_batch(self, saliency, mols, save_dirpath, image_format='svg',
+                        filenames=None, visualize_ratio=1.0,
+                        color_fn=red_blue_cmap, scaler=abs_max_scaler,
+                        legends=None, shared_scale=True, grid_shape=None,
+                        image_size=(500, 375), n_jobs=1, chunksize=8,
+                        show_progress=True):
+        """Render saliency of many molecules to image files
+
+        Images are drawn in a process pool when `n_jobs > 1`, and each file
+        is written as soon as it is drawn, so that rendering tens of
+        thousands of molecules does not keep all images in memory. The
+        throughput is logged at the end.
+
+        .. admonition:: Example
+
+           >>> saliency = calculator.compute(test)  # (M, N, atom)
+           >>> saliency = calculator.aggregate(saliency, method='square')
+           >>> visualizer = MolVisualier()
+           >>> visualizer.visualize_batch(saliency, mols, 'saliency_images',
+           >>>                            n_jobs=8, grid_shape=(4, 5))
+
+        Args:
+            saliency (numpy.ndarray or list): 2-dim saliency array
+                (num_mols, num_node) or list of 1-dim saliency array.
+            mols (list): list of `Chem.Mol` of this saliency. `None` can be
+                used for invalid molecules.
+            save_dirpath (str): directory to save images, created if it does
+                not exist.
+            image_format (str): 'svg' or 'png'. cairosvg is necessary for
+                'png'.
+            filenames (list or None): file name of each image. If `None`,
+                '{index:06d}.{image_format}' is used, where index is index of
+                the molecule, or index of the sheet when `grid_shape` is set.
+            visualize_ratio (float): If set, only plot saliency color of top-X
+                atoms.
+            color_fn (callable): color function to show saliency. It must be
+                picklable, i.e. module level function, when `n_jobs > 1`.
+            scaler (callable): function which takes `x` as input and outputs
+                scaled `x`, for plotting.
+            legends (list or None): legend of each molecule.
+            shared_scale (bool): If `True`, `scaler` is applied to the
+                saliency of all the molecules at once, so that colors are
+                comparable across molecules. If `False`, it is applied to
+                each molecule separately as `visualize` does.
+            grid_shape (tuple or None): `(nrows, ncols)` to draw molecules in
+                grid sheets instead of one image per molecule.
+            image_size (tuple): `(width, height)` of each molecule image.
+            n_jobs (int): number of worker processes.
+            chunksize (int): number of images sent to a worker at once.
+            show_progress (bool): show progress bar or not.
+
+        Returns (dict or None): 'filepaths' is list of saved file paths,
+            'errors' is dict which maps file path to error message of the
+            images failed to render, or containing invalid (`None`)
+            molecules. Invalid molecules are skipped, and a grid sheet is
+            saved with the rest of molecules. 'elapsed' is time in seconds and
+            'throughput' is number of molecules rendered per second.
+            `None` is returned when cairosvg is not installed for 'png'.
+        """
+        if image_format not in ['svg', 'png']:
+            raise ValueError('Unsupported image_format {}'
+                             .format(image_format))
+        if image_format == 'png':
+            try:
+                import cairosvg  # NOQA
+            except ImportError:
+                self.logger.error(
+                    'cairosvg is not installed! '
+                    'Please install cairosvg to save by png format.\n'
+                    'pip install cairosvg')
+                return None
+        if len(saliency) != len(mols):
+            raise ValueError('Length of saliency {} and mols {} must be same'
+                             .format(len(saliency), len(mols)))
+        if legends is None:
+            legends = [''] * len(mols)
+
+        # Cut saliency array for unnecessary tail part before scaling.
+        # Invalid (`None`) molecules are skipped, and they do not take part
+        # in the scaling.
+        saliencies = [numpy.asarray(s)[:0 if mol is None else
+                                       mol.GetNumAtoms()]
+                      for s, mol in zip(saliency, mols)]
+        if scaler is not None:
+            if shared_scale and len(saliencies) > 0:
+                scaled = scaler(numpy.concatenate(saliencies))
+                sections = numpy.cumsum([len(s) for s in saliencies])[:-1]
+                saliencies = numpy.split(scaled, sections)
+            else:
+                saliencies = [scaler(s) for s in saliencies]
+
+        group_size = 1 if grid_shape is None else grid_shape[0] * grid_shape[1]
+        n_images = (len(mols) + group_size - 1) // group_size
+        if filenames is None:
+            filenames = ['{:06d}.{}'.format(i, image_format)
+                         for i in range(n_images)]
+        elif len(filenames) != n_images:
+            raise ValueError('Length of filenames {} must be number of images '
+                             '{}'.format(len(filenames), n_images))
+        if not os.path.exists(save_dirpath):
+            os.makedirs(save_dirpath)
+        options = {'visualize_ratio': visualize_ratio, 'color_fn': color_fn,
+                   'grid_shape': grid_shape, 'image_size': image_size}
+        tasks = []
+        invalid = {}
+        for i in range(0, len(mols), group_size):
+            filepath = os.path.join(save_dirpath, filenames[i // group_size])
+            group = range(i, min(i + group_size, len(mols)))
+            indices = [j for j in group if mols[j] is not None]
+            if len(indices) < len(group):
+                invalid[filepath] = 'Invalid molecule at index {}'.format(
+                    [j for j in group if mols[j] is None])
+            if len(indices) > 0:
+                tasks.append(([saliencies[j] for j in indices],
+                              [mols[j] for j in indices],
+                              [legends[j] for j in indices],
+                              filepath, options))
+
+        filepaths = []
+        errors = dict(invalid)
+        start = time.time()
+        pool = None
+        if n_jobs > 1:
+            pool = multiprocessing.Pool(n_jobs)
+            results = pool.imap(_render, tasks, chunksize=chunksize)
+        else:
+            results = six.moves.map(_render, tasks)
+        try:
+            for filepath, error in tqdm(results, total=len(tasks),
+                                        disable=not show_progress):
+                if error is None:
+                    filepaths.append(filepath)
+                elif filepath in errors:
+                    errors[filepath] = '{}; {}'.format(errors[filepath], error)
+                else:
+                    errors[filepath] = error
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        elapsed = time.time() - start
+        throughput = len(mols) / elapsed if elapsed > 0 else float('inf')
+        for filepath, error in errors.items():
+            self.logger.warning('Failed to render {}: {}'
+                                .format(filepath, error))
+        self.logger.info('Rendered {} molecules to {} images in {:.2f} sec '
+                         '({:.1f} molecules/sec, {} failed)'
+                         .format(len(mols), len(filepaths), elapsed,
+                                 throughput, len(errors)))
+        return {'filepaths': filepaths, 'errors': errors, 'elapsed': elapsed,
+                'throughput': throughput}
+
 
 class SmilesVisualizer(MolVisualier):
 
@@ -168,3 +387,32 @@ class SmilesVisualizer(MolVisualier):
             saliency, mol, save_filepath=save_filepath,
             visualize_ratio=visualize_ratio, color_fn=color_fn, scaler=scaler,
             legend=legend)
+
+    def visualize_batch(self, saliency, smiles_list, save_dirpath,
+                        add_Hs=False, use_canonical_smiles=True, **kwargs):
+        """Render saliency of many molecules to image files
+
+        Args:
+            saliency (numpy.ndarray or list): 2-dim saliency array
+                (num_mols, num_node) or list of 1-dim saliency array.
+            smiles_list (list): list of smiles of the molecules.
+            save_dirpath (str): directory to save images.
+            add_Hs (bool): Add explicit H or not
+            use_canonical_smiles (bool): If `True`, smiles are converted to
+                canonical smiles before constructing `mol`
+            **kwargs: other arguments of `MolVisualier.visualize_batch`.
+
+        Returns (dict): same as `MolVisualier.visualize_batch`.
+        """
+        mols = []
+        for smiles in smiles_list:
+            mol = Chem.MolFromSmiles(smiles)
+            if mol is not None and use_canonical_smiles:
+                smiles = Chem.MolToSmiles(mol, canonical=True)
+                mol = Chem.MolFromSmiles(smiles)
+            if mol is not None and add_Hs:
+                mol = Chem.AddHs(mol)
+            # Unparsable smiles is kept as `None` and reported in 'errors'.
+            mols.append(mol)
+        return super(SmilesVisualizer, self).visualize_batch(
+            saliency, mols, save_dirpath, **kwargs)
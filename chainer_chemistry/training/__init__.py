@@ -1 +1,8 @@
-from chainer_chemistry.training import extensions  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
+
+
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'extensions',
+    ])
@@ -1,8 +1,25 @@
-from chainer_chemistry.training.extensions import batch_evaluator  # NOQA
-from chainer_chemistry.training.extensions import roc_auc_evaluator  # NOQA
-from chainer_chemistry.training.extensions import r2_score_evaluator  # NOQA
+from chainer_chemistry.utils.lazy_import import lazy_import
 
-# import class and function
-from chainer_chemistry.training.extensions.batch_evaluator import BatchEvaluator  # NOQA
-from chainer_chemistry.training.extensions.roc_auc_evaluator import ROCAUCEvaluator  # NOQA
-from chainer_chemistry.training.extensions.r2_score_evaluator import R2ScoreEvaluator  # NOQA
+
+__getattr__, __dir__, __all__ = lazy_import(
+    __name__,
+    submodules=[
+        'async_evaluator',
+        'batch_evaluator',
+        'link_profile_report',
+        'roc_auc_evaluator',
+        'r2_score_evaluator',
+        'streaming_metrics',
+        'timeline_trace',
+    ],
+    attributes={
+        'AsyncEvaluator': 'chainer_chemistry.training.extensions.async_evaluator',  # NOQA
+        'BatchEvaluator': 'chainer_chemistry.training.extensions.batch_evaluator',  # NOQA
+        'LinkProfileReport': 'chainer_chemistry.training.extensions.link_profile_report',  # NOQA
+        'ROCAUCEvaluator': 'chainer_chemistry.training.extensions.roc_auc_evaluator',  # NOQA
+        'R2ScoreEvaluator': 'chainer_chemistry.training.extensions.r2_score_evaluator',  # NOQA
+        'BinnedAUCAccumulator': 'chainer_chemistry.training.extensions.streaming_metrics',  # NOQA
+        'MetricAccumulator': 'chainer_chemistry.training.extensions.streaming_metrics',  # NOQA
+        'RegressionMetricAccumulator': 'chainer_chemistry.training.extensions.streaming_metrics',  # NOQA
+        'TimelineTrace': 'chainer_chemistry.training.extensions.timeline_trace',  # NOQA
+    })
@@ -0,0 +1,254 @@
+import collections
+import copy
+from logging import getLogger
+import multiprocessing
+
+import chainer
+from chainer import cuda
+from chainer.datasets import SubDataset
+from chainer.iterators import SerialIterator
+from chainer import reporter as reporter_module
+from chainer import serializers
+from chainer.training import extension
+from chainer.training import trigger as trigger_module
+import numpy
+import six
+
+from chainer_chemistry.training.extensions.batch_evaluator import BatchEvaluator  # NOQA
+from chainer_chemistry.training.extensions.streaming_metrics import MetricAccumulator  # NOQA
+
+# Evaluator set in each worker process by `_init_worker`
+_worker_evaluator = None
+
+
+def _init_worker(evaluator):
+    global _worker_evaluator
+    _worker_evaluator = evaluator
+
+
+def _accumulators_only(metrics_fun):
+    return all(isinstance(fun, MetricAccumulator)
+               for fun in metrics_fun.values())
+
+
+def _evaluate_shard(snapshot, start, end):
+    """Forward a shard of the dataset with the snapshot of the parameters
+
+    Returns (dict or tuple): accumulators updated with the shard, keyed by
+        the name of the metric, when all the metrics are `MetricAccumulator`.
+        Otherwise, concatenated numpy arrays `(y, t)` of the shard.
+    """
+    evaluator = _worker_evaluator
+    target = evaluator.get_target('main')
+    target.serialize(serializers.NpzDeserializer(snapshot))
+    if evaluator.eval_hook:
+        evaluator.eval_hook(evaluator)
+
+    iterator = evaluator.get_iterator('main')
+    shard = SubDataset(iterator.dataset, start, end)
+    it = SerialIterator(shard, iterator.batch_size, repeat=False,
+                        shuffle=False)
+    with chainer.using_config('train', False):
+        if _accumulators_only(evaluator.metrics_fun):
+            accumulators = evaluator.metrics_fun
+            for accumulator in accumulators.values():
+                accumulator.reset()
+            for y, t in evaluator.iter_predictions(it):
+                for accumulator in accumulators.values():
+                    accumulator.update(y, t)
+            return accumulators
+
+        y_list = []
+        t_list = []
+        for y, t in evaluator.iter_predictions(it):
+            y_list.append(y)
+            t_list.append(t)
+    return numpy.concatenate(y_list), numpy.concatenate(t_list)
+
+
+class AsyncEvaluator(extension.Extension):
+
+    """Trainer extension which runs `BatchEvaluator` in background processes
+
+    At each `trigger`, parameters and persistent values of the target link
+    are copied to CPU, and evaluation with the copied parameters is started
+    in worker processes. The dataset is split into `n_workers` shards which
+    are forwarded in parallel. Training continues during the evaluation, and
+    the metrics are reported to the reporter, i.e. `LogReport`, at the first
+    iteration after the evaluation finished. `<name>/snapshot_iteration` is
+    also reported to indicate the iteration when the parameters are copied.
+
+    `ROCAUCEvaluator`, `PRCAUCEvaluator` and `R2ScoreEvaluator` can be used
+    as well as `BatchEvaluator`. Evaluation in workers is done in CPU, and
+    `eval_func` of `evaluator` is not supported since it is not updated by
+    the copied parameters. Iterator of `evaluator` must have `dataset` and
+    `batch_size` attributes like `SerialIterator`.
+
+    When all the metrics of `evaluator` are `MetricAccumulator`, e.g.
+    `streaming=True` of `R2ScoreEvaluator`, each worker updates the
+    accumulators with its shard, and only their statistics are sent back and
+    merged. Otherwise, the predictions and labels of the whole dataset are
+    sent back to the main process to compute the metrics, which takes memory
+    proportional to the size of the dataset.
+
+    Evaluation which is not finished before the training finishes can not be
+    reported. It is waited for when the trainer finalizes extensions, and its
+    result is stored in `final_results`.
+
+    .. admonition:: Example
+
+       >>> evaluator = ROCAUCEvaluator(valid_iter, classifier, name='val')
+       >>> trainer.extend(AsyncEvaluator(evaluator, trigger=(1, 'epoch'),
+       >>>                               n_workers=2))
+       >>> trainer.extend(E.LogReport())
+
+    Args:
+        evaluator (BatchEvaluator): evaluator to run in background.
+        trigger: trigger to start evaluation.
+        n_workers (int): number of worker processes, i.e. number of shards
+            of the dataset.
+        max_pending (int): maximum number of evaluations running at the same
+            time. If it is reached, evaluation at the trigger is skipped.
+        start_method (str or None): start method of `multiprocessing`. When
+            'spawn' or 'forkserver' is used, `evaluator` must be picklable.
+        logger:
+    """
+
+    trigger = 1, 'iteration'
+    priority = extension.PRIORITY_WRITER
+    default_name = 'validation'
+
+    def __init__(self, evaluator, trigger=(1, 'epoch'), n_workers=1,
+                 max_pending=1, start_method=None, logger=None):
+        if not isinstance(evaluator, BatchEvaluator):
+            raise TypeError('evaluator must be BatchEvaluator, actual {}'
+                            .format(type(evaluator)))
+        if evaluator.eval_func is not None:
+            raise ValueError('eval_func is not supported in AsyncEvaluator')
+        if n_workers <= 0:
+            raise ValueError('n_workers must be positive, actual {}'
+                             .format(n_workers))
+        if max_pending <= 0:
+            raise ValueError('max_pending must be positive, actual {}'
+                             .format(max_pending))
+        self.evaluator = evaluator
+        self.eval_trigger = trigger_module.get_trigger(trigger)
+        self.n_workers = n_workers
+        self.max_pending = max_pending
+        self.start_method = start_method
+        self.logger = logger or getLogger(__name__)
+        self.name = evaluator.name
+        self._pool = None
+        self._pending = collections.deque()
+        self.final_results = []
+
+    def _worker_evaluator(self):
+        """Copy of `evaluator` whose target is in CPU"""
+        evaluator = copy.copy(self.evaluator)
+        target = self.evaluator.get_target('main').copy(mode='copy')
+        target.to_cpu()
+        evaluator._targets = {'main': target}
+        evaluator.device = None
+        return evaluator
+
+    def _start_pool(self):
+        if self.start_method is None:
+            context = multiprocessing
+        else:
+            context = multiprocessing.get_context(self.start_method)
+        self._pool = context.Pool(self.n_workers, initializer=_init_worker,
+                                  initargs=(self._worker_evaluator(),))
+
+    def _snapshot(self):
+        serializer = serializers.DictionarySerializer()
+        serializer.save(self.evaluator.get_target('main'))
+        # Arrays are copied because they are pickled in background thread of
+        # the pool, while the training updates the parameters.
+        return {k: numpy.array(cuda.to_cpu(v))
+                for k, v in serializer.target.items()}
+
+    def submit(self, iteration=None):
+        """Start evaluation with current parameters
+
+        Args:
+            iteration (int or None): iteration number of the snapshot.
+
+        Returns (bool): `False` if the evaluation is skipped because
+            `max_pending` evaluations are running.
+        """
+        if len(self._pending) >= self.max_pending:
+            self.logger.warning(
+                'Evaluation at iteration {} is skipped because previous '
+                'evaluation is still running.'.format(iteration))
+            return False
+        if self._pool is None:
+            self._start_pool()
+        snapshot = self._snapshot()
+        n_data = len(self.evaluator.get_iterator('main').dataset)
+        bounds = numpy.linspace(0, n_data, self.n_workers + 1).astype(int)
+        # Empty shards, when the dataset is smaller than `n_workers`, are not
+        # evaluated.
+        results = [self._pool.apply_async(_evaluate_shard,
+                                          (snapshot, start, end))
+                   for start, end in zip(bounds[:-1], bounds[1:])
+                   if start < end]
+        self._pending.append((iteration, results))
+        return True
+
+    def _compute_result(self, iteration, results):
+        shard_results = [r.get() for r in results]
+        reporter = reporter_module.Reporter()
+        prefix = self.name + '/' if self.name is not None else ''
+        for name, target in six.iteritems(self.evaluator._targets):
+            reporter.add_observer(prefix + name, target)
+        with reporter:
+            metrics_fun = self.evaluator.metrics_fun
+            if _accumulators_only(metrics_fun):
+                metrics = {}
+                for key, fun in metrics_fun.items():
+                    accumulator = copy.deepcopy(fun)
+                    accumulator.reset()
+                    for accumulators in shard_results:
+                        accumulator.merge(accumulators[key])
+                    metrics[key] = accumulator.compute()
+                result = self.evaluator.report_metrics(metrics)
+            else:
+                result = self.evaluator.compute_observation(shard_results)
+        if iteration is not None:
+            result[prefix + 'snapshot_iteration'] = iteration
+        return result
+
+    def collect(self):
+        """Returns results of finished evaluations without blocking
+
+        Returns (list): list of result dict in the order of submission.
+        """
+        results = []
+        while self._pending and all(r.ready() for r in self._pending[0][1]):
+            iteration, shard_results = self._pending.popleft()
+            results.append(self._compute_result(iteration, shard_results))
+        return results
+
+    def wait(self):
+        """Wait for all running evaluations and returns their results
+
+        Returns (list): list of result dict in the order of submission.
+        """
+        results = []
+        while self._pending:
+            iteration, shard_results = self._pending.popleft()
+            results.append(self._compute_result(iteration, shard_results))
+        return results
+
+    def __call__(self, trainer):
+        for result in self.collect():
+            reporter_module.report(result)
+        if self.eval_trigger(trainer):
+            self.submit(trainer.updater.iteration)
+
+    def finalize(self):
+        self.final_results = self.wait()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
@@ -9,24 +9,38 @@ from chainer.dataset import convert
 from chainer import reporter
 from chainer.training.extensions import Evaluator
 
+from chainer_chemistry.training.extensions.streaming_metrics import MetricAccumulator  # NOQA
 
-def _get_1d_numpy_array(v):
-    """Convert array or Variable to 1d numpy array
+
+def _get_numpy_array(v):
+    """Convert array or Variable to numpy array
 
     Args:
         v (numpy.ndarray or cupy.ndarray or chainer.Variable): array to be
-            converted to 1d numpy array
+            converted to numpy array
 
-    Returns (numpy.ndarray): Raveled 1d numpy array
+    Returns (numpy.ndarray): numpy array of the same shape
 
     """
     if isinstance(v, chainer.Variable):
         v = v.data
-    return cuda.to_cpu(v).ravel()
+    return cuda.to_cpu(v)
 
 
 class BatchEvaluator(Evaluator):
 
+    """Evaluator which calculates metrics over the whole dataset
+
+    Each value of `metrics_fun` is either a function which receives
+    concatenated 1d predictions and labels of the whole dataset, or a
+    `MetricAccumulator` which is updated batch by batch. When all the values
+    are `MetricAccumulator`, predictions are not kept in memory.
+
+    Args:
+        metrics_fun (Callable or MetricAccumulator or dict): metrics to
+            calculate. If it is a dict, its key is used as reported name.
+    """
+
     def __init__(self, iterator, target, converter=convert.concat_examples,
                  device=None, eval_hook=None, eval_func=None, metrics_fun=None,
                  name=None, logger=None):
@@ -36,7 +50,8 @@ class BatchEvaluator(Evaluator):
         self.name = name
         self.logger = logger or getLogger()
 
-        if callable(metrics_fun):
+        if callable(metrics_fun) or isinstance(metrics_fun,
+                                               MetricAccumulator):
             # TODO(mottodora): use better name or infer
             self.metrics_fun = {"evaluation": metrics_fun}
         elif isinstance(metrics_fun, dict):
@@ -47,7 +62,6 @@ class BatchEvaluator(Evaluator):
 
     def evaluate(self):
         iterator = self._iterators['main']
-        eval_func = self.eval_func or self._targets['main']
 
         if self.eval_hook:
             self.eval_hook(self)
@@ -58,25 +72,70 @@ class BatchEvaluator(Evaluator):
         else:
             it = copy.copy(iterator)
 
-        y_total = []
-        t_total = []
-        for batch in it:
+        return self.compute_observation(self.iter_predictions(it))
+
+    def iter_predictions(self, iterator):
+        """Forward each batch of `iterator` and yield predictions
+
+        Args:
+            iterator: iterator which is not repeated.
+
+        Returns (generator): numpy arrays `(y, t)` of the prediction and
+            the true label of each batch, whose first axis is the batch.
+        """
+        eval_func = self.eval_func or self._targets['main']
+        for batch in iterator:
             in_arrays = self.converter(batch, self.device)
             with chainer.no_backprop_mode(), chainer.using_config('train',
                                                                   False):
                 y = eval_func(*in_arrays[:-1])
             t = in_arrays[-1]
-            y_data = _get_1d_numpy_array(y)
-            t_data = _get_1d_numpy_array(t)
-            y_total.append(y_data)
-            t_total.append(t_data)
+            yield _get_numpy_array(y), _get_numpy_array(t)
 
-        y_total = numpy.concatenate(y_total).ravel()
-        t_total = numpy.concatenate(t_total).ravel()
-        # metrics_value = self.metrics_fun(y_total, t_total)
-        metrics = {key: metric_fun(y_total, t_total) for key, metric_fun in
-                   self.metrics_fun.items()}
+    def compute_observation(self, predictions):
+        """Calculate metrics from predictions and report them
 
+        Args:
+            predictions (iterable): numpy arrays `(y, t)` of each batch.
+                Accumulators are updated with them as they are, and the other
+                metrics are computed from the raveled arrays.
+
+        Returns (dict): observation which contains reported metrics.
+        """
+        accumulators = {key: fun for key, fun in self.metrics_fun.items()
+                        if isinstance(fun, MetricAccumulator)}
+        metrics_fun = {key: fun for key, fun in self.metrics_fun.items()
+                       if key not in accumulators}
+        for accumulator in accumulators.values():
+            accumulator.reset()
+
+        y_total = []
+        t_total = []
+        for y_data, t_data in predictions:
+            for accumulator in accumulators.values():
+                accumulator.update(y_data, t_data)
+            if metrics_fun:
+                y_total.append(y_data)
+                t_total.append(t_data)
+
+        metrics = {key: accumulator.compute() for key, accumulator in
+                   accumulators.items()}
+        if metrics_fun:
+            y_total = numpy.concatenate([y.ravel() for y in y_total])
+            t_total = numpy.concatenate([t.ravel() for t in t_total])
+            # metrics_value = self.metrics_fun(y_total, t_total)
+            metrics.update({key: metric_fun(y_total, t_total)
+                            for key, metric_fun in metrics_fun.items()})
+        return self.report_metrics(metrics)
+
+    def report_metrics(self, metrics):
+        """Report computed metrics as values of the target
+
+        Args:
+            metrics (dict): metric values keyed by reported name.
+
+        Returns (dict): observation which contains reported metrics.
+        """
         observation = {}
         with reporter.report_scope(observation):
             reporter.report(metrics, self._targets['main'])
@@ -0,0 +1,84 @@
+from logging import getLogger
+
+import six
+
+from chainer import reporter
+from chainer.training import extension
+from chainer.training import trigger as trigger_module
+
+from chainer_chemistry.link_hooks.link_profile_hook import LinkProfileHook
+
+
+class LinkProfileReport(extension.Extension):
+
+    """Trainer extension to profile each link during the training
+
+    `LinkProfileHook` is enabled from the beginning to the end of the
+    training, and at each `trigger`, the values recorded since the last
+    report are reported to the reporter as
+    `<name>/<link path>/<key>`, e.g. `link_profile/predictor/forward_time`,
+    and the table is written to the logger. Then the values are reset.
+
+    .. admonition:: Example
+
+       >>> trainer.extend(LinkProfileReport(classifier, trigger=(1, 'epoch'),
+       >>>                                  keys=['total_time']))
+
+    Args:
+        target (chainer.Link): root link to profile, e.g. the model given to
+            the optimizer.
+        trigger: trigger to report the profile.
+        keys (list or None): keys of `LinkProfileHook.summary` to report. If
+            `None`, all the keys are reported.
+        n_top (int or None): If specified, only top `n_top` links in
+            'total_time' are reported.
+        name (str): prefix of reported keys and name of the hook.
+        synchronize (bool): see `LinkProfileHook`.
+        logger:
+    """
+
+    trigger = 1, 'iteration'
+    priority = extension.PRIORITY_WRITER
+    default_name = 'link_profile'
+
+    def __init__(self, target, trigger=(1, 'epoch'), keys=None, n_top=None,
+                 name='link_profile', synchronize=True, logger=None):
+        self.hook = LinkProfileHook(root=target, name=name,
+                                    synchronize=synchronize)
+        self.report_trigger = trigger_module.get_trigger(trigger)
+        self.keys = keys
+        self.n_top = n_top
+        self.name = name
+        self.logger = logger or getLogger(__name__)
+        self._entered = False
+
+    def initialize(self, trainer):
+        if not self._entered:
+            self.hook.__enter__()
+            self._entered = True
+
+    def __call__(self, trainer):
+        if not self.report_trigger(trainer):
+            return
+        summary = self.hook.summary(sort_by='total_time')
+        paths = list(summary.keys())
+        if self.n_top is not None:
+            paths = paths[:self.n_top]
+        observation = {}
+        for path in paths:
+            for key, value in six.iteritems(summary[path]):
+                if self.keys is None or key in self.keys:
+                    observation['{}/{}/{}'.format(self.name, path, key)] = \
+                        value
+        reporter.report(observation)
+
+        lines = six.StringIO()
+        self.hook.print_report(file=lines)
+        self.logger.info('Link profile at iteration {}:\n{}'.format(
+            trainer.updater.iteration, lines.getvalue()))
+        self.hook.reset()
+
+    def finalize(self):
+        if self._entered:
+            self.hook.__exit__(None, None, None)
+            self._entered = False
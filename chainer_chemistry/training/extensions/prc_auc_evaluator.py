@@ -4,6 +4,7 @@ from chainer.dataset import convert
 from sklearn import metrics
 
 from chainer_chemistry.training.extensions.batch_evaluator import BatchEvaluator  # NOQA
+from chainer_chemistry.training.extensions.streaming_metrics import BinnedAUCAccumulator  # NOQA
 
 
 def _to_list(a):
@@ -58,6 +59,12 @@ class PRCAUCEvaluator(BatchEvaluator):
             `roc_auc_score` calculation is suppressed and ignored with a
             warning message.
         logger:
+        num_bins (int or None): If specified, PRC AUC score is calculated
+            by streaming `BinnedAUCAccumulator` with this number of bins
+            instead of keeping all predictions in memory. The score is
+            approximated when different predictions fall in the same bin.
+        score_range (tuple): range `(min, max)` of the predicted score used
+            for binning. It is used only when `num_bins` is specified.
 
     Attributes:
         converter: Converter function.
@@ -72,8 +79,15 @@ class PRCAUCEvaluator(BatchEvaluator):
     def __init__(self, iterator, target, converter=convert.concat_examples,
                  device=None, eval_hook=None, eval_func=None, name=None,
                  pos_labels=1, ignore_labels=None, raise_value_error=True,
-                 logger=None):
-        metrics_fun = {'prc_auc': self.prc_auc_score}
+                 logger=None, num_bins=None, score_range=(0., 1.)):
+        if num_bins is None:
+            metrics_fun = {'prc_auc': self.prc_auc_score}
+        else:
+            metrics_fun = {'prc_auc': BinnedAUCAccumulator(
+                curve='prc', num_bins=num_bins, min_value=score_range[0],
+                max_value=score_range[1], pos_labels=pos_labels,
+                ignore_labels=ignore_labels,
+                raise_value_error=raise_value_error, logger=logger)}
         super(PRCAUCEvaluator, self).__init__(
             iterator, target, converter=converter, device=device,
             eval_hook=eval_hook, eval_func=eval_func, metrics_fun=metrics_fun,
@@ -2,6 +2,7 @@ from chainer.backends import cuda
 from chainer.dataset import convert
 
 from chainer_chemistry.training.extensions.batch_evaluator import BatchEvaluator  # NOQA
+from chainer_chemistry.training.extensions.streaming_metrics import RegressionMetricAccumulator  # NOQA
 
 
 class R2ScoreEvaluator(BatchEvaluator):
@@ -46,6 +47,11 @@ class R2ScoreEvaluator(BatchEvaluator):
         multioutput (str): If 'uniform_average', this function returns an
             average of R^2 score of multiple output. If 'raw_average', this
             function return a set of R^2 score of multiple output.
+        ignore_nan (bool): If `True`, NaN values are ignored.
+        streaming (bool): If `True`, R^2 score is calculated by running sums
+            of `RegressionMetricAccumulator` without keeping all predictions
+            in memory. The score is computed for each output, i.e. each
+            column of the labels, and NaN is ignored for each output.
 
     Attributes:
         converter: Converter function.
@@ -61,8 +67,14 @@ class R2ScoreEvaluator(BatchEvaluator):
                  device=None, eval_hook=None, eval_func=None, name=None,
                  pos_label=1, ignore_labels=None, raise_value_error=True,
                  logger=None, sample_weight=None,
-                 multioutput='uniform_average', ignore_nan=False):
-        metrics_fun = {'r2_score': self.r2_score}
+                 multioutput='uniform_average', ignore_nan=False,
+                 streaming=False):
+        if streaming:
+            metrics_fun = {'r2_score': RegressionMetricAccumulator(
+                metric='r2', ignore_nan=ignore_nan,
+                multioutput=multioutput)}
+        else:
+            metrics_fun = {'r2_score': self.r2_score}
         super(R2ScoreEvaluator, self).__init__(
             iterator, target, converter=converter, device=device,
             eval_hook=eval_hook, eval_func=eval_func, metrics_fun=metrics_fun,
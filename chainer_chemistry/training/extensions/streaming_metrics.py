@@ -0,0 +1,260 @@
+"""
+Streaming metric accumulators for `BatchEvaluator`
+
+An accumulator is updated with the prediction and the label of each batch,
+and keeps only fixed size statistics instead of all the predictions, so that
+the memory usage does not depend on the size of the validation dataset.
+"""
+from logging import getLogger
+
+import numpy
+
+
+def _to_list(a):
+    if isinstance(a, (int, float)):
+        return [a, ]
+    else:
+        return a
+
+
+class MetricAccumulator(object):
+
+    """Base class of streaming metric accumulator
+
+    `BatchEvaluator` calls `reset` at the beginning of the evaluation,
+    `update` for each batch, and `compute` at the end of the evaluation.
+    Accumulators updated with different parts of the dataset, e.g. in
+    worker processes of `AsyncEvaluator`, are combined by `merge`.
+    """
+
+    def reset(self):
+        raise NotImplementedError
+
+    def update(self, y, t):
+        """Accumulate statistics of one batch
+
+        Args:
+            y (numpy.ndarray): predicted values, whose first axis is the
+                batch.
+            t (numpy.ndarray): true labels of the same shape with `y`.
+        """
+        raise NotImplementedError
+
+    def compute(self):
+        raise NotImplementedError
+
+    def merge(self, other):
+        """Accumulate statistics of another accumulator
+
+        Args:
+            other (MetricAccumulator): accumulator of the same type and
+                configuration.
+        """
+        raise NotImplementedError
+
+
+class BinnedAUCAccumulator(MetricAccumulator):
+
+    """Accumulator of ROC AUC or PRC AUC score by histogram of predictions
+
+    Predicted scores are counted in `num_bins` equal width bins in
+    `[min_value, max_value]` separately for positive and negative samples.
+    Scores out of the range are counted in the edge bins, and NaN scores are
+    ignored. The curve is computed by using bin edges as thresholds, where
+    samples in the same bin are treated as tie. Therefore the result is same
+    with the exact AUC when different scores always fall in different bins,
+    and its error is bounded by the fraction of positive/negative pairs
+    sharing a bin otherwise.
+
+    Args:
+        curve (str): 'roc' for ROC AUC or 'prc' for PRC AUC.
+        num_bins (int): number of histogram bins, i.e. resolution of scores.
+        min_value (float): lower bound of predicted score.
+        max_value (float): upper bound of predicted score.
+        pos_labels (int or list): labels of the positive class, other classes
+            are considered as negative.
+        ignore_labels (int or list or None): labels to be ignored.
+        raise_value_error (bool): If `False`, `ValueError` raised when only
+            one class is present is suppressed and `numpy.nan` is returned
+            with a warning message.
+        logger:
+    """
+
+    def __init__(self, curve='roc', num_bins=10000, min_value=0.,
+                 max_value=1., pos_labels=1, ignore_labels=None,
+                 raise_value_error=True, logger=None):
+        if curve not in ['roc', 'prc']:
+            raise ValueError('curve {} is not supported'.format(curve))
+        if num_bins <= 0:
+            raise ValueError('num_bins must be positive, actual {}'
+                             .format(num_bins))
+        if min_value >= max_value:
+            raise ValueError('min_value {} must be smaller than max_value {}'
+                             .format(min_value, max_value))
+        self.curve = curve
+        self.num_bins = num_bins
+        self.min_value = min_value
+        self.max_value = max_value
+        self.pos_labels = _to_list(pos_labels)
+        self.ignore_labels = _to_list(ignore_labels)
+        self.raise_value_error = raise_value_error
+        self.logger = logger or getLogger(__name__)
+        self.reset()
+
+    def reset(self):
+        self.pos_hist = numpy.zeros((self.num_bins,), dtype=numpy.int64)
+        self.neg_hist = numpy.zeros((self.num_bins,), dtype=numpy.int64)
+
+    def update(self, y, t):
+        y = numpy.ravel(y)
+        t = numpy.ravel(t)
+        # NaN predictions cannot be binned, so they are dropped.
+        valid_ind = ~numpy.isnan(y)
+        if self.ignore_labels:
+            valid_ind &= numpy.in1d(t, self.ignore_labels, invert=True)
+        y = y[valid_ind]
+        t = t[valid_ind]
+        scale = self.num_bins / (self.max_value - self.min_value)
+        index = numpy.floor((y - self.min_value) * scale)
+        index = numpy.clip(index, 0, self.num_bins - 1).astype(numpy.intp)
+        pos = numpy.in1d(t, self.pos_labels)
+        self.pos_hist += numpy.bincount(index[pos], minlength=self.num_bins)
+        self.neg_hist += numpy.bincount(index[~pos], minlength=self.num_bins)
+
+    def merge(self, other):
+        if (other.num_bins, other.min_value, other.max_value) != \
+                (self.num_bins, self.min_value, self.max_value):
+            raise ValueError('Bins of accumulators must be same')
+        self.pos_hist += other.pos_hist
+        self.neg_hist += other.neg_hist
+
+    def compute(self):
+        # Cumulative counts with decreasing threshold
+        tps = numpy.cumsum(self.pos_hist[::-1])
+        fps = numpy.cumsum(self.neg_hist[::-1])
+        n_pos = tps[-1]
+        n_neg = fps[-1]
+        if n_pos == 0 or n_neg == 0:
+            message = 'Only one class present in y_true. {} AUC score is ' \
+                      'not defined in that case.'.format(self.curve.upper())
+            if self.raise_value_error:
+                raise ValueError(message)
+            self.logger.warning(message)
+            return numpy.nan
+
+        if self.curve == 'roc':
+            tpr = numpy.concatenate(([0.], tps / float(n_pos)))
+            fpr = numpy.concatenate(([0.], fps / float(n_neg)))
+            return numpy.trapz(tpr, fpr)
+        else:
+            nonempty = (self.pos_hist + self.neg_hist)[::-1] > 0
+            tps = tps[nonempty]
+            fps = fps[nonempty]
+            precision = numpy.concatenate(([1.], tps / (tps + fps)))
+            recall = numpy.concatenate(([0.], tps / float(n_pos)))
+            return numpy.trapz(precision, recall)
+
+
+class RegressionMetricAccumulator(MetricAccumulator):
+
+    """Accumulator of regression metrics by running sums
+
+    Count, mean and sum of squared deviation of true labels are merged batch
+    by batch (Chan et al.'s parallel algorithm), together with sum of
+    absolute and squared errors. They are kept for each output, i.e. summed
+    over the batch axis for each column of the labels, so that the metric of
+    each output is computed separately.
+
+    Args:
+        metric (str): 'r2' for R^2 (coefficient of determination) score,
+            'mae' for mean absolute error or 'rmse' for root mean squared
+            error.
+        ignore_nan (bool): If `True`, pairs which contain NaN are ignored
+            for each output.
+        multioutput (str): If 'uniform_average', the average of the metrics
+            of the outputs is returned. If 'raw_values', the metric of each
+            output is returned as an array.
+    """
+
+    def __init__(self, metric='r2', ignore_nan=False,
+                 multioutput='uniform_average'):
+        if metric not in ['r2', 'mae', 'rmse']:
+            raise ValueError('metric {} is not supported'.format(metric))
+        if multioutput not in ['uniform_average', 'raw_values']:
+            raise ValueError('multioutput {} is not supported'
+                             .format(multioutput))
+        self.metric = metric
+        self.ignore_nan = ignore_nan
+        self.multioutput = multioutput
+        self.reset()
+
+    def reset(self):
+        # Statistics are allocated with the shape of an output at the first
+        # update.
+        self.count = None
+        self.mean = None
+        self.sum_sq_dev = None
+        self.sum_abs_error = None
+        self.sum_sq_error = None
+
+    def update(self, y, t):
+        y = numpy.asarray(y, dtype=numpy.float64)
+        t = numpy.asarray(t, dtype=numpy.float64)
+        if t.size == 0:
+            return
+        if self.ignore_nan:
+            valid = ~(numpy.isnan(y) | numpy.isnan(t))
+        else:
+            valid = numpy.ones(t.shape, dtype=bool)
+        n = valid.sum(axis=0)
+        diff = numpy.where(valid, y - t, 0.)
+        batch_mean = numpy.where(valid, t, 0.).sum(axis=0) / numpy.maximum(
+            n, 1)
+        batch_sq_dev = numpy.where(
+            valid, numpy.square(t - batch_mean), 0.).sum(axis=0)
+        self._merge_stats(n, batch_mean, batch_sq_dev,
+                          numpy.abs(diff).sum(axis=0),
+                          numpy.square(diff).sum(axis=0))
+
+    def merge(self, other):
+        if other.count is None:
+            return
+        self._merge_stats(other.count, other.mean, other.sum_sq_dev,
+                          other.sum_abs_error, other.sum_sq_error)
+
+    def _merge_stats(self, n, mean, sum_sq_dev, sum_abs_error, sum_sq_error):
+        if self.count is None:
+            shape = numpy.shape(n)
+            self.count = numpy.zeros(shape, dtype=numpy.int64)
+            self.mean = numpy.zeros(shape)
+            self.sum_sq_dev = numpy.zeros(shape)
+            self.sum_abs_error = numpy.zeros(shape)
+            self.sum_sq_error = numpy.zeros(shape)
+        self.sum_abs_error += sum_abs_error
+        self.sum_sq_error += sum_sq_error
+        total = self.count + n
+        delta = mean - self.mean
+        # Ratio is 0 for the outputs without valid pairs in the merged part.
+        ratio = n / numpy.maximum(total, 1).astype(numpy.float64)
+        self.mean += delta * ratio
+        self.sum_sq_dev += sum_sq_dev + delta ** 2 * self.count * ratio
+        self.count = total
+
+    def compute(self):
+        if self.count is None:
+            return numpy.nan
+        count = numpy.maximum(self.count, 1)
+        if self.metric == 'mae':
+            values = self.sum_abs_error / count
+        elif self.metric == 'rmse':
+            values = numpy.sqrt(self.sum_sq_error / count)
+        else:
+            # Same convention with `R2ScoreEvaluator` when the deviation is 0
+            sum_sq_dev = numpy.where(self.sum_sq_dev == 0, 1.,
+                                     self.sum_sq_dev)
+            values = numpy.where(self.sum_sq_dev == 0, 0.,
+                                 1. - self.sum_sq_error / sum_sq_dev)
+        values = numpy.where(self.count == 0, numpy.nan, values)
+        if self.multioutput == 'uniform_average':
+            return values.mean()
+        return values
@@ -0,0 +1,254 @@
+import collections
+import functools
+import json
+from logging import getLogger
+import os
+import threading
+import time
+
+from chainer import cuda
+from chainer.dataset import convert
+from chainer.training import extension
+from chainer.training.extensions import Evaluator
+from chainer.training import trigger as trigger_module
+
+from chainer_chemistry.training.extensions.async_evaluator import AsyncEvaluator  # NOQA
+
+# Select the best-resolution timer function
+_get_time = getattr(time, 'perf_counter', time.time)
+
+
+class TimelineTrace(extension.Extension):
+
+    """Trainer extension to record timeline of training phases
+
+    Phases of each sampled iteration are recorded as spans, and written as
+    Chrome trace event JSON, which can be opened by `chrome://tracing` or
+    Perfetto UI. The recorded phases are
+
+    - `iteration`: `updater.update`
+    - `next_batch`: `next` of the main iterator
+    - `converter`: converter of the updater, e.g. `concat_mols`
+    - `optimizer_update`: `optimizer.update`, which contains
+    - `forward`: forward of the loss function
+    - `backward`: `backward` of the loss
+    - `extensions`: all the extensions called after the update
+
+    In addition, `evaluate` of evaluators (`chainer.training.extensions.
+    Evaluator` including chainer_chemistry's evaluators) and `submit`,
+    `collect` of `AsyncEvaluator` are recorded as `<extension name>/<method>`
+    whenever they are called.
+
+    The phases are traced by replacing the methods of the updater, iterator,
+    optimizer and evaluators with thin wrappers at the beginning of the
+    training, which are restored at the end. In iterations which are not
+    sampled, the wrappers only check a flag, so the overhead is negligible.
+
+    .. admonition:: Example
+
+       >>> trainer.extend(TimelineTrace(sample_interval=100))
+       >>> trainer.run()
+       >>> # open <trainer.out>/trace.json by chrome://tracing
+
+    Args:
+        filename (str): file name of the trace JSON in `trainer.out`.
+        sample_interval (int): interval of iterations to record, i.e.
+            iterations whose index is multiple of `sample_interval` are
+            recorded.
+        max_events (int or None): maximum number of events kept in memory.
+            Events are kept in a ring buffer, i.e. the oldest events are
+            discarded when it is full, so that the trace of the latest
+            iterations is written. Each event takes about 0.5KB, so that the
+            default bounds the memory usage to about 5MB. If `None`, all the
+            events are kept without bound.
+        write_trigger: trigger to write the trace JSON during the training.
+            It is always written at the end of the training.
+        synchronize (bool): If `True`, CUDA device is synchronized at the
+            begin and the end of each span to measure GPU computation
+            correctly. It increases the overhead.
+        logger:
+    """
+
+    trigger = 1, 'iteration'
+    priority = extension.PRIORITY_READER
+    default_name = 'timeline_trace'
+
+    def __init__(self, filename='trace.json', sample_interval=1,
+                 max_events=10000, write_trigger=None, synchronize=False,
+                 logger=None):
+        if sample_interval <= 0:
+            raise ValueError('sample_interval must be positive, actual {}'
+                             .format(sample_interval))
+        if max_events is not None and max_events <= 0:
+            raise ValueError('max_events must be positive, actual {}'
+                             .format(max_events))
+        self.filename = filename
+        self.sample_interval = sample_interval
+        self.max_events = max_events
+        if write_trigger is not None:
+            write_trigger = trigger_module.get_trigger(write_trigger)
+        self.write_trigger = write_trigger
+        self.synchronize = synchronize
+        self.logger = logger or getLogger(__name__)
+        self.events = collections.deque(maxlen=max_events)
+        self._out = None
+        self._origin = _get_time()
+        self._sampled = False
+        self._iteration = 0
+        self._update_end = None
+        self._patches = []
+
+    # --- Recording ---
+    def _now(self):
+        if self.synchronize and cuda.available:
+            cuda.Device().synchronize()
+        return _get_time()
+
+    def add_span(self, name, start, end, category='train', **args):
+        """Record a span
+
+        Args:
+            name (str): name of the span.
+            start (float): start time given by `time.perf_counter`.
+            end (float): end time given by `time.perf_counter`.
+            category (str): category of the span.
+            **args: additional values shown in the trace viewer.
+        """
+        args.setdefault('iteration', self._iteration)
+        self.events.append({
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': (start - self._origin) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': os.getpid(), 'tid': threading.current_thread().ident,
+            'args': args})
+
+    def _traced(self, fn, name, category='train', always=False):
+        """Wrap `fn` to record its call as a span"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not (always or self._sampled):
+                return fn(*args, **kwargs)
+            start = self._now()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add_span(name, start, self._now(), category=category)
+        return wrapper
+
+    def _patch(self, obj, attr, wrapper):
+        had_instance_attr = attr in vars(obj)
+        self._patches.append(
+            (obj, attr, had_instance_attr, vars(obj).get(attr)))
+        setattr(obj, attr, wrapper)
+
+    def _restore(self):
+        for obj, attr, had_instance_attr, original in reversed(
+                self._patches):
+            if had_instance_attr:
+                setattr(obj, attr, original)
+            else:
+                delattr(obj, attr)
+        self._patches = []
+
+    # --- Wrappers of the training loop ---
+    def _trace_update(self, update):
+        @functools.wraps(update)
+        def wrapper():
+            self._iteration = self._updater.iteration
+            self._sampled = self._iteration % self.sample_interval == 0
+            if not self._sampled:
+                return update()
+            start = self._now()
+            try:
+                return update()
+            finally:
+                self._update_end = self._now()
+                self.add_span('iteration', start, self._update_end)
+        return wrapper
+
+    def _trace_loss_func(self, loss_func):
+        def wrapper(*args, **kwargs):
+            if not self._sampled:
+                return loss_func(*args, **kwargs)
+            start = self._now()
+            loss = loss_func(*args, **kwargs)
+            self.add_span('forward', start, self._now())
+            loss.backward = self._traced(loss.backward, 'backward')
+            return loss
+        return wrapper
+
+    def initialize(self, trainer):
+        if self._patches:
+            # Already initialized, e.g. resumed in the same process.
+            return
+        self._out = trainer.out
+        updater = trainer.updater
+        self._updater = updater
+        self._patch(updater, 'update', self._trace_update(updater.update))
+
+        iterator = updater.get_iterator('main')
+        self._patch(iterator, 'next',
+                    self._traced(iterator.next, 'next_batch'))
+        converter = getattr(updater, 'converter', None)
+        if converter is not None:
+            traced_converter = self._traced(converter, 'converter')
+            # `Converter` is available from Chainer v7.
+            converter_cls = getattr(convert, 'Converter', None)
+            if converter_cls is not None and \
+                    isinstance(converter, converter_cls):
+                traced_converter = convert.converter()(traced_converter)
+            self._patch(updater, 'converter', traced_converter)
+
+        optimizer = updater.get_optimizer('main')
+        self._patch(optimizer, 'update',
+                    self._traced(optimizer.update, 'optimizer_update'))
+        if hasattr(updater, 'loss_func'):
+            loss_func = updater.loss_func or optimizer.target
+            self._patch(updater, 'loss_func',
+                        self._trace_loss_func(loss_func))
+
+        for name, entry in trainer._extensions.items():
+            ext = entry.extension
+            if isinstance(ext, Evaluator):
+                methods = ['evaluate']
+            elif isinstance(ext, AsyncEvaluator):
+                methods = ['submit', 'collect']
+            else:
+                continue
+            for method in methods:
+                self._patch(ext, method, self._traced(
+                    getattr(ext, method), '{}/{}'.format(name, method),
+                    category='extension', always=True))
+
+    def __call__(self, trainer):
+        if self._sampled and self._update_end is not None:
+            # This extension has the lowest priority, so other extensions
+            # have been called after the update.
+            self.add_span('extensions', self._update_end, self._now(),
+                          category='extension')
+            self._update_end = None
+        if self.write_trigger is not None and self.write_trigger(trainer):
+            self.write()
+
+    def write(self, path=None):
+        """Write the recorded events as Chrome trace event JSON
+
+        Args:
+            path (str or None): output path. If `None`, `filename` in
+                `trainer.out` is used.
+        """
+        if path is None:
+            path = os.path.join(self._out or '.', self.filename)
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': list(self.events),
+                       'displayTimeUnit': 'ms'}, f)
+        self.logger.info('Wrote {} trace events to {}'
+                         .format(len(self.events), path))
+
+    def finalize(self):
+        self._restore()
+        if self._out is not None:
+            self.write()
@@ -0,0 +1,60 @@
+import importlib
+import sys
+
+
+def lazy_import(module_name, submodules=(), attributes=None, lazy_only=()):
+    """Defer importing submodules and attributes of a package
+
+    It returns `__getattr__` and `__dir__` functions for a package
+    `__init__` module (PEP 562), so that a submodule or an attribute is
+    imported on its first access. Heavy dependencies such as RDKit, pandas,
+    scikit-learn or matplotlib are not imported until a feature using them
+    is accessed. Imported value is cached as an attribute of the module.
+
+    In python older than 3.7 module level `__getattr__` is not supported,
+    and all the submodules and attributes are imported immediately, except
+    for `lazy_only` ones, which must be imported explicitly in that case.
+
+    .. admonition:: Example
+
+       >>> # chainer_chemistry/models/__init__.py
+       >>> __getattr__, __dir__, __all__ = lazy_import(
+       >>>     __name__, submodules=['nfp'],
+       >>>     attributes={'NFP': 'chainer_chemistry.models.nfp'})
+
+    Args:
+        module_name (str): name of the package, i.e. `__name__`.
+        submodules (list): names of the submodules to expose.
+        attributes (dict): mapping from attribute name to the module name
+            which defines the attribute.
+        lazy_only (list): names of the submodules and attributes which are
+            not imported immediately in python older than 3.7, e.g. the ones
+            which require optional dependencies such as RDKit.
+
+    Returns (tuple): `__getattr__`, `__dir__` and `__all__` of the package
+    """
+    submodules = frozenset(submodules)
+    attributes = dict(attributes or {})
+    names = sorted(submodules | frozenset(attributes))
+    module = sys.modules[module_name]
+
+    def __getattr__(name):
+        if name in submodules:
+            value = importlib.import_module(
+                '{}.{}'.format(module_name, name))
+        elif name in attributes:
+            value = getattr(importlib.import_module(attributes[name]), name)
+        else:
+            raise AttributeError('module {} has no attribute {}'
+                                 .format(module_name, name))
+        setattr(module, name, value)
+        return value
+
+    def __dir__():
+        return sorted(frozenset(vars(module)) | frozenset(names))
+
+    if sys.version_info < (3, 7):
+        for name in names:
+            if name not in lazy_only:
+                __getattr__(name)
+    return __getattr__, __dir__, names
@@ -143,12 +143,53 @@ def test_data_frame_parser_return_is_successful(mols, label_a):
     assert numpy.alltrue(is_successful[[1, 3, 4]])
     assert numpy.alltrue(~is_successful[[0, 2]])
 
+    stats = result['stats']
+    assert stats.total_count == 5
+    assert stats.success_count == 3
+    assert stats.fail_count == 2
+    assert stats.failures['InvalidMolecule']['count'] == 2
+    assert stats.failures['InvalidMolecule']['samples'] == [
+        ('var', None), ('hoge', None)]
+    assert set(stats.times.keys()) == {
+        'parse', 'canonicalize', 'featurize', 'label', 'array'}
+
     # We assume NFPPreprocessor works as documented.
     for i in range(3):
         expect = preprocessor.get_input_features(mols[i])
         check_features(dataset[i], expect, label_a[i])
 
 
+def test_data_frame_parser_unexpected_error(data_frame):
+    def postprocess_label(label):
+        if label[0] < 0:
+            raise KeyError('error')
+        return label
+
+    parser = DataFrameParser(NFPPreprocessor(), labels='labelA',
+                             postprocess_label=postprocess_label)
+    result = parser.parse(data_frame, return_is_successful=True)
+    stats = result['stats']
+    assert stats.fail_count == 1
+    failure = stats.failures['KeyError']
+    assert failure['count'] == 1
+    assert failure['samples'][0][0] == 'CC1=CC2CC(CC1)O2'
+    assert 'KeyError' in failure['traceback']
+
+
+def test_data_frame_parser_mol_col(data_frame, mols):
+    preprocessor = NFPPreprocessor()
+    parser = DataFrameParser(preprocessor, smiles_col='smiles',
+                             mol_col='mol')
+    # SMILES column is not parsed when `mol_col` is specified
+    df = data_frame.assign(smiles=['dummy'] * 3, mol=mols)
+    result = parser.parse(df, return_smiles=True)
+    dataset = result['dataset']
+    assert len(dataset) == 3
+    for i in range(3):
+        expect = preprocessor.get_input_features(mols[i])
+        check_input_features(dataset[i], expect)
+
+
 def test_data_frame_parser_extract_total_num(data_frame):
     """test `labels` option and retain_smiles=True."""
     preprocessor = NFPPreprocessor()
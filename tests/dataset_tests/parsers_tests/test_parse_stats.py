@@ -0,0 +1,33 @@
+import pytest
+
+from chainer_chemistry.dataset.parsers.parse_stats import ParseStats
+
+
+def test_parse_stats_add_failure():
+    stats = ParseStats(max_samples=2)
+    calls = []
+
+    def traceback():
+        calls.append(1)
+        return 'traceback'
+
+    for i in range(5):
+        stats.add_failure('ValueError', i, 'message', traceback=traceback)
+    stats.add_failure('InvalidMolecule', 'hoge')
+    assert stats.fail_count == 6
+    assert stats.failures['ValueError']['count'] == 5
+    assert stats.failures['ValueError']['samples'] == [
+        (0, 'message'), (1, 'message')]
+    # traceback is formatted only once
+    assert len(calls) == 1
+    assert stats.failures['ValueError']['traceback'] == 'traceback'
+    assert stats.failures['InvalidMolecule']['traceback'] is None
+
+    d = stats.to_dict()
+    assert d['fail_count'] == 6
+    assert d['failures']['InvalidMolecule']['count'] == 1
+    assert 'ValueError' in repr(stats)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
@@ -129,6 +129,14 @@ def test_sdf_file_parser_return_is_successful(sdf_file_long, mols):
     assert numpy.alltrue(is_successful[[1, 3, 4]])
     assert numpy.alltrue(~is_successful[[0, 2]])
 
+    stats = result['stats']
+    assert stats.total_count == 5
+    assert stats.success_count == 3
+    failure = stats.failures['MolFeatureExtractionError']
+    assert failure['count'] == 2
+    assert [sample for sample, _ in failure['samples']] == [0, 2]
+    assert failure['traceback'] is None
+
     # We assume NFPPreprocessor works as documented.
     for i in range(3):
         expect = preprocessor.get_input_features(mols[i])
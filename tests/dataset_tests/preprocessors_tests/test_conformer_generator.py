@@ -0,0 +1,107 @@
+import os
+
+import numpy
+import pytest
+from rdkit import Chem
+
+from chainer_chemistry.dataset.preprocessors.conformer_generator import ConformerGenerator  # NOQA
+
+
+def _distances(coordinates):
+    diff = coordinates[:, None, :] - coordinates[None, :, :]
+    return numpy.sqrt((diff * diff).sum(axis=-1))
+
+
+@pytest.fixture
+def mols():
+    return [Chem.MolFromSmiles(smiles)
+            for smiles in ['CN=C=O', 'Cc1ccccc1', 'OCC']]
+
+
+def test_generate(mols):
+    generator = ConformerGenerator(seed=0)
+    coordinates = generator.generate(mols[0])
+    assert coordinates.shape == (4, 3)
+    assert coordinates.dtype == numpy.float32
+    # deterministic with the same seed
+    numpy.testing.assert_array_equal(
+        ConformerGenerator(seed=0).generate(mols[0]), coordinates)
+
+
+def test_generate_atom_order():
+    # Same molecule with different atom order gives the same geometry
+    generator = ConformerGenerator(seed=0)
+    a = generator.generate(Chem.MolFromSmiles('OCC'))
+    b = generator.generate(Chem.MolFromSmiles('CCO'))
+    assert len(generator._memory) == 1
+    numpy.testing.assert_allclose(_distances(a), _distances(b)[::-1, ::-1],
+                                  atol=1e-6)
+
+
+@pytest.mark.parametrize('n_jobs,timeout', [(1, None), (2, None), (2, 60)])
+def test_generate_batch(mols, n_jobs, timeout):
+    generator = ConformerGenerator(seed=0, n_jobs=n_jobs, timeout=timeout)
+    coordinates_list = generator.generate_batch(mols)
+    generator.close()
+    expect = [ConformerGenerator(seed=0).generate(mol) for mol in mols]
+    assert len(coordinates_list) == 3
+    for actual, e in zip(coordinates_list, expect):
+        numpy.testing.assert_array_equal(actual, e)
+
+
+def test_generate_batch_timeout():
+    mol = Chem.MolFromSmiles('C1CCCCCCCCCCCCCCCCCCCCCCCCCCCCC1')
+    generator = ConformerGenerator(seed=0, n_jobs=2, timeout=1e-9)
+    assert generator.generate_batch([mol, mol]) == [None, None]
+    # Failure is cached
+    assert list(generator._memory.values()) == [None]
+
+
+def test_generate_reuse_pool(mols):
+    generator = ConformerGenerator(seed=0, n_jobs=2, timeout=60)
+    try:
+        generator.generate(mols[0])
+        pool = generator._pool
+        assert pool is not None
+        coordinates = generator.generate(mols[1])
+        assert generator._pool is pool
+    finally:
+        generator.close()
+    assert generator._pool is None
+    numpy.testing.assert_array_equal(
+        coordinates, ConformerGenerator(seed=0).generate(mols[1]))
+
+
+def test_generate_failure():
+    # Embedding is not possible without the atoms
+    generator = ConformerGenerator(seed=0)
+    generator._memory['C'] = None
+    assert generator.generate(Chem.MolFromSmiles('C')) is None
+
+
+def test_disk_cache(mols, tmpdir):
+    path = os.path.join(str(tmpdir), 'conformers.sqlite')
+    generator = ConformerGenerator(seed=0, cache_path=path)
+    expect = generator.generate_batch(mols)
+    generator.close()
+
+    generator = ConformerGenerator(seed=0, cache_path=path)
+    found = generator._lookup(['CCO', 'CN=C=O', 'CC'])
+    assert sorted(found.keys()) == ['CCO', 'CN=C=O']
+    for actual, e in zip(generator.generate_batch(mols), expect):
+        numpy.testing.assert_array_equal(actual, e)
+    generator.close()
+
+    # Different seed is not cached
+    generator = ConformerGenerator(seed=1, cache_path=path)
+    assert generator._lookup(['CCO']) == {}
+    generator.close()
+
+
+def test_invalid_n_jobs():
+    with pytest.raises(ValueError):
+        ConformerGenerator(n_jobs=0)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
@@ -32,6 +32,16 @@ def test_nfp_preprocessor(mol, pp):
     numpy.testing.assert_array_equal(actual_adj_array, expect_adj_array)
 
 
+def test_nfp_preprocessor_return_degree(mol):
+    pp = NFPPreprocessor(out_size=6, return_degree=True)
+    ret = pp.get_input_features(mol)
+    assert len(ret) == 3
+    degree_array = ret[2]
+    assert degree_array.dtype == numpy.int32
+    numpy.testing.assert_array_equal(
+        degree_array, numpy.array([1, 2, 2, 1, -1, -1], dtype=numpy.int32))
+
+
 def test_nfp_preprocessor_default():
     preprocessor = NFPPreprocessor()
 
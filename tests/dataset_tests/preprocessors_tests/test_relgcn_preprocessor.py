@@ -3,6 +3,7 @@ import pytest
 
 from chainer_chemistry.dataset.parsers import SmilesParser
 from chainer_chemistry.dataset.preprocessors import RelGCNPreprocessor
+from chainer_chemistry.models.relgcn import rescale_adj
 
 
 def test_relgcn_preprocessor():
@@ -125,6 +126,19 @@ def test_relgcn_preprocessor_kekulize():
     assert numpy.allclose(adjs1, expect_adjs)
 
 
+def test_relgcn_preprocessor_scale_adj():
+    smiles = ['C#N', 'Cc1cnc(C=O)n1C', 'c1ccccc1']
+    dataset = SmilesParser(RelGCNPreprocessor(out_size=10)).parse(
+        smiles)['dataset']
+    scaled_dataset = SmilesParser(
+        RelGCNPreprocessor(out_size=10, scale_adj=True)).parse(
+        smiles)['dataset']
+    for (_, adjs), (_, scaled_adjs) in zip(dataset, scaled_dataset):
+        assert scaled_adjs.dtype == numpy.float32
+        numpy.testing.assert_allclose(
+            scaled_adjs, rescale_adj(adjs[None]).data[0], rtol=1e-6)
+
+
 def test_relgcn_preprocessor_assert_raises():
     with pytest.raises(ValueError):
         pp = RelGCNPreprocessor(max_atoms=3, out_size=2)  # NOQA
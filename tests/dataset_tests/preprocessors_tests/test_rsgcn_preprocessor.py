@@ -88,6 +88,20 @@ def test_rsgcn_preprocessor_default():
     assert adjacency.dtype == numpy.float32
 
 
+def test_rsgcn_preprocessor_sparse(mol):
+    atoms, adj = RSGCNPreprocessor(out_size=6).get_input_features(mol)
+    ret = RSGCNPreprocessor(out_size=6, sparse=True).get_input_features(mol)
+    assert len(ret) == 3
+    sparse_atoms, edge_index, edge_weight = ret
+    numpy.testing.assert_array_equal(sparse_atoms, atoms)
+    assert edge_index.dtype == numpy.int32
+    assert edge_index.shape == (2, numpy.count_nonzero(adj))
+    assert edge_weight.dtype == numpy.float32
+    actual = numpy.zeros_like(adj)
+    actual[edge_index[0], edge_index[1]] = edge_weight
+    numpy.testing.assert_array_equal(actual, adj)
+
+
 def test_rsgcn_preprocessor_assert_raises():
     with pytest.raises(ValueError):
         RSGCNPreprocessor(max_atoms=3, out_size=2)  # NOQA
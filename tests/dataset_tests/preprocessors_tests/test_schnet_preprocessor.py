@@ -1,8 +1,12 @@
 import numpy
 import pytest
 from rdkit import Chem
+from rdkit.Chem import AllChem
 
 from chainer_chemistry.dataset.parsers import SmilesParser
+from chainer_chemistry.dataset.preprocessors.common import MolFeatureExtractionError  # NOQA
+from chainer_chemistry.dataset.preprocessors.conformer_generator import ConformerGenerator  # NOQA
+from chainer_chemistry.dataset.preprocessors.schnet_preprocessor import distance_matrix_from_coordinates  # NOQA
 from chainer_chemistry.dataset.preprocessors.schnet_preprocessor import SchNetPreprocessor  # NOQA
 
 
@@ -50,6 +54,76 @@ def test_schnet_preprocessor_default():
     assert adjs.dtype == numpy.float32
 
 
+def test_schnet_preprocessor_use_geometry():
+    # Atoms of 'OCC' are reordered to 'CCO' by canonicalization
+    mol = Chem.MolFromSmiles('OCC')
+    conformer = Chem.Conformer(3)
+    conformer.SetPositions(numpy.array([[0., 0., 0.], [1.4, 0., 0.],
+                                        [1.4, 1.5, 0.]]))
+    conformer.Set3D(True)
+    mol.AddConformer(conformer)
+    pp = SchNetPreprocessor(use_geometry=True, out_size=4)
+    canonical_smiles, mol = pp.prepare_smiles_and_mol(mol)
+    assert canonical_smiles == 'CCO'
+    atoms, dists = pp.get_input_features(mol)
+    numpy.testing.assert_array_equal(atoms, [6, 6, 8, 0])
+    expect_dists = numpy.array([[0., 1.5, numpy.hypot(1.4, 1.5), 0.],
+                                [1.5, 0., 1.4, 0.],
+                                [numpy.hypot(1.4, 1.5), 1.4, 0., 0.],
+                                [0., 0., 0., 0.]], dtype=numpy.float32)
+    numpy.testing.assert_allclose(dists, expect_dists, rtol=1e-6)
+
+
+def test_schnet_preprocessor_use_geometry_add_Hs(mol):
+    mol = Chem.AddHs(mol)
+    AllChem.EmbedMolecule(mol, randomSeed=0)
+    mol = Chem.RemoveHs(mol)
+    pp = SchNetPreprocessor(use_geometry=True, add_Hs=True)
+    _, mol = pp.prepare_smiles_and_mol(mol)
+    atoms, dists = pp.get_input_features(mol)
+    assert atoms.shape == (7,)
+    assert dists.shape == (7, 7)
+    assert (dists[~numpy.eye(7, dtype=bool)] > 0.5).all()
+
+
+def test_schnet_preprocessor_use_geometry_without_conformer(mol, pp):
+    pp = SchNetPreprocessor(use_geometry=True)
+    _, mol = pp.prepare_smiles_and_mol(mol)
+    with pytest.raises(MolFeatureExtractionError):
+        pp.get_input_features(mol)
+
+
+@pytest.mark.parametrize('out_size', [-1, 6])
+def test_schnet_preprocessor_conformer_generator(mol, out_size):
+    generator = ConformerGenerator(seed=0)
+    pp = SchNetPreprocessor(conformer_generator=generator, out_size=out_size)
+    pp_coords = SchNetPreprocessor(conformer_generator=generator,
+                                   out_size=out_size, return_coordinates=True)
+    pp.prefetch(['CN=C=O', 'invalid'])
+    assert list(generator._memory.keys()) == ['CN=C=O']
+
+    _, mol = pp.prepare_smiles_and_mol(mol)
+    atoms, dists = pp.get_input_features(mol)
+    atoms_c, coords = pp_coords.get_input_features(mol)
+    size = 4 if out_size < 0 else out_size
+    assert dists.shape == (size, size)
+    assert dists.dtype == numpy.float32
+    assert coords.shape == (size, 3)
+    assert coords.dtype == numpy.float32
+    numpy.testing.assert_array_equal(atoms, atoms_c)
+    numpy.testing.assert_allclose(
+        distance_matrix_from_coordinates(coords, atoms != 0), dists,
+        rtol=1e-5, atol=1e-6)
+
+
+def test_schnet_preprocessor_return_coordinates(mol):
+    pp = SchNetPreprocessor(return_coordinates=True, out_size=6)
+    atoms, coords = pp.get_input_features(mol)
+    assert atoms.shape == (6,)
+    assert coords.shape == (6, 3)
+    numpy.testing.assert_array_equal(coords[4:], 0)
+
+
 def test_schnet_preprocessor_assert_raises():
     with pytest.raises(ValueError):
         pp = SchNetPreprocessor(max_atoms=3, out_size=2)  # NOQA
@@ -0,0 +1,50 @@
+import numpy
+import pytest
+
+from chainer_chemistry.dataset.converters import concat_mols
+from chainer_chemistry.dataset.parsers import SmilesParser
+from chainer_chemistry.dataset.preprocessors.weavenet_preprocessor import WeaveNetPreprocessor  # NOQA
+from chainer_chemistry.models.weavenet import WeaveNet
+
+
+@pytest.mark.parametrize('use_fixed_atom_feature', [True, False])
+def test_weavenet_preprocessor_zero_padding(use_fixed_atom_feature):
+    pp = WeaveNetPreprocessor(
+        max_atoms=10, use_fixed_atom_feature=use_fixed_atom_feature)
+    dataset = SmilesParser(pp).parse(['C#N', 'CC=O'])['dataset']
+    atoms, pairs = dataset[0]
+    assert atoms.shape[0] == 10
+    assert pairs.shape[0] == 100
+    assert pairs.ndim == 2
+
+
+@pytest.mark.parametrize('use_fixed_atom_feature', [True, False])
+def test_weavenet_preprocessor_without_padding(use_fixed_atom_feature):
+    pp = WeaveNetPreprocessor(
+        max_atoms=-1, use_fixed_atom_feature=use_fixed_atom_feature,
+        zero_padding=False)
+    dataset = SmilesParser(pp).parse(['C#N', 'CC=O'])['dataset']
+    # hydrogens are added
+    n_atoms = [3, 7]
+    for i, n_atom in enumerate(n_atoms):
+        atoms, pairs = dataset[i]
+        assert atoms.shape[0] == n_atom
+        assert pairs.shape[:2] == (n_atom, n_atom)
+
+    # minibatch is padded to the largest molecule
+    atoms, pairs = concat_mols([dataset[0], dataset[1]])
+    assert atoms.shape[:2] == (2, 7)
+    assert pairs.shape[:3] == (2, 7, 7)
+    numpy.testing.assert_array_equal(pairs[0, 3:], 0)
+    numpy.testing.assert_array_equal(pairs[0, :, 3:], 0)
+    y = WeaveNet(weave_channels=[8], hidden_dim=4)(atoms, pairs)
+    assert y.shape == (2, 8)
+
+
+def test_weavenet_preprocessor_assert_raises():
+    with pytest.raises(ValueError):
+        WeaveNetPreprocessor(max_atoms=-1)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
@@ -1,8 +1,11 @@
 import chainer
 import numpy
 import pytest
+import scipy.sparse
 
 from chainer_chemistry.dataset.converters import concat_mols
+from chainer_chemistry.dataset.converters import concat_mols_with_distance
+from chainer_chemistry.dataset.converters import concat_mols_with_sparse_adj  # NOQA
 
 
 @pytest.fixture
@@ -45,6 +48,50 @@ def test_concat_mols_2d_cpu(data_2d, data_2d_expect):
     assert numpy.array_equal(result[1], data_2d_expect[1])
 
 
+def test_concat_mols_with_distance():
+    rs = numpy.random.RandomState(0)
+    coords0 = rs.uniform(size=(2, 3)).astype(numpy.float32)
+    coords1 = rs.uniform(size=(3, 3)).astype(numpy.float32)
+    batch = [(numpy.array([6, 8], dtype=numpy.int32), coords0,
+              numpy.array([1.], dtype=numpy.float32)),
+             (numpy.array([6, 6, 7], dtype=numpy.int32), coords1,
+              numpy.array([2.], dtype=numpy.float32))]
+    atoms, dists, labels = concat_mols_with_distance(batch)
+    assert atoms.shape == (2, 3)
+    assert dists.shape == (2, 3, 3)
+    assert dists.dtype == numpy.float32
+    for i, coords in enumerate([coords0, coords1]):
+        n = len(coords)
+        expect = numpy.linalg.norm(coords[:, None] - coords[None], axis=2)
+        numpy.testing.assert_allclose(dists[i, :n, :n], expect, rtol=1e-5,
+                                      atol=1e-6)
+    # Distances to padded atoms are zero
+    numpy.testing.assert_array_equal(dists[0, 2], 0)
+    numpy.testing.assert_array_equal(dists[0, :, 2], 0)
+    numpy.testing.assert_array_equal(labels, [[1.], [2.]])
+
+
+def test_concat_mols_with_sparse_adj():
+    adj0 = numpy.array([[0.5, 0.5], [0.5, 0.5]], dtype=numpy.float32)
+    adj1 = numpy.array([[0.5, 0.4, 0.], [0.4, 0.3, 0.4], [0., 0.4, 0.5]],
+                       dtype=numpy.float32)
+    batch = []
+    for atoms, adj, label in [([6, 8], adj0, 1.), ([6, 6, 7], adj1, 2.)]:
+        row, col = numpy.nonzero(adj)
+        batch.append((numpy.array(atoms, dtype=numpy.int32),
+                      numpy.array([row, col], dtype=numpy.int32),
+                      adj[row, col], numpy.array([label], numpy.float32)))
+    atoms, adj, labels = concat_mols_with_sparse_adj(batch)
+    assert atoms.shape == (2, 3)
+    assert scipy.sparse.issparse(adj)
+    assert adj.shape == (6, 6)
+    expect = numpy.zeros((6, 6), dtype=numpy.float32)
+    expect[:2, :2] = adj0
+    expect[3:, 3:] = adj1
+    numpy.testing.assert_array_equal(adj.toarray(), expect)
+    numpy.testing.assert_array_equal(labels, [[1.], [2.]])
+
+
 @pytest.mark.gpu
 def test_concat_mols_1d_gpu(data_1d, data_1d_expect):
     result = concat_mols(data_1d, device=0)
@@ -1,9 +1,15 @@
+import io
 import os
+import sys
+import tarfile
 
 import numpy
+import pandas
 import pytest
+from rdkit import Chem
 
 from chainer_chemistry.dataset.preprocessors.atomic_number_preprocessor import AtomicNumberPreprocessor  # NOQA
+from chainer_chemistry.dataset.preprocessors.schnet_preprocessor import SchNetPreprocessor  # NOQA
 from chainer_chemistry.datasets import qm9
 
 
@@ -92,6 +98,124 @@ def test_get_qm9_smiles():
                                    dtype=numpy.int32))
 
 
+def _xyz_content(n_carbons, properties, rotate=False):
+    # Linear chain of carbons along x axis, with a hydrogen in the middle.
+    order = list(range(n_carbons))
+    if rotate:
+        # Heavy atoms are not in the order of SMILES
+        order = order[1:] + order[:1]
+    atoms = ['C\t{}\t0.0\t0.0\t0.0'.format(1.5 * i) for i in order]
+    atoms.insert(1, 'H\t0.0\t1.0\t1.2*^-6\t0.0')
+    smiles = 'C' * n_carbons
+    lines = [str(len(atoms)),
+             'gdb 1\t' + '\t'.join(str(p) for p in properties)] + atoms + \
+        ['1.0\t2.0', '{}\t{}'.format(smiles, smiles), 'InChI=1S/x']
+    return '\n'.join(lines).encode('utf-8')
+
+
+@pytest.fixture
+def qm9_tar(tmpdir):
+    # Members are written in reversed order to check sorting.
+    path = str(tmpdir.join('qm9.tar.bz2'))
+    with tarfile.open(path, 'w:bz2') as tf:
+        for i in reversed(range(5)):
+            content = _xyz_content(i + 1, [float(i)] * QM9_NUM_LABEL,
+                                   rotate=i % 2 == 1)
+            info = tarfile.TarInfo('dsgdb9nsd_{:06d}.xyz'.format(i + 1))
+            info.size = len(content)
+            tf.addfile(info, io.BytesIO(content))
+    return path
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_download_and_extract_qm9(qm9_tar, tmpdir, monkeypatch, n_jobs):
+    monkeypatch.setattr(qm9.download, 'cached_download',
+                        lambda url: qm9_tar)
+    csv_path = str(tmpdir.join('qm9.csv'))
+    cache_path = str(tmpdir.join('qm9.npz'))
+    assert qm9.download_and_extract_qm9(csv_path, cache_path, n_jobs=n_jobs,
+                                        chunk_size=2)
+
+    df = qm9._load_columns(cache_path)
+    assert list(df.columns) == ['SMILES1', 'SMILES2'] + \
+        qm9.get_qm9_label_names()
+    assert list(df['SMILES1']) == ['C' * (i + 1) for i in range(5)]
+    numpy.testing.assert_array_equal(df['gap'].values, numpy.arange(5))
+    assert not any(name.endswith('.xyz') for name in os.listdir(str(tmpdir)))
+
+    # csv is compatible with the cache
+    df_csv = pandas.read_csv(csv_path)
+    assert list(df_csv['SMILES1']) == list(df['SMILES1'])
+    numpy.testing.assert_array_equal(df_csv['U0'].values, df['U0'].values)
+
+    # Geometry of heavy atoms in the order of SMILES1
+    df = qm9._load_columns(cache_path, geometry=True)
+    numpy.testing.assert_array_equal(df['atom_order'][2], [0, 2, 3])
+    numpy.testing.assert_allclose(df['positions'][2][:, 0], [0., 1.5, 3.])
+    for i in range(5):
+        positions = df['positions'][i]
+        assert positions.shape == (i + 1, 3)
+        bond_lengths = numpy.linalg.norm(positions[1:] - positions[:-1],
+                                         axis=1)
+        numpy.testing.assert_allclose(bond_lengths, 1.5)
+
+
+def test_parse_xyz_without_determine_bonds(monkeypatch):
+    # RDKit older than 2022.09 does not have rdDetermineBonds.
+    monkeypatch.setitem(sys.modules, 'rdkit.Chem.rdDetermineBonds', None)
+    monkeypatch.delattr(Chem, 'rdDetermineBonds', raising=False)
+    _, positions, order = qm9._parse_xyz(
+        _xyz_content(3, [0.] * QM9_NUM_LABEL, rotate=True))
+    assert order == [-1, -1, -1]
+    assert numpy.isnan(positions).all()
+
+    # Atoms in the order of SMILES are mapped without it.
+    _, positions, order = qm9._parse_xyz(
+        _xyz_content(3, [0.] * QM9_NUM_LABEL))
+    assert order == [0, 2, 3]
+
+
+def test_get_qm9_from_cache(qm9_tar, tmpdir, monkeypatch):
+    monkeypatch.setattr(qm9.download, 'cached_download',
+                        lambda url: qm9_tar)
+    monkeypatch.setattr(qm9.download, 'get_dataset_directory',
+                        lambda root: str(tmpdir))
+    dataset, smiles = qm9.get_qm9(labels='gap', return_smiles=True)
+    assert os.path.exists(str(tmpdir.join('qm9.npz')))
+    assert len(dataset) == 5
+    assert smiles[2] == 'CCC'
+    atoms, label = dataset[2]
+    numpy.testing.assert_array_equal(atoms, [6, 6, 6])
+    assert label.dtype == numpy.float32
+    numpy.testing.assert_array_equal(label, [2.])
+
+    # Cache is rebuilt from csv of older version
+    os.remove(str(tmpdir.join('qm9.npz')))
+    dataset = qm9.get_qm9(labels='gap')
+    assert os.path.exists(str(tmpdir.join('qm9.npz')))
+    assert len(dataset) == 5
+
+
+def test_get_qm9_geometry(qm9_tar, tmpdir, monkeypatch):
+    monkeypatch.setattr(qm9.download, 'cached_download',
+                        lambda url: qm9_tar)
+    monkeypatch.setattr(qm9.download, 'get_dataset_directory',
+                        lambda root: str(tmpdir))
+    # Cache without geometry is extracted again
+    qm9.get_qm9(labels='gap')
+    df = pandas.DataFrame(qm9._load_columns(str(tmpdir.join('qm9.npz'))))
+    qm9._save_columns(str(tmpdir.join('qm9.npz')), df)
+
+    pp = SchNetPreprocessor(use_geometry=True)
+    dataset = qm9.get_qm9(preprocessor=pp, labels='gap', target_index=[1, 3])
+    assert len(dataset) == 2
+    atoms, dists, label = dataset[1]
+    numpy.testing.assert_array_equal(atoms, [6, 6, 6, 6])
+    assert dists.dtype == numpy.float32
+    numpy.testing.assert_allclose(dists[0], [0., 1.5, 3., 4.5], atol=1e-6)
+    numpy.testing.assert_array_equal(label, [3.])
+
+
 def test_get_qm9_label_names():
     label_names = qm9.get_qm9_label_names()
     assert isinstance(label_names, list)
@@ -0,0 +1,90 @@
+import numpy
+import pytest
+
+import chainer
+from chainer import cuda
+from chainer import gradient_check
+
+import chainer_chemistry
+
+batch_size = 2
+num_edge_type = 3
+node = 4
+ch = 5
+
+
+@pytest.fixture
+def inputs():
+    numpy.random.seed(0)
+    adj = numpy.random.randint(
+        0, 2, (batch_size, num_edge_type, node, node)).astype(numpy.float32)
+    m = numpy.random.uniform(
+        -1, 1, (batch_size, num_edge_type, node, ch)).astype(numpy.float32)
+    return adj, m
+
+
+@pytest.fixture
+def grads():
+    numpy.random.seed(1)
+    gy = numpy.random.uniform(
+        -1, 1, (batch_size, node, ch)).astype(numpy.float32)
+    ggadj = numpy.random.uniform(
+        -1, 1, (batch_size, num_edge_type, node, node)).astype(numpy.float32)
+    ggm = numpy.random.uniform(
+        -1, 1, (batch_size, num_edge_type, node, ch)).astype(numpy.float32)
+    return gy, ggadj, ggm
+
+
+def check_forward(adj, m):
+    y = chainer_chemistry.functions.relational_matmul(adj, m)
+    y_expect = numpy.matmul(cuda.to_cpu(adj), cuda.to_cpu(m)).sum(axis=1)
+    assert y.shape == (batch_size, node, ch)
+    numpy.testing.assert_allclose(cuda.to_cpu(y.data), y_expect, rtol=1e-5,
+                                  atol=1e-6)
+
+    folded = chainer_chemistry.functions.fold_adj(adj)
+    assert folded.shape == (batch_size, node, num_edge_type * node)
+    y_folded = chainer_chemistry.functions.relational_matmul(folded, m)
+    numpy.testing.assert_allclose(cuda.to_cpu(y_folded.data), y_expect,
+                                  rtol=1e-5, atol=1e-6)
+
+
+def test_forward_cpu(inputs):
+    check_forward(*inputs)
+
+
+@pytest.mark.gpu
+def test_forward_gpu(inputs):
+    check_forward(*map(cuda.to_gpu, inputs))
+
+
+def test_fold_adj_variable(inputs):
+    adj, _ = inputs
+    folded = chainer_chemistry.functions.fold_adj(chainer.Variable(adj))
+    assert isinstance(folded, chainer.Variable)
+    numpy.testing.assert_array_equal(
+        folded.data, chainer_chemistry.functions.fold_adj(adj))
+
+
+def test_backward_cpu(inputs, grads):
+    gradient_check.check_backward(
+        chainer_chemistry.functions.relational_matmul, inputs, grads[0],
+        atol=1e-3, rtol=1e-3)
+
+
+@pytest.mark.gpu
+def test_backward_gpu(inputs, grads):
+    gradient_check.check_backward(
+        chainer_chemistry.functions.relational_matmul,
+        tuple(map(cuda.to_gpu, inputs)), cuda.to_gpu(grads[0]),
+        atol=1e-3, rtol=1e-3)
+
+
+def test_double_backward_cpu(inputs, grads):
+    gradient_check.check_double_backward(
+        chainer_chemistry.functions.relational_matmul, inputs, grads[0],
+        grads[1:], atol=1e-3, rtol=1e-3)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
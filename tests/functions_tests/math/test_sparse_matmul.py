@@ -0,0 +1,48 @@
+import numpy
+import pytest
+import scipy.sparse
+
+from chainer import gradient_check
+
+import chainer_chemistry
+
+
+@pytest.fixture
+def inputs():
+    numpy.random.seed(0)
+    a = numpy.random.uniform(-1, 1, (5, 4)).astype(numpy.float32)
+    a[numpy.random.uniform(size=a.shape) < 0.5] = 0
+    b = numpy.random.uniform(-1, 1, (4, 3)).astype(numpy.float32)
+    gy = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+    ggb = numpy.random.uniform(-1, 1, (4, 3)).astype(numpy.float32)
+    return a, b, gy, ggb
+
+
+def test_forward_cpu(inputs):
+    a, b = inputs[:2]
+    y = chainer_chemistry.functions.sparse_matmul(
+        scipy.sparse.coo_matrix(a), b)
+    assert y.dtype == numpy.float32
+    numpy.testing.assert_allclose(y.data, a.dot(b), rtol=1e-5, atol=1e-6)
+
+
+def test_backward_cpu(inputs):
+    a, b, gy, ggb = inputs
+    sparse_a = scipy.sparse.csr_matrix(a)
+
+    def f(b):
+        return chainer_chemistry.functions.sparse_matmul(sparse_a, b)
+    gradient_check.check_backward(f, b, gy, atol=1e-3, rtol=1e-3)
+    gradient_check.check_double_backward(f, b, gy, ggb, atol=1e-3,
+                                         rtol=1e-3)
+
+
+def test_sparse_matmul_non_numpy_raises(inputs):
+    a, b = inputs[:2]
+    with pytest.raises(TypeError):
+        chainer_chemistry.functions.sparse_matmul(
+            scipy.sparse.csr_matrix(a), b.tolist())
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
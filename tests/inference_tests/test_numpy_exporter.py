@@ -0,0 +1,161 @@
+import os
+
+import chainer
+from chainer import functions
+import numpy
+import pytest
+
+from chainer_chemistry.config import MAX_ATOMIC_NUM
+from chainer_chemistry.functions import GeneralReadout
+from chainer_chemistry.inference import load_numpy_model
+from chainer_chemistry.inference import NumpyInferenceModel
+from chainer_chemistry.inference.numpy_exporter import export_numpy_model
+from chainer_chemistry.models import GGNN
+from chainer_chemistry.models import MLP
+from chainer_chemistry.models import NFP
+from chainer_chemistry.models import Regressor
+from chainer_chemistry.models import RelGCN
+from chainer_chemistry.models import RSGCN
+from chainer_chemistry.models import SchNet
+
+atom_size = 5
+out_dim = 4
+batch_size = 3
+num_edge_type = 4
+
+
+class GraphConvPredictor(chainer.Chain):
+
+    def __init__(self, graph_conv, mlp=None):
+        super(GraphConvPredictor, self).__init__()
+        with self.init_scope():
+            self.graph_conv = graph_conv
+            if isinstance(mlp, chainer.Link):
+                self.mlp = mlp
+        if not isinstance(mlp, chainer.Link):
+            self.mlp = mlp
+
+    def __call__(self, atoms, adjs):
+        h = self.graph_conv(atoms, adjs)
+        if self.mlp:
+            h = self.mlp(h)
+        return h
+
+
+def _atom_data():
+    numpy.random.seed(0)
+    atom_data = numpy.random.randint(
+        0, high=MAX_ATOMIC_NUM, size=(batch_size, atom_size)).astype('i')
+    # padding atom
+    atom_data[0, -1] = 0
+    return atom_data
+
+
+def _adj_data():
+    adj = numpy.random.randint(
+        0, high=2, size=(batch_size, atom_size, atom_size)).astype('f')
+    adj = numpy.maximum(adj, adj.transpose(0, 2, 1))
+    adj[0, -1, :] = 0
+    adj[0, :, -1] = 0
+    return adj
+
+
+def _edge_adj_data():
+    adj = numpy.random.randint(
+        0, high=2, size=(batch_size, num_edge_type, atom_size, atom_size)
+    ).astype('f')
+    return numpy.maximum(adj, adj.transpose(0, 1, 3, 2))
+
+
+def _check(model, inputs, rtol=1e-4, atol=1e-4):
+    with chainer.using_config('train', False), chainer.no_backprop_mode():
+        y_expect = model(*inputs).array
+    numpy_model = export_numpy_model(model)
+    assert isinstance(numpy_model, NumpyInferenceModel)
+    y_actual = numpy_model(*inputs)
+    assert y_actual.dtype == numpy.float32
+    numpy.testing.assert_allclose(y_actual, y_expect, rtol=rtol, atol=atol)
+    return numpy_model
+
+
+def test_nfp():
+    model = GraphConvPredictor(NFP(out_dim=out_dim, n_layers=2),
+                               MLP(out_dim=1, hidden_dim=8))
+    _check(model, (_atom_data(), _adj_data()))
+
+
+@pytest.mark.parametrize('weight_tying', [True, False])
+@pytest.mark.parametrize('concat_hidden', [True, False])
+def test_ggnn(weight_tying, concat_hidden):
+    model = GGNN(out_dim=out_dim, n_layers=3, weight_tying=weight_tying,
+                 concat_hidden=concat_hidden)
+    _check(model, (_atom_data(), _edge_adj_data()))
+
+
+@pytest.mark.parametrize('use_batch_norm', [True, False])
+@pytest.mark.parametrize('readout_mode', ['sum', 'max', 'summax'])
+def test_rsgcn(use_batch_norm, readout_mode):
+    model = RSGCN(out_dim=out_dim, use_batch_norm=use_batch_norm,
+                  readout=GeneralReadout(mode=readout_mode))
+    if use_batch_norm:
+        for bnorm in model.bnorms:
+            bnorm.avg_mean[:] = numpy.random.uniform(-1, 1,
+                                                     bnorm.avg_mean.shape)
+            bnorm.avg_var[:] = numpy.random.uniform(0.5, 2,
+                                                    bnorm.avg_var.shape)
+    _check(model, (_atom_data(), _adj_data()))
+
+
+@pytest.mark.parametrize('scale_adj', [True, False])
+def test_relgcn(scale_adj):
+    model = RelGCN(out_channels=out_dim, scale_adj=scale_adj)
+    _check(model, (_atom_data(), _edge_adj_data()))
+
+
+def test_regressor():
+    predictor = GraphConvPredictor(NFP(out_dim=out_dim, n_layers=2))
+    regressor = Regressor(predictor)
+    inputs = (_atom_data(), _adj_data())
+    numpy_model = export_numpy_model(regressor)
+    with chainer.using_config('train', False):
+        y_expect = predictor(*inputs).array
+    numpy.testing.assert_allclose(numpy_model(*inputs), y_expect,
+                                  rtol=1e-4, atol=1e-4)
+
+
+def test_mlp_activation():
+    model = MLP(out_dim=out_dim, n_layers=3, activation=functions.tanh)
+    x = numpy.random.uniform(-1, 1, (batch_size, 6)).astype('f')
+    _check(model, (x,))
+
+
+def test_uninitialized_params():
+    model = MLP(out_dim=out_dim)
+    with pytest.raises(ValueError):
+        export_numpy_model(model)
+
+
+def test_unsupported_model():
+    with pytest.raises(NotImplementedError):
+        export_numpy_model(SchNet(out_dim=out_dim))
+
+
+def test_save_load(tmpdir):
+    model = GraphConvPredictor(GGNN(out_dim=out_dim, n_layers=2),
+                               MLP(out_dim=1, hidden_dim=8))
+    inputs = (_atom_data(), _edge_adj_data())
+    numpy_model = _check(model, inputs)
+
+    filepath = os.path.join(str(tmpdir), 'model.npz')
+    numpy_model.save(filepath)
+    numpy_model_load = load_numpy_model(filepath)
+    assert numpy_model_load.spec == numpy_model.spec
+    numpy.testing.assert_array_equal(numpy_model_load(*inputs),
+                                     numpy_model(*inputs))
+    numpy.testing.assert_allclose(
+        numpy_model_load.predict(inputs, batchsize=2), numpy_model(*inputs),
+        rtol=1e-5, atol=1e-5)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
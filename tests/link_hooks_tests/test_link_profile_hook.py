@@ -0,0 +1,94 @@
+import numpy
+import pytest
+import six
+
+import chainer
+from chainer import functions
+from chainer.links import Linear
+
+from chainer_chemistry.link_hooks import is_link_hooks_available
+if is_link_hooks_available:
+    from chainer_chemistry.link_hooks import LinkProfileHook
+
+
+class DummyModel(chainer.Chain):
+    def __init__(self):
+        super(DummyModel, self).__init__()
+        with self.init_scope():
+            self.l1 = Linear(3, 4)
+            self.l2 = Linear(4, 1)
+
+    def forward(self, x):
+        return self.l2(functions.relu(self.l1(x)))
+
+
+@pytest.fixture
+def model():
+    return DummyModel()
+
+
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+def test_link_profile_hook(model):
+    x = numpy.ones((5, 3), dtype=numpy.float32)
+    hook = LinkProfileHook(root=model)
+    with hook:
+        model(x)
+        y = model(x)
+        functions.sum(y).backward()
+    # Hook is removed after `with` statement
+    model(x)
+
+    summary = hook.summary()
+    assert list(summary.keys()) == ['l1', 'l2', 'DummyModel']
+    assert summary['l1']['count'] == 2
+    assert summary['DummyModel']['count'] == 2
+    # output of l1 is (5, 4) float32
+    assert summary['l1']['forward_bytes'] == 2 * 5 * 4 * 4
+    assert summary['l2']['forward_bytes'] == 2 * 5 * 1 * 4
+    for record in summary.values():
+        assert record['forward_time'] > 0
+        assert record['backward_time'] > 0
+        assert record['backward_bytes'] > 0
+        assert record['total_time'] == pytest.approx(
+            record['forward_time'] + record['backward_time'])
+    # Parent includes the child
+    assert (summary['DummyModel']['backward_time'] >=
+            summary['l1']['backward_time'])
+
+    hook.reset()
+    assert hook.summary() == {}
+
+
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+def test_link_profile_hook_without_root(model):
+    x = numpy.ones((5, 3), dtype=numpy.float32)
+    hook = LinkProfileHook()
+    with hook:
+        model(x)
+    summary = hook.summary(sort_by='count')
+    assert list(summary.keys()) == ['Linear', 'DummyModel']
+    assert summary['Linear']['count'] == 2
+    assert summary['Linear']['backward_time'] == 0
+
+    with pytest.raises(ValueError):
+        hook.summary(sort_by='invalid_key')
+
+
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+def test_link_profile_hook_print_report(model):
+    x = numpy.ones((5, 3), dtype=numpy.float32)
+    hook = LinkProfileHook(root=model)
+    with hook:
+        model(x)
+    f = six.StringIO()
+    hook.print_report(file=f)
+    lines = f.getvalue().splitlines()
+    assert lines[0].startswith('LinkPath')
+    assert len(lines) == 4
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
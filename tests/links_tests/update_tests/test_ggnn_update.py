@@ -5,6 +5,7 @@ import numpy
 import pytest
 
 from chainer_chemistry.config import MAX_ATOMIC_NUM
+from chainer_chemistry.functions import fold_adj
 from chainer_chemistry.links import EmbedAtomID
 from chainer_chemistry.links import GGNNUpdate
 from chainer_chemistry.utils.permutation import permute_adj
@@ -56,6 +57,15 @@ def test_forward_gpu(update, data):
     check_forward(update, atom_data, adj_data)
 
 
+def test_forward_cpu_folded_adj(update, data):
+    atom_data, adj_data = data[:2]
+    update.reset_state()
+    y_expect = update(atom_data, adj_data).data
+    update.reset_state()
+    y_actual = update(atom_data, fold_adj(adj_data)).data
+    numpy.testing.assert_allclose(y_actual, y_expect, rtol=1e-5, atol=1e-6)
+
+
 def check_backward(update, atom_data, adj_data, y_grad):
     """Check gradient of GGNNUpdate.
 
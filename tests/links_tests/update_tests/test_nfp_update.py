@@ -1,3 +1,4 @@
+import chainer
 from chainer import cuda
 from chainer import gradient_check
 import numpy
@@ -6,6 +7,8 @@ import pytest
 from chainer_chemistry.config import MAX_ATOMIC_NUM
 from chainer_chemistry.links import EmbedAtomID
 from chainer_chemistry.links import NFPUpdate
+from chainer_chemistry.links.update.nfp_update import compute_degree
+from chainer_chemistry.links.update.nfp_update import get_degree_indices
 from chainer_chemistry.utils.permutation import permute_adj
 from chainer_chemistry.utils.permutation import permute_node
 
@@ -71,6 +74,49 @@ def test_backward_gpu(update, data):
         update, (atom_data, adj_data, deg_conds), y_grad, atol=1e-3, rtol=1e-3)
 
 
+def test_forward_cpu_bucketed(update, data):
+    atom_data, adj_data, deg_conds = data[:3]
+    y_expect = update(atom_data, adj_data, deg_conds).data
+    degree_indices = get_degree_indices(
+        compute_degree(adj_data), num_degree_type)
+    y_actual = update(atom_data, adj_data, degree_indices=degree_indices).data
+    numpy.testing.assert_allclose(y_actual, y_expect, rtol=1e-5, atol=1e-6)
+    # degree is computed from adj_data when neither is given
+    numpy.testing.assert_allclose(
+        update(atom_data, adj_data).data, y_expect, rtol=1e-5, atol=1e-6)
+
+
+def test_backward_cpu_bucketed_same_grads(update, data):
+    atom_data, adj_data, deg_conds, y_grad = data
+    grads = []
+    for kwargs in [{'deg_conds': deg_conds}, {}]:
+        h = chainer.Variable(atom_data)
+        y = update(h, adj_data, **kwargs)
+        update.cleargrads()
+        y.grad = y_grad
+        y.backward()
+        grads.append([h.grad] + [param.grad for _, param in
+                                 sorted(update.namedparams())])
+    for expect, actual in zip(*grads):
+        if actual is None:
+            # weight of the degree which no atom has
+            numpy.testing.assert_array_equal(expect, 0)
+        else:
+            numpy.testing.assert_allclose(actual, expect, rtol=1e-5,
+                                          atol=1e-6)
+
+
+def test_backward_cpu_bucketed(update, data):
+    atom_data, adj_data, _, y_grad = data
+    degree_indices = get_degree_indices(
+        compute_degree(adj_data), num_degree_type)
+
+    def f(atom_data, adj_data):
+        return update(atom_data, adj_data, degree_indices=degree_indices)
+    gradient_check.check_backward(
+        f, (atom_data, adj_data), y_grad, atol=1e-3, rtol=1e-3)
+
+
 def test_forward_cpu_graph_invariant(update, data):
     atom_data, adj_data, deg_conds = data[:3]
     y_actual = cuda.to_cpu(update(atom_data, adj_data, deg_conds).data)
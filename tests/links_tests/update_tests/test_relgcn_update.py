@@ -4,6 +4,7 @@ import numpy
 import pytest
 
 from chainer_chemistry.config import MAX_ATOMIC_NUM
+from chainer_chemistry.functions import fold_adj
 from chainer_chemistry.links import EmbedAtomID
 from chainer_chemistry.links import RelGCNUpdate
 from chainer_chemistry.utils.permutation import permute_adj
@@ -48,6 +49,13 @@ def test_forward_cpu(update, data):
     check_forward(update, atom_data, adj_data)
 
 
+def test_forward_cpu_folded_adj(update, data):
+    atom_data, adj_data = data[:2]
+    y_expect = update(atom_data, adj_data).data
+    y_actual = update(atom_data, fold_adj(adj_data)).data
+    numpy.testing.assert_allclose(y_actual, y_expect, rtol=1e-5, atol=1e-6)
+
+
 @pytest.mark.gpu
 def test_forward_gpu(update, data):
     atom_data, adj_data = map(cuda.to_gpu, data[:2])
@@ -2,6 +2,7 @@ from chainer import cuda
 from chainer import gradient_check
 import numpy
 import pytest
+import scipy.sparse
 
 from chainer_chemistry.config import MAX_ATOMIC_NUM
 from chainer_chemistry.links import EmbedAtomID
@@ -46,6 +47,22 @@ def test_forward_cpu(update, data):
     check_forward(update, atom_data, adj_data)
 
 
+def test_forward_cpu_sparse(update, data):
+    atom_data, adj_data = data[:2]
+    y_expect = update(atom_data, adj_data).data
+    sparse_adj = scipy.sparse.block_diag(adj_data, format='csr')
+    y_actual = update(atom_data, sparse_adj).data
+    numpy.testing.assert_allclose(y_actual, y_expect, rtol=1e-5, atol=1e-6)
+
+
+def test_backward_cpu_sparse(update, data):
+    atom_data, adj_data, y_grad = data
+    sparse_adj = scipy.sparse.block_diag(adj_data, format='csr')
+    gradient_check.check_backward(
+        lambda h: update(h, sparse_adj), atom_data, y_grad,
+        params=(update.graph_linear.W,), atol=1e-3, rtol=1e-3)
+
+
 @pytest.mark.gpu
 def test_forward_gpu(update, data):
     atom_data, adj_data = map(cuda.to_gpu, data[:2])
@@ -6,6 +6,8 @@ import pytest
 from chainer_chemistry.config import MAX_ATOMIC_NUM
 from chainer_chemistry.links import EmbedAtomID
 from chainer_chemistry.links import SchNetUpdate
+from chainer_chemistry.links.update.schnet_update import CFConv
+from chainer_chemistry.links.update.schnet_update import cosine_cutoff
 from chainer_chemistry.utils.permutation import permute_adj
 from chainer_chemistry.utils.permutation import permute_node
 
@@ -82,5 +84,89 @@ def test_forward_cpu_graph_invariant(update, data):
         permute_y_actual, rtol=1e-5, atol=1e-5)
 
 
+@pytest.fixture
+def cfconv_data():
+    numpy.random.seed(0)
+    h = numpy.random.uniform(
+        -1, 1, (batch_size, atom_size, hidden_dim)).astype('f')
+    dist = numpy.random.uniform(
+        0, high=6, size=(batch_size, atom_size, atom_size)).astype('f')
+    dist = (dist + dist.swapaxes(-1, -2)) / 2.
+    y_grad = numpy.random.uniform(
+        -1, 1, (batch_size, atom_size, hidden_dim)).astype('f')
+    return h, dist, y_grad
+
+
+def _copy_params(src, dst):
+    dst(numpy.zeros((1, 1, hidden_dim), 'f'), numpy.zeros((1, 1, 1), 'f'))
+    for (name, p), (_, q) in zip(sorted(src.namedparams()),
+                                 sorted(dst.namedparams())):
+        q.array[...] = p.array
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, atom_size])
+def test_cfconv_chunk(cfconv_data, chunk_size):
+    h, dist, y_grad = cfconv_data
+    dense = CFConv(hidden_dim=hidden_dim)
+    chunked = CFConv(hidden_dim=hidden_dim, chunk_size=chunk_size)
+    y_expect = dense(h, dist)
+    _copy_params(dense, chunked)
+    y_actual = chunked(h, dist)
+    numpy.testing.assert_allclose(y_actual.array, y_expect.array,
+                                  rtol=1e-5, atol=1e-6)
+
+    # Gradients of parameters are same with the dense path
+    for link, y in [(dense, y_expect), (chunked, y_actual)]:
+        link.cleargrads()
+        y.grad = y_grad
+        y.backward()
+    numpy.testing.assert_allclose(chunked.dense1.W.grad, dense.dense1.W.grad,
+                                  rtol=1e-4, atol=1e-5)
+    numpy.testing.assert_allclose(chunked.dense2.W.grad, dense.dense2.W.grad,
+                                  rtol=1e-4, atol=1e-5)
+
+
+def test_cfconv_chunk_backward(cfconv_data):
+    h, dist, y_grad = cfconv_data
+    cfconv = CFConv(hidden_dim=hidden_dim, chunk_size=2)
+    gradient_check.check_backward(
+        cfconv, (h, dist), y_grad, atol=1e-3, rtol=1e-3)
+
+
+def test_cfconv_cutoff(cfconv_data):
+    h, dist, _ = cfconv_data
+    cutoff = 3.
+    dense = CFConv(hidden_dim=hidden_dim)
+    cfconv = CFConv(hidden_dim=hidden_dim, cutoff=cutoff)
+    dense(h, dist)
+    _copy_params(dense, cfconv)
+    y_actual = cfconv(h, dist).array
+
+    # Same with the dense filter multiplied by cosine cutoff
+    w = dense._filter(dist).array * \
+        cosine_cutoff(dist, cutoff).array[..., None]
+    y_expect = (h[:, :, None, :] * w).sum(axis=1)
+    numpy.testing.assert_allclose(y_actual, y_expect, rtol=1e-5, atol=1e-6)
+
+
+def test_cfconv_cutoff_backward(cfconv_data):
+    h, dist, y_grad = cfconv_data
+    cfconv = CFConv(hidden_dim=hidden_dim, cutoff=3.)
+    gradient_check.check_backward(
+        cfconv, (h, dist), y_grad, atol=1e-3, rtol=1e-3)
+
+
+def test_cosine_cutoff():
+    dist = numpy.array([0., 1., 2., 3.], 'f')
+    actual = cosine_cutoff(dist, 2.).array
+    numpy.testing.assert_allclose(actual, [1., 0.5, 0., 0.], atol=1e-6)
+
+
+@pytest.mark.parametrize('kwargs', [{'cutoff': 0.}, {'chunk_size': 0}])
+def test_cfconv_invalid(kwargs):
+    with pytest.raises(ValueError):
+        CFConv(hidden_dim=hidden_dim, **kwargs)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
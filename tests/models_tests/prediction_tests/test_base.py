@@ -6,6 +6,8 @@ import numpy
 import pytest
 
 from chainer_chemistry.models.prediction.base import BaseForwardModel
+from chainer_chemistry.models.prediction.regressor import Regressor
+from chainer_chemistry.models.rsgcn import RSGCN
 
 
 class DummyForwardModel(BaseForwardModel):
@@ -22,6 +24,10 @@ class DummyForwardModel(BaseForwardModel):
         return self.l(x)
 
 
+def build_dummy(dummy_str='dummy'):
+    return DummyForwardModel(dummy_str=dummy_str)
+
+
 # test `_forward` is done by `Classifier` and `Regressor` concrete class.
 def _test_save_load_pickle(device, tmpdir):
     model = DummyForwardModel(device=device, dummy_str='hoge')
@@ -55,5 +61,78 @@ def test_save_load_pickle_cpu(tmpdir):
 def test_save_load_pickle_gpu(tmpdir):
     _test_save_load_pickle(device=0, tmpdir=tmpdir)
 
+
+def _test_save_load_artifact(device, tmpdir):
+    model = DummyForwardModel(device=device)
+
+    dirpath = os.path.join(str(tmpdir), 'model')
+    model.save_artifact(dirpath, builder=build_dummy,
+                        builder_kwargs={'dummy_str': 'hoge'})
+    model_load = BaseForwardModel.load_artifact(dirpath, device=device)
+
+    # --- check model is constructed by builder ---
+    assert isinstance(model_load, DummyForwardModel)
+    assert model_load.dummy_str == 'hoge'
+    assert model_load.get_device() == device
+
+    # --- check model parameter is same ---
+    params_load = dict(model_load.namedparams())
+    for k, v in model.namedparams():
+        v_load = params_load[k]
+        assert cuda.get_device_from_array(v_load.data).id == device
+        numpy.testing.assert_array_equal(cuda.to_cpu(v.data),
+                                         cuda.to_cpu(v_load.data))
+
+
+def test_save_load_artifact_cpu(tmpdir):
+    _test_save_load_artifact(device=-1, tmpdir=tmpdir)
+
+
+@pytest.mark.gpu
+def test_save_load_artifact_gpu(tmpdir):
+    _test_save_load_artifact(device=0, tmpdir=tmpdir)
+
+
+@pytest.mark.parametrize('mmap_mode', ['r', None])
+def test_load_artifact_persistent(tmpdir, mmap_mode):
+    numpy.random.seed(0)
+    model = Regressor(RSGCN(out_dim=4, use_batch_norm=True))
+    bnorm = model.predictor.bnorms[0]
+    bnorm.avg_mean[:] = numpy.random.uniform(-1, 1, bnorm.avg_mean.shape)
+    bnorm.N = 3
+    x = numpy.random.randint(0, 10, (2, 5)).astype(numpy.int32)
+    adj = numpy.random.uniform(0, 1, (2, 5, 5)).astype(numpy.float32)
+    with chainer.using_config('train', False):
+        y = model.predictor(x, adj).array
+
+    dirpath = os.path.join(str(tmpdir), 'model')
+    model.save_artifact(dirpath)
+    # Builder is not recorded, model is constructed by user.
+    with pytest.raises(ValueError):
+        BaseForwardModel.load_artifact(dirpath)
+    model_load = BaseForwardModel.load_artifact(
+        dirpath, model=Regressor(RSGCN(out_dim=4, use_batch_norm=True)),
+        mmap_mode=mmap_mode)
+    bnorm_load = model_load.predictor.bnorms[0]
+    assert bnorm_load.N == 3
+    numpy.testing.assert_array_equal(bnorm_load.avg_mean, bnorm.avg_mean)
+    assert isinstance(model_load.predictor.embed.W.array,
+                      numpy.memmap) == (mmap_mode is not None)
+    with chainer.using_config('train', False):
+        y_load = model_load.predictor(x, adj).array
+    numpy.testing.assert_array_equal(y_load, y)
+
+
+def test_load_artifact_mismatch(tmpdir):
+    model = DummyForwardModel()
+    dirpath = os.path.join(str(tmpdir), 'model')
+    model.save_artifact(dirpath)
+    with pytest.raises(TypeError):
+        BaseForwardModel.load_artifact(
+            dirpath, model=Regressor(RSGCN(out_dim=4)))
+    with pytest.raises(ValueError):
+        model.save_artifact(dirpath, builder=lambda: DummyForwardModel())
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
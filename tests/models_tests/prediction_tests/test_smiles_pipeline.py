@@ -0,0 +1,96 @@
+import chainer
+import numpy
+import pytest
+
+from chainer_chemistry.dataset.converters import concat_mols
+from chainer_chemistry.dataset.parsers import SmilesParser
+from chainer_chemistry.dataset.preprocessors import NFPPreprocessor
+from chainer_chemistry.models.nfp import NFP
+from chainer_chemistry.models.prediction import Regressor
+from chainer_chemistry.models.prediction.smiles_pipeline import SmilesPredictionPipeline  # NOQA
+
+out_dim = 3
+
+
+@pytest.fixture
+def smiles_list():
+    return ['CN=C=O', 'Cc1ccccc1', 'invalid_smiles', 'CC1=CC2CC(CC1)O2',
+            'O=Cc1ccc(O)c(OC)c1', 'C', 'CCO', 'NCCN']
+
+
+@pytest.fixture
+def regressor():
+    numpy.random.seed(0)
+    return Regressor(NFP(out_dim=out_dim, hidden_dim=4, n_layers=2))
+
+
+def _expected(regressor, smiles_list):
+    parser = SmilesParser(NFPPreprocessor())
+    result = parser.parse(smiles_list, return_smiles=True,
+                          return_is_successful=True)
+    y = regressor.predict(result['dataset'], batchsize=3,
+                          converter=concat_mols)
+    return y, result['smiles'], result['is_successful']
+
+
+@pytest.mark.parametrize('n_workers', [0, 2])
+def test_predict(regressor, smiles_list, n_workers):
+    pipeline = SmilesPredictionPipeline(
+        regressor.predictor, NFPPreprocessor(), batchsize=3,
+        n_workers=n_workers, chunksize=2, max_pending_chunks=2)
+    result = pipeline.predict(iter(smiles_list), return_smiles=True,
+                              return_is_successful=True)
+    y_expect, smiles_expect, is_successful_expect = _expected(
+        regressor, smiles_list)
+
+    assert result['prediction'].shape == (len(smiles_list) - 1, out_dim)
+    # Padding size differs between batches, but NFP is invariant to it.
+    numpy.testing.assert_allclose(result['prediction'], y_expect,
+                                  rtol=1e-5, atol=1e-6)
+    numpy.testing.assert_array_equal(result['smiles'], smiles_expect)
+    numpy.testing.assert_array_equal(result['is_successful'],
+                                     is_successful_expect)
+
+
+def test_iter_predict_indices(regressor, smiles_list):
+    pipeline = SmilesPredictionPipeline(
+        regressor.predictor, NFPPreprocessor(), batchsize=4, n_workers=0,
+        chunksize=3)
+    batches = list(pipeline.iter_predict(smiles_list))
+    indices = numpy.concatenate([b[0] for b in batches])
+    numpy.testing.assert_array_equal(indices, [0, 1, 3, 4, 5, 6, 7])
+    assert [len(b[0]) for b in batches] == [4, 3]
+    for _, smiles, outputs in batches:
+        assert isinstance(outputs[0], numpy.ndarray)
+        assert len(smiles) == len(outputs[0])
+
+
+def test_predict_postprocess_fn(regressor, smiles_list):
+    pipeline = SmilesPredictionPipeline(
+        regressor.predictor, NFPPreprocessor(), batchsize=3, n_workers=0,
+        postprocess_fn=chainer.functions.sigmoid)
+    result = pipeline.predict(smiles_list)
+    assert numpy.all((0 < result['prediction']) & (result['prediction'] < 1))
+    assert result['smiles'] is None
+    assert result['is_successful'] is None
+
+
+def test_predict_all_fail(regressor):
+    pipeline = SmilesPredictionPipeline(
+        regressor.predictor, NFPPreprocessor(), n_workers=0)
+    result = pipeline.predict(['invalid_smiles'], return_is_successful=True)
+    assert result['prediction'] is None
+    numpy.testing.assert_array_equal(result['is_successful'], [False])
+
+
+def test_invalid_args(regressor):
+    with pytest.raises(ValueError):
+        SmilesPredictionPipeline(regressor.predictor, NFPPreprocessor(),
+                                 n_workers=-1)
+    with pytest.raises(ValueError):
+        SmilesPredictionPipeline(regressor.predictor, NFPPreprocessor(),
+                                 chunksize=0)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
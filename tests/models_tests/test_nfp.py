@@ -65,6 +65,14 @@ def test_backward_gpu(model, data):
                                   atol=1e0, rtol=1e0)
 
 
+def test_forward_cpu_with_degree(model, data):
+    atom_data, adj_data = data[0], data[1]
+    y_expect = model(atom_data, adj_data).data
+    degree = (adj_data.sum(axis=1) - 1).astype(numpy.int32)
+    y_actual = model(atom_data, adj_data, degree).data
+    numpy.testing.assert_allclose(y_actual, y_expect, rtol=1e-5, atol=1e-6)
+
+
 def test_forward_cpu_graph_invariant(model, data):
     atom_data, adj_data = data[0], data[1]
     y_actual = cuda.to_cpu(model(atom_data, adj_data).data)
@@ -75,6 +75,15 @@ def test_forward_cpu_invariant(model, data):
     assert numpy.allclose(y_actual, permute_y_actual, rtol=1e-5, atol=1e-5)
 
 
+def test_forward_cpu_prescaled_adj(data):
+    atom_data, adj_data = data[0], data[1]
+    model = RelGCN(out_channels=out_ch, scale_adj=True)
+    y_expect = model(atom_data, adj_data).data
+    model.scale_adj = False
+    y_actual = model(atom_data, rescale_adj(adj_data).data).data
+    numpy.testing.assert_allclose(y_actual, y_expect, rtol=1e-5, atol=1e-6)
+
+
 def test_rescale_adj(data):
     adj = data[1]
     numpy.testing.assert_allclose(rescale_adj(adj).data.sum(axis=(1, 2)),
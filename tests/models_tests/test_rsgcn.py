@@ -5,6 +5,10 @@ import numpy
 import pytest
 
 from chainer_chemistry.config import MAX_ATOMIC_NUM
+from chainer_chemistry.dataset.converters import concat_mols
+from chainer_chemistry.dataset.converters import concat_mols_with_sparse_adj  # NOQA
+from chainer_chemistry.dataset.parsers import SmilesParser
+from chainer_chemistry.dataset.preprocessors import RSGCNPreprocessor
 from chainer_chemistry.links import NFPReadout
 from chainer_chemistry.models.rsgcn import RSGCN
 from chainer_chemistry.utils.extend import extend_node, extend_adj  # NOQA
@@ -120,6 +124,28 @@ def test_backward_cpu_with_nfp(model_with_nfp_no_dropout, data):
         atol=1e-7, rtol=1e-7, no_grads=[True, True])
 
 
+def test_sparse_adj_cpu(model_no_dropout):
+    smiles = ['C#N', 'Cc1cnc(C=O)n1C', 'c1ccccc1']
+    dense_dataset = SmilesParser(RSGCNPreprocessor()).parse(
+        smiles)['dataset']
+    sparse_dataset = SmilesParser(RSGCNPreprocessor(sparse=True)).parse(
+        smiles)['dataset']
+    dense_inputs = concat_mols(list(dense_dataset))
+    sparse_inputs = concat_mols_with_sparse_adj(list(sparse_dataset))
+    numpy.testing.assert_array_equal(sparse_inputs[0], dense_inputs[0])
+
+    outputs = []
+    for inputs in [dense_inputs, sparse_inputs]:
+        model_no_dropout.cleargrads()
+        y = model_no_dropout(*inputs)
+        y.grad = numpy.ones_like(y.data)
+        y.backward()
+        outputs.append([y.data] + [param.grad for _, param in sorted(
+            model_no_dropout.namedparams())])
+    for expect, actual in zip(*outputs):
+        numpy.testing.assert_allclose(actual, expect, rtol=1e-5, atol=1e-5)
+
+
 def test_forward_cpu_graph_invariant(model, data):
     # This RSGCN uses dropout, so we need to forward with test mode
     # to remove stochastic calculation.
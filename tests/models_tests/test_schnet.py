@@ -45,6 +45,12 @@ def test_forward_cpu(model, data):
     check_forward(model, atom_data, adj_data)
 
 
+@pytest.mark.parametrize('kwargs', [{'cutoff': 10.}, {'chunk_size': 2}])
+def test_forward_cpu_memory_bounded(data, kwargs):
+    atom_data, adj_data = data[0], data[1]
+    check_forward(SchNet(out_dim=out_dim, **kwargs), atom_data, adj_data)
+
+
 @pytest.mark.gpu
 def test_forward_gpu(model, data):
     atom_data, adj_data = cuda.to_gpu(data[0]), cuda.to_gpu(data[1])
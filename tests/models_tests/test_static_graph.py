@@ -0,0 +1,108 @@
+import chainer
+from chainer import functions
+import numpy
+import pytest
+
+from chainer_chemistry.config import MAX_ATOMIC_NUM
+from chainer_chemistry.models.ggnn import GGNN
+from chainer_chemistry.models.mlp import MLP
+from chainer_chemistry.models.nfp import NFP
+from chainer_chemistry.models.relgcn import RelGCN
+from chainer_chemistry.models.rsgcn import RSGCN
+
+atom_size = 5
+out_dim = 4
+batch_size = 2
+
+
+def _atom_array(batch):
+    return numpy.random.randint(
+        0, high=MAX_ATOMIC_NUM, size=(batch, atom_size)).astype(numpy.int32)
+
+
+def _adj(batch, num_edge_type=None):
+    shape = (batch, atom_size, atom_size) if num_edge_type is None else \
+        (batch, num_edge_type, atom_size, atom_size)
+    return numpy.random.randint(0, high=2, size=shape).astype(numpy.float32)
+
+
+MODELS = {
+    'mlp': (lambda use_static_graph: MLP(
+        out_dim=out_dim, use_static_graph=use_static_graph),
+        lambda batch: (
+            numpy.random.rand(batch, atom_size).astype(numpy.float32),)),
+    'nfp': (lambda use_static_graph: NFP(
+        out_dim=out_dim, use_static_graph=use_static_graph),
+        lambda batch: (_atom_array(batch), _adj(batch))),
+    'ggnn': (lambda use_static_graph: GGNN(
+        out_dim=out_dim, use_static_graph=use_static_graph),
+        lambda batch: (_atom_array(batch), _adj(batch, 4))),
+    'relgcn': (lambda use_static_graph: RelGCN(
+        out_channels=out_dim, use_static_graph=use_static_graph),
+        lambda batch: (_atom_array(batch), _adj(batch, 4))),
+    'rsgcn': (lambda use_static_graph: RSGCN(
+        out_dim=out_dim, dropout_ratio=0.,
+        use_static_graph=use_static_graph),
+        lambda batch: (_atom_array(batch), _adj(batch))),
+    'rsgcn_batch_norm': (lambda use_static_graph: RSGCN(
+        out_dim=out_dim, dropout_ratio=0., use_batch_norm=True,
+        use_static_graph=use_static_graph),
+        lambda batch: (_atom_array(batch), _adj(batch))),
+}
+
+
+def _step(model, inputs):
+    y = model(*inputs)
+    model.cleargrads()
+    functions.sum(y * y).backward()
+    grads = [numpy.zeros_like(p.array) if p.grad is None else p.grad.copy()
+             for _, p in sorted(model.namedparams())]
+    return y.array.copy(), grads
+
+
+@pytest.mark.parametrize('name', sorted(MODELS))
+def test_static_graph_cpu(name):
+    numpy.random.seed(0)
+    build, make_inputs = MODELS[name]
+    model = build(False)
+    static_model = build(True)
+    inputs = make_inputs(batch_size)
+    # Initialize parameters, and record the schedule.
+    _step(model, inputs)
+    _step(static_model, inputs)
+    static_model.copyparams(model)
+
+    # The last minibatch of different size falls back to define-by-run.
+    for batch in [batch_size, batch_size, batch_size + 1, batch_size]:
+        inputs = make_inputs(batch)
+        y_expect, grads_expect = _step(model, inputs)
+        y_actual, grads_actual = _step(static_model, inputs)
+        numpy.testing.assert_allclose(y_actual, y_expect, rtol=1e-5,
+                                      atol=1e-6)
+        for g_actual, g_expect in zip(grads_actual, grads_expect):
+            numpy.testing.assert_allclose(g_actual, g_expect, rtol=1e-4,
+                                          atol=1e-5)
+
+
+def test_static_graph_cpu_test_mode():
+    numpy.random.seed(0)
+    model = RSGCN(out_dim=out_dim, use_batch_norm=True)
+    static_model = RSGCN(out_dim=out_dim, use_batch_norm=True,
+                         use_static_graph=True)
+    with chainer.using_config('train', False):
+        model(_atom_array(batch_size), _adj(batch_size))
+        static_model.copyparams(model)
+        for _ in range(3):
+            inputs = (_atom_array(batch_size), _adj(batch_size))
+            numpy.testing.assert_allclose(
+                static_model(*inputs).array, model(*inputs).array,
+                rtol=1e-5, atol=1e-6)
+
+
+def test_relgcn_static_graph_scale_adj_raises():
+    with pytest.raises(ValueError):
+        RelGCN(out_channels=out_dim, scale_adj=True, use_static_graph=True)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
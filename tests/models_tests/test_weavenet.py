@@ -127,5 +127,59 @@ def test_forward_cpu_graph_invariant_processed(model_processed, data):
         model_processed, atom_data_processed, adj_data, node_permute_axis=1)
 
 
+def test_forward_cpu_factorized(model, data):
+    atom_data, adj_data = data[1], data[2]
+    y_factorized = model(atom_data, adj_data).array
+    for module in model.weave_module:
+        module.atom_to_pair.factorized = False
+    y_concat = model(atom_data, adj_data).array
+    numpy.testing.assert_allclose(y_factorized, y_concat, rtol=1e-5,
+                                  atol=1e-5)
+
+
+def test_backward_cpu_factorized(data):
+    atom_data_processed, adj_data, y_grad = data[0], data[2], data[3]
+    model = WeaveNet(weave_channels=weave_channels, n_sub_layer=2)
+    model(atom_data_processed, adj_data)
+    for factorized in [True, False]:
+        for module in model.weave_module:
+            module.atom_to_pair.factorized = factorized
+        model.cleargrads()
+        y = model(atom_data_processed, adj_data)
+        y.grad = y_grad
+        y.backward()
+        grads = {name: param.grad.copy()
+                 for name, param in model.namedparams()
+                 if param.grad is not None}
+        if factorized:
+            expect = grads
+    assert sorted(grads.keys()) == sorted(expect.keys())
+    for name in grads:
+        numpy.testing.assert_allclose(grads[name], expect[name], rtol=1e-4,
+                                      atol=1e-4)
+
+
+def test_forward_cpu_variable_n_atom(model, data):
+    # Number of atoms differs from `n_atom` and varies between minibatches.
+    for n_atom in [3, 7]:
+        atom_data = numpy.random.randint(
+            0, high=MAX_ATOMIC_NUM, size=(batch_size, n_atom)
+        ).astype(numpy.int32)
+        pair_data = numpy.random.uniform(
+            0, high=1, size=(batch_size, n_atom, n_atom, pair_feature_dim)
+        ).astype(numpy.float32)
+        y = model(atom_data, pair_data).array
+        assert y.shape == (batch_size, out_dim)
+        y_flat = model(atom_data, pair_data.reshape(
+            batch_size, n_atom * n_atom, pair_feature_dim)).array
+        numpy.testing.assert_array_equal(y, y_flat)
+
+
+def test_forward_cpu_invalid_n_pair(model, data):
+    atom_data, adj_data = data[1], data[2]
+    with pytest.raises(ValueError):
+        model(atom_data, adj_data[:, :-1])
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -2,6 +2,7 @@ import numpy
 import pytest
 
 import chainer
+from chainer.dataset import concat_examples
 from chainer.links import Linear
 
 from chainer_chemistry.link_hooks import is_link_hooks_available
@@ -17,6 +18,13 @@ if is_link_hooks_available:
             self.model(*inputs)
             return self.get_target_var(inputs)
 
+    class DummyBatchCalculator(BaseCalculator):
+        """Dummy calculator which returns tuple of target_var"""
+
+        def _compute_core(self, *inputs):
+            self.model(*inputs)
+            return self.get_target_var(inputs),
+
 
 class DummyModel(chainer.Chain):
     def __init__(self):
@@ -33,6 +41,16 @@ class DummyModel(chainer.Chain):
         return out
 
 
+class ElementwiseModel(chainer.Chain):
+    def __init__(self):
+        super(ElementwiseModel, self).__init__()
+        with self.init_scope():
+            self.l1 = Linear(1, 1)
+
+    def forward(self, x):
+        return x * 3
+
+
 @pytest.fixture
 def model():
     return DummyModel()
@@ -74,6 +92,82 @@ def test_base_calculator_compute_target_extractor(model):
     assert numpy.allclose(saliency, model.h.array)
 
 
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+@pytest.mark.parametrize('sample_chunksize', [1, 2, 5])
+def test_base_calculator_compute_sample_chunksize(model, sample_chunksize):
+    calculator = DummyBatchCalculator(model)
+    x = numpy.random.uniform(0, 1, (5, 3)).astype(numpy.float32)
+
+    saliency = calculator.compute(x, M=5, batchsize=2,
+                                  sample_chunksize=sample_chunksize)
+    assert saliency.shape == (5, 5, 3)
+    assert numpy.allclose(saliency, x[None])
+
+    saliency = calculator.compute(x, M=5, batchsize=2,
+                                  noise_sampler=GaussianNoiseSampler(),
+                                  sample_chunksize=sample_chunksize)
+    assert saliency.shape == (5, 5, 3)
+    # noise is sampled independently for each sample
+    assert not numpy.allclose(saliency[0], saliency[1])
+    assert not numpy.allclose(saliency[0], x)
+
+
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+def test_base_calculator_compute_sample_chunksize_padding():
+    calculator = DummyBatchCalculator(ElementwiseModel())
+    # Examples with different length are padded by `concat_examples`.
+    x = [numpy.ones((n, 3), dtype=numpy.float32) * n for n in [1, 2, 3]]
+
+    saliency = calculator.compute(x, M=2, batchsize=2, sample_chunksize=2,
+                                  converter=_concat_with_padding)
+    expect = calculator.compute(x, M=2, batchsize=2,
+                                converter=_concat_with_padding)
+    assert saliency.shape == (2, 3, 3, 3)
+    numpy.testing.assert_array_equal(saliency, expect)
+
+
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+@pytest.mark.parametrize('method', ['raw', 'abs', 'square'])
+@pytest.mark.parametrize('ch_axis', [None, 2])
+@pytest.mark.parametrize('sample_chunksize', [None, 3])
+def test_base_calculator_compute_aggregate(model, method, ch_axis,
+                                           sample_chunksize):
+    calculator = DummyBatchCalculator(model)
+    x = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+    kwargs = {'M': 7, 'batchsize': 2, 'noise_sampler': GaussianNoiseSampler(),
+              'sample_chunksize': sample_chunksize}
+
+    numpy.random.seed(0)
+    saliency_samples = calculator.compute(x, **kwargs)
+    numpy.random.seed(0)
+    saliency, saliency_std = calculator.compute_aggregate(
+        x, method=method, ch_axis=ch_axis, return_std=True, **kwargs)
+
+    expect = calculator.aggregate(saliency_samples, method=method,
+                                  ch_axis=ch_axis)
+    assert saliency.shape == expect.shape
+    assert saliency.dtype == expect.dtype
+    numpy.testing.assert_allclose(saliency, expect, rtol=1e-5, atol=1e-6)
+
+    if method == 'raw':
+        h = saliency_samples
+    elif method == 'abs':
+        h = numpy.abs(saliency_samples)
+    else:
+        h = saliency_samples ** 2
+    if ch_axis is not None:
+        h = h.sum(axis=ch_axis)
+    numpy.testing.assert_allclose(saliency_std, h.std(axis=0), rtol=1e-5,
+                                  atol=1e-6)
+
+
+def _concat_with_padding(batch, device=None):
+    return concat_examples(batch, device=device, padding=0)
+
+
 @pytest.mark.skipif(not is_link_hooks_available,
                     reason='Link Hook is not available')
 def test_base_calculator_aggregate():
@@ -7,6 +7,7 @@ from chainer.links import Linear
 from chainer_chemistry.link_hooks import is_link_hooks_available
 if is_link_hooks_available:
     from chainer_chemistry.link_hooks import VariableMonitorLinkHook
+    from chainer_chemistry.saliency.calculator import GaussianNoiseSampler
     from chainer_chemistry.saliency.calculator.gradient_calculator import GradientCalculator  # NOQA
 
 
@@ -33,6 +34,24 @@ def test_gradient_calculator():
     assert numpy.allclose(saliency, numpy.array([[1, 3, 2]]))
 
 
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+def test_gradient_calculator_sample_chunksize():
+    model = DummyModel()
+    x = numpy.array([[1, 5, 8], [2, 3, 4]], dtype=numpy.float32)
+    calculator = GradientCalculator(model, multiply_target=True)
+    numpy.random.seed(0)
+    saliency = calculator.compute(x, M=4, sample_chunksize=3,
+                                  noise_sampler=GaussianNoiseSampler())
+    numpy.random.seed(0)
+    expect = calculator.compute(x, M=4,
+                                noise_sampler=GaussianNoiseSampler())
+    assert saliency.shape == (4, 2, 3)
+    # gradient * (input + noise)
+    assert not numpy.allclose(saliency[0], saliency[1])
+    numpy.testing.assert_allclose(saliency, expect, rtol=1e-5, atol=1e-6)
+
+
 @pytest.mark.skipif(not is_link_hooks_available,
                     reason='Link Hook is not available')
 def test_gradient_calculator_multiply_target():
@@ -22,6 +22,19 @@ class DummyModel(chainer.Chain):
         return self.l1(x)
 
 
+class SquareModel(chainer.Chain):
+    def __init__(self):
+        super(SquareModel, self).__init__()
+        with self.init_scope():
+            self.l1 = Linear(
+                3, 2, initialW=numpy.array([[1, 3, 2], [-1, 0, 1]]),
+                nobias=True)
+
+    def forward(self, x):
+        h = self.l1(x)
+        return chainer.functions.sum(h * h, axis=1, keepdims=True)
+
+
 @pytest.mark.skipif(not is_link_hooks_available,
                     reason='Link Hook is not available')
 def test_integrated_gradient_calculator():
@@ -47,5 +60,46 @@ def test_integrated_gradient_calculator_target_extractor():
     assert saliency.shape == (1, 1, 3)
 
 
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+@pytest.mark.parametrize('use_target_extractor', [True, False])
+@pytest.mark.parametrize('alpha_batchsize', [None, 1, 2, 10])
+@pytest.mark.parametrize('step_rule,steps', [
+    ('riemann', 5), ('trapezoid', 5), ('gauss_legendre', 2)])
+def test_integrated_gradient_calculator_step_rule(
+        use_target_extractor, alpha_batchsize, step_rule, steps):
+    model = SquareModel()
+    x = numpy.array([[1, 5, 8], [2, -1, 0]], dtype=numpy.float32)
+    target_extractor = None
+    if use_target_extractor:
+        target_extractor = VariableMonitorLinkHook(model.l1, timing='pre')
+    calculator = IntegratedGradientsCalculator(
+        model, steps=steps, step_rule=step_rule,
+        alpha_batchsize=alpha_batchsize, target_extractor=target_extractor)
+    saliency = calculator.compute(x, batchsize=2)
+    assert saliency.shape == (1, 2, 3)
+    # Completeness: sum of saliency equals to difference of output
+    expect = model(x).array[:, 0]
+    if step_rule == 'gauss_legendre':
+        # exact for quadratic model
+        numpy.testing.assert_allclose(saliency[0].sum(axis=1), expect,
+                                      rtol=1e-5)
+    else:
+        numpy.testing.assert_allclose(saliency[0].sum(axis=1), expect,
+                                      rtol=0.05)
+
+
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+def test_integrated_gradient_calculator_invalid_args():
+    model = DummyModel()
+    with pytest.raises(ValueError):
+        IntegratedGradientsCalculator(model, step_rule='simpson')
+    with pytest.raises(ValueError):
+        IntegratedGradientsCalculator(model, step_rule='trapezoid', steps=1)
+    with pytest.raises(ValueError):
+        IntegratedGradientsCalculator(model, alpha_batchsize=0)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
@@ -70,5 +70,51 @@ def test_occlusion_calculator_target_extractor():
     assert saliency.shape == (1, 1, 3)
 
 
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+@pytest.mark.parametrize('window_batchsize', [1, 4, 100])
+@pytest.mark.parametrize('size', [1, 2])
+def test_occlusion_calculator_window_batchsize(window_batchsize, size):
+    model = DummyCNNModel()
+    x = numpy.random.uniform(0, 1, (3, 1, 3, 3)).astype(numpy.float32)
+    expect = OcclusionCalculator(
+        model, slide_axis=(2, 3), size=size).compute(x, batchsize=2)
+    calculator = OcclusionCalculator(model, slide_axis=(2, 3), size=size,
+                                     window_batchsize=window_batchsize)
+    saliency = calculator.compute(x, batchsize=2)
+    assert saliency.shape == (1, 3, 1, 3, 3)
+    numpy.testing.assert_allclose(saliency, expect, rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+@pytest.mark.parametrize('use_target_extractor', [True, False])
+def test_occlusion_calculator_atom_mask(use_target_extractor):
+    model = DummyModel()
+    # The last atom of 1st example is padding.
+    x = numpy.array([[1, 5, 0], [2, 4, 3]], dtype=numpy.float32)
+    target_extractor = None
+    if use_target_extractor:
+        target_extractor = VariableMonitorLinkHook(model.l1, timing='pre')
+    calculator = OcclusionCalculator(
+        model, slide_axis=1, window_batchsize=2,
+        target_extractor=target_extractor, atom_mask=lambda x: x != 0)
+    saliency = calculator.compute(x, batchsize=2)
+    assert saliency.shape == (1, 2, 3)
+    numpy.testing.assert_allclose(
+        saliency[0], numpy.array([[1, 15, 0], [2, 12, 6]]))
+
+
+@pytest.mark.skipif(not is_link_hooks_available,
+                    reason='Link Hook is not available')
+def test_occlusion_calculator_invalid_args():
+    model = DummyModel()
+    with pytest.raises(ValueError):
+        OcclusionCalculator(model, slide_axis=1, window_batchsize=0)
+    with pytest.raises(ValueError):
+        OcclusionCalculator(model, slide_axis=(1, 2),
+                            atom_mask=lambda x: x != 0)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
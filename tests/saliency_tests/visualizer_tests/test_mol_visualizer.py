@@ -66,5 +66,83 @@ def test_mol_visualizer_assert_raises(tmpdir):
         visualizer.visualize(saliency, mol, save_filepath=invalid_ext_filepath)
 
 
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_mol_visualizer_visualize_batch(tmpdir, n_jobs):
+    mols = [Chem.MolFromSmiles(smiles) for smiles in ['OCO', 'CCN', 'CC']]
+    # Padded saliency array (num_mols, num_node)
+    saliency = numpy.array([[0.5, 0.3, 0.2], [-1., 0., 4.], [0.1, 0.2, 9.]])
+    visualizer = MolVisualier()
+    save_dirpath = os.path.join(str(tmpdir), 'images')
+    result = visualizer.visualize_batch(
+        saliency, mols, save_dirpath, n_jobs=n_jobs, show_progress=False,
+        legends=['a', 'b', 'c'])
+    assert result['filepaths'] == [
+        os.path.join(save_dirpath, '{:06d}.svg'.format(i)) for i in range(3)]
+    assert result['errors'] == {}
+    assert result['throughput'] > 0
+    for filepath in result['filepaths']:
+        assert os.path.exists(filepath)
+
+
+def test_mol_visualizer_visualize_batch_grid(tmpdir):
+    mols = [Chem.MolFromSmiles('OCO') for _ in range(5)]
+    saliency = [numpy.array([0.5, 0.3, 0.2])] * 5
+    visualizer = MolVisualier()
+    result = visualizer.visualize_batch(
+        saliency, mols, str(tmpdir), grid_shape=(1, 2),
+        filenames=['sheet0.svg', 'sheet1.svg', 'sheet2.svg'],
+        show_progress=False)
+    assert [os.path.basename(f) for f in result['filepaths']] == [
+        'sheet0.svg', 'sheet1.svg', 'sheet2.svg']
+
+
+def test_smiles_visualizer_visualize_batch(tmpdir):
+    visualizer = SmilesVisualizer()
+    result = visualizer.visualize_batch(
+        numpy.array([[0.5, 0.3, 0.2], [0.1, 0.2, 0.]]), ['OCO', 'CC'],
+        str(tmpdir), shared_scale=False, show_progress=False)
+    assert len(result['filepaths']) == 2
+
+
+def test_smiles_visualizer_visualize_batch_invalid_smiles(tmpdir):
+    visualizer = SmilesVisualizer()
+    saliency = numpy.array([[0.5, 0.3, 0.2], [0.1, 0.2, 0.], [1., 2., 3.]])
+    result = visualizer.visualize_batch(
+        saliency, ['OCO', 'C1CC', 'CC'], str(tmpdir), show_progress=False)
+    assert result['filepaths'] == [
+        os.path.join(str(tmpdir), '{:06d}.svg'.format(i)) for i in [0, 2]]
+    assert list(result['errors']) == [
+        os.path.join(str(tmpdir), '000001.svg')]
+    assert not os.path.exists(os.path.join(str(tmpdir), '000001.svg'))
+
+
+def test_mol_visualizer_visualize_batch_grid_invalid_mol(tmpdir):
+    mols = [Chem.MolFromSmiles('OCO'), None, None, Chem.MolFromSmiles('CC')]
+    saliency = [numpy.array([0.5, 0.3, 0.2])] * 4
+    visualizer = MolVisualier()
+    result = visualizer.visualize_batch(
+        saliency, mols, str(tmpdir), grid_shape=(1, 2),
+        filenames=['sheet0.svg', 'sheet1.svg'], show_progress=False)
+    # The sheet is saved with the valid molecules.
+    assert [os.path.basename(f) for f in result['filepaths']] == [
+        'sheet0.svg', 'sheet1.svg']
+    assert sorted(os.path.basename(f) for f in result['errors']) == [
+        'sheet0.svg', 'sheet1.svg']
+
+
+def test_mol_visualizer_visualize_batch_assert_raises(tmpdir):
+    visualizer = MolVisualier()
+    mols = [Chem.MolFromSmiles('OCO')]
+    saliency = numpy.array([[0.5, 0.3, 0.2]])
+    with pytest.raises(ValueError):
+        visualizer.visualize_batch(saliency, mols, str(tmpdir),
+                                   image_format='hoge')
+    with pytest.raises(ValueError):
+        visualizer.visualize_batch(saliency, mols * 2, str(tmpdir))
+    with pytest.raises(ValueError):
+        visualizer.visualize_batch(saliency, mols, str(tmpdir),
+                                   filenames=['a.svg', 'b.svg'])
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
@@ -0,0 +1,134 @@
+import numpy
+import pytest
+
+import chainer
+from chainer import functions
+from chainer import links
+from chainer.iterators import SerialIterator
+from chainer import optimizers
+from chainer import training
+from chainer.training import extensions as E
+
+from chainer_chemistry.datasets.numpy_tuple_dataset import NumpyTupleDataset  # NOQA
+from chainer_chemistry.training.extensions.async_evaluator import AsyncEvaluator  # NOQA
+from chainer_chemistry.training.extensions.r2_score_evaluator import R2ScoreEvaluator  # NOQA
+from chainer_chemistry.training.extensions.roc_auc_evaluator import ROCAUCEvaluator  # NOQA
+
+
+@pytest.fixture
+def dataset():
+    numpy.random.seed(0)
+    x = numpy.random.uniform(-1, 1, (30, 3)).astype(numpy.float32)
+    t = (x.sum(axis=1, keepdims=True) > 0).astype(numpy.int32)
+    return NumpyTupleDataset(x, t)
+
+
+def _evaluate(evaluator, target):
+    repo = chainer.Reporter()
+    repo.add_observer('target', target)
+    with repo:
+        return evaluator.evaluate()
+
+
+@pytest.mark.parametrize('n_workers', [1, 2, 40])
+def test_async_evaluator_submit(dataset, n_workers):
+    model = links.Linear(3, 1)
+    iterator = SerialIterator(dataset, 4, repeat=False, shuffle=False)
+    evaluator = ROCAUCEvaluator(iterator, model, name='val')
+    async_evaluator = AsyncEvaluator(evaluator, n_workers=n_workers)
+    try:
+        assert async_evaluator.submit(iteration=3)
+        # parameters are copied at `submit`
+        W = model.W.array.copy()
+        model.W.array[...] = 0
+        results = async_evaluator.wait()
+    finally:
+        async_evaluator.finalize()
+
+    model.W.array[...] = W
+    expect = evaluator()
+    assert len(results) == 1
+    assert results[0]['val/main/roc_auc'] == pytest.approx(
+        expect['val/main/roc_auc'])
+    assert results[0]['val/snapshot_iteration'] == 3
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+@pytest.mark.parametrize('n_workers', [1, 3, 8])
+def test_async_evaluator_r2_score(streaming, n_workers):
+    numpy.random.seed(0)
+    # The dataset is smaller than number of workers when `n_workers=8`.
+    x = numpy.random.uniform(-1, 1, (5, 3)).astype(numpy.float32)
+    t = numpy.random.uniform(-1, 1, (5, 2)).astype(numpy.float32)
+    model = links.Linear(3, 2)
+    iterator = SerialIterator(NumpyTupleDataset(x, t), 2, repeat=False,
+                              shuffle=False)
+    evaluator = R2ScoreEvaluator(iterator, model, name='val',
+                                 streaming=streaming)
+    async_evaluator = AsyncEvaluator(evaluator, n_workers=n_workers)
+    try:
+        assert async_evaluator.submit()
+        results = async_evaluator.wait()
+    finally:
+        async_evaluator.finalize()
+
+    expect = evaluator()['val/main/r2_score']
+    actual = results[0]['val/main/r2_score']
+    assert actual == pytest.approx(expect, rel=1e-5)
+    assert numpy.asarray(actual).dtype == numpy.asarray(expect).dtype
+
+
+def test_async_evaluator_max_pending(dataset):
+    model = links.Linear(3, 1)
+    iterator = SerialIterator(dataset, 4, repeat=False, shuffle=False)
+    async_evaluator = AsyncEvaluator(
+        R2ScoreEvaluator(iterator, model, streaming=True), max_pending=1)
+    try:
+        assert async_evaluator.submit()
+        assert not async_evaluator.submit()
+        assert len(async_evaluator.wait()) == 1
+        assert async_evaluator.collect() == []
+    finally:
+        async_evaluator.finalize()
+
+
+def test_async_evaluator_trainer(dataset, tmpdir):
+    x, t = dataset.get_datasets()
+    dataset = NumpyTupleDataset(x, t.astype(numpy.float32))
+    model = links.Classifier(links.Linear(3, 1),
+                             lossfun=functions.mean_squared_error)
+    model.compute_accuracy = False
+    train_iter = SerialIterator(dataset, 10)
+    valid_iter = SerialIterator(dataset, 10, repeat=False, shuffle=False)
+    optimizer = optimizers.SGD()
+    optimizer.setup(model)
+    updater = training.StandardUpdater(train_iter, optimizer)
+    trainer = training.Trainer(updater, (3, 'epoch'), out=str(tmpdir))
+    async_evaluator = AsyncEvaluator(
+        R2ScoreEvaluator(valid_iter, model.predictor, streaming=True),
+        max_pending=3)
+    log_report = E.LogReport(trigger=(1, 'iteration'))
+    trainer.extend(async_evaluator)
+    trainer.extend(log_report)
+    trainer.run()
+
+    reported = [log for log in log_report.log
+                if 'validation/main/r2_score' in log]
+    results = reported + async_evaluator.final_results
+    # evaluated at the end of each epoch
+    assert [r['validation/snapshot_iteration'] for r in results] == [3, 6, 9]
+
+
+def test_async_evaluator_invalid_args(dataset):
+    model = links.Linear(3, 1)
+    iterator = SerialIterator(dataset, 4, repeat=False, shuffle=False)
+    with pytest.raises(TypeError):
+        AsyncEvaluator(E.Evaluator(iterator, model))
+    with pytest.raises(ValueError):
+        AsyncEvaluator(ROCAUCEvaluator(iterator, model, eval_func=model))
+    with pytest.raises(ValueError):
+        AsyncEvaluator(ROCAUCEvaluator(iterator, model), n_workers=0)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
@@ -0,0 +1,52 @@
+import numpy
+import pytest
+
+from chainer import functions
+from chainer import links
+from chainer.iterators import SerialIterator
+from chainer import optimizers
+from chainer import training
+from chainer.training import extensions as E
+
+from chainer_chemistry.datasets.numpy_tuple_dataset import NumpyTupleDataset  # NOQA
+from chainer_chemistry.training.extensions.link_profile_report import LinkProfileReport  # NOQA
+
+
+@pytest.fixture
+def dataset():
+    numpy.random.seed(0)
+    x = numpy.random.uniform(-1, 1, (20, 3)).astype(numpy.float32)
+    t = x.sum(axis=1, keepdims=True)
+    return NumpyTupleDataset(x, t)
+
+
+def test_link_profile_report(dataset, tmpdir):
+    model = links.Classifier(links.Linear(3, 1),
+                             lossfun=functions.mean_squared_error)
+    model.compute_accuracy = False
+    optimizer = optimizers.SGD()
+    optimizer.setup(model)
+    iterator = SerialIterator(dataset, 5)
+    updater = training.StandardUpdater(iterator, optimizer)
+    trainer = training.Trainer(updater, (2, 'epoch'), out=str(tmpdir))
+    extension = LinkProfileReport(model, trigger=(1, 'epoch'),
+                                  keys=['count', 'total_time'])
+    trainer.extend(extension)
+    log_report = E.LogReport()
+    trainer.extend(log_report)
+    trainer.run()
+
+    log = log_report.log
+    assert len(log) == 2
+    for entry in log:
+        # 4 iterations in each epoch, values are reset at each report.
+        assert entry['link_profile/predictor/count'] == 4
+        assert entry['link_profile/predictor/total_time'] > 0
+        assert entry['link_profile/Classifier/count'] == 4
+        assert 'link_profile/predictor/forward_bytes' not in entry
+    # Hook is removed at the end of the training
+    assert not extension._entered
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
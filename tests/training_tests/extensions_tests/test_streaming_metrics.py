@@ -0,0 +1,250 @@
+import numpy
+import pytest
+
+import chainer
+from chainer.iterators import SerialIterator
+from sklearn import metrics
+
+from chainer_chemistry.datasets.numpy_tuple_dataset import NumpyTupleDataset  # NOQA
+from chainer_chemistry.training.extensions.batch_evaluator import BatchEvaluator  # NOQA
+from chainer_chemistry.training.extensions.prc_auc_evaluator import PRCAUCEvaluator  # NOQA
+from chainer_chemistry.training.extensions.r2_score_evaluator import R2ScoreEvaluator  # NOQA
+from chainer_chemistry.training.extensions.roc_auc_evaluator import ROCAUCEvaluator  # NOQA
+from chainer_chemistry.training.extensions.streaming_metrics import BinnedAUCAccumulator  # NOQA
+from chainer_chemistry.training.extensions.streaming_metrics import RegressionMetricAccumulator  # NOQA
+
+
+@pytest.fixture
+def classification_data():
+    numpy.random.seed(0)
+    t = numpy.random.randint(0, 2, (1000,)).astype(numpy.int32)
+    # Distinct scores on a grid so that each score falls in its own bin.
+    y = (numpy.random.permutation(1000) + 0.5) / 1000.
+    y = numpy.where(t == 1, y ** 0.5, y).astype(numpy.float32)
+    return y, t
+
+
+class DummyPredictor(chainer.Chain):
+
+    def __call__(self, y):
+        return y
+
+
+def _update(accumulator, y, t, batchsize=64):
+    accumulator.reset()
+    for i in range(0, len(y), batchsize):
+        accumulator.update(y[i:i + batchsize], t[i:i + batchsize])
+    return accumulator.compute()
+
+
+def _prc_auc(t, y):
+    precision, recall, _ = metrics.precision_recall_curve(t, y)
+    return metrics.auc(recall, precision)
+
+
+def test_binned_roc_auc(classification_data):
+    y, t = classification_data
+    expect = metrics.roc_auc_score(t, y)
+    actual = _update(BinnedAUCAccumulator('roc', num_bins=1000000), y, t)
+    assert actual == pytest.approx(expect, abs=1e-6)
+    # coarse bins approximate the score
+    actual = _update(BinnedAUCAccumulator('roc', num_bins=100), y, t)
+    assert actual == pytest.approx(expect, abs=1e-2)
+
+
+def test_binned_prc_auc(classification_data):
+    y, t = classification_data
+    expect = _prc_auc(t, y)
+    actual = _update(BinnedAUCAccumulator('prc', num_bins=1000000), y, t)
+    assert actual == pytest.approx(expect, abs=1e-6)
+    actual = _update(BinnedAUCAccumulator('prc', num_bins=100), y, t)
+    assert actual == pytest.approx(expect, abs=1e-2)
+
+
+def test_binned_auc_labels():
+    t = numpy.array([0, 1, -1, 0, 2, -1], dtype=numpy.int32)
+    y = numpy.array([0.1, 0.35, 0.2, 0.4, 0.8, 0.35], dtype=numpy.float32)
+    accumulator = BinnedAUCAccumulator(
+        'roc', num_bins=1000, pos_labels=[1, 2], ignore_labels=-1)
+    assert _update(accumulator, y, t, batchsize=4) == pytest.approx(0.75)
+
+
+def test_binned_auc_nan_prediction(classification_data):
+    y, t = classification_data
+    expect = _update(BinnedAUCAccumulator('roc', num_bins=100), y, t)
+    y_nan = numpy.concatenate((y, [numpy.nan, numpy.nan])).astype(y.dtype)
+    t_nan = numpy.concatenate((t, [0, 1])).astype(t.dtype)
+    actual = _update(BinnedAUCAccumulator('roc', num_bins=100), y_nan, t_nan)
+    assert actual == pytest.approx(expect)
+
+
+def test_binned_auc_one_class():
+    y = numpy.array([0.1, 0.4], dtype=numpy.float32)
+    t = numpy.array([0, 0], dtype=numpy.int32)
+    with pytest.raises(ValueError):
+        _update(BinnedAUCAccumulator('roc'), y, t)
+    accumulator = BinnedAUCAccumulator('prc', raise_value_error=False)
+    assert numpy.isnan(_update(accumulator, y, t))
+
+
+def test_binned_auc_invalid_args():
+    with pytest.raises(ValueError):
+        BinnedAUCAccumulator('unknown')
+    with pytest.raises(ValueError):
+        BinnedAUCAccumulator(num_bins=0)
+    with pytest.raises(ValueError):
+        BinnedAUCAccumulator(min_value=1., max_value=0.)
+
+
+@pytest.mark.parametrize('metric', ['r2', 'mae', 'rmse'])
+def test_regression_metric(metric):
+    numpy.random.seed(0)
+    t = numpy.random.uniform(-1, 1, (1000,)) + 1e4
+    y = t + numpy.random.normal(0, 0.3, (1000,))
+    expect = {
+        'r2': metrics.r2_score(t, y),
+        'mae': metrics.mean_absolute_error(t, y),
+        'rmse': numpy.sqrt(metrics.mean_squared_error(t, y)),
+    }[metric]
+    actual = _update(RegressionMetricAccumulator(metric), y, t, batchsize=37)
+    assert actual == pytest.approx(expect, rel=1e-8)
+
+
+def test_regression_metric_ignore_nan():
+    t = numpy.array([1., 2., numpy.nan, 4.])
+    y = numpy.array([1.5, numpy.nan, 3., 3.])
+    accumulator = RegressionMetricAccumulator('mae', ignore_nan=True)
+    assert _update(accumulator, y, t, batchsize=3) == pytest.approx(0.75)
+
+
+@pytest.mark.parametrize('metric', ['r2', 'mae', 'rmse'])
+@pytest.mark.parametrize('multioutput', ['uniform_average', 'raw_values'])
+def test_regression_metric_multioutput(metric, multioutput):
+    numpy.random.seed(0)
+    # Outputs of different scales
+    t = numpy.random.uniform(-1, 1, (1000, 2)) * numpy.array([1., 100.])
+    y = t + numpy.random.normal(0, 1., (1000, 2))
+    raw_values = {
+        'r2': metrics.r2_score(t, y, multioutput='raw_values'),
+        'mae': metrics.mean_absolute_error(t, y, multioutput='raw_values'),
+        'rmse': numpy.sqrt(metrics.mean_squared_error(
+            t, y, multioutput='raw_values')),
+    }[metric]
+    expect = raw_values.mean() if multioutput == 'uniform_average' else \
+        raw_values
+    accumulator = RegressionMetricAccumulator(metric, multioutput=multioutput)
+    actual = _update(accumulator, y, t, batchsize=37)
+    numpy.testing.assert_allclose(actual, expect, rtol=1e-8)
+
+
+def test_regression_metric_ignore_nan_per_output():
+    t = numpy.array([[1., 1.], [2., numpy.nan], [3., 2.], [4., 4.]])
+    y = numpy.array([[1., 2.], [2., 0.], [3., numpy.nan], [5., 4.]])
+    accumulator = RegressionMetricAccumulator(
+        'mae', ignore_nan=True, multioutput='raw_values')
+    numpy.testing.assert_allclose(_update(accumulator, y, t, batchsize=3),
+                                  [0.25, 0.5])
+
+
+@pytest.mark.parametrize('metric', ['r2', 'mae', 'rmse'])
+def test_regression_metric_merge(metric):
+    numpy.random.seed(0)
+    t = numpy.random.uniform(-1, 1, (100, 2))
+    y = t + numpy.random.normal(0, 0.3, (100, 2))
+    expect = _update(RegressionMetricAccumulator(metric), y, t)
+    accumulator = RegressionMetricAccumulator(metric)
+    for start, end in [(0, 30), (30, 30), (30, 100)]:
+        shard = RegressionMetricAccumulator(metric)
+        _update(shard, y[start:end], t[start:end], batchsize=7)
+        accumulator.merge(shard)
+    assert accumulator.compute() == pytest.approx(expect, rel=1e-8)
+
+
+def test_binned_auc_merge(classification_data):
+    y, t = classification_data
+    expect = _update(BinnedAUCAccumulator(), y, t)
+    accumulator = BinnedAUCAccumulator()
+    for start, end in [(0, 400), (400, 1000)]:
+        shard = BinnedAUCAccumulator()
+        _update(shard, y[start:end], t[start:end])
+        accumulator.merge(shard)
+    assert accumulator.compute() == pytest.approx(expect)
+    with pytest.raises(ValueError):
+        accumulator.merge(BinnedAUCAccumulator(num_bins=10))
+
+
+def test_regression_metric_invalid_multioutput():
+    with pytest.raises(ValueError):
+        RegressionMetricAccumulator(multioutput='variance_weighted')
+
+
+def _evaluate(evaluator, predictor):
+    repo = chainer.Reporter()
+    repo.add_observer('target', predictor)
+    with repo:
+        return evaluator.evaluate()
+
+
+@pytest.mark.parametrize('evaluator_class,key,expect_fn', [
+    (ROCAUCEvaluator, 'roc_auc', lambda t, y: metrics.roc_auc_score(t, y)),
+    (PRCAUCEvaluator, 'prc_auc', _prc_auc),
+])
+def test_auc_evaluator_num_bins(classification_data, evaluator_class, key,
+                                expect_fn):
+    y, t = classification_data
+    predictor = DummyPredictor()
+    dataset = NumpyTupleDataset(y[:, None], t[:, None])
+    iterator = SerialIterator(dataset, 64, repeat=False, shuffle=False)
+    evaluator = evaluator_class(iterator, predictor, num_bins=1000000)
+    observation = _evaluate(evaluator, predictor)
+    assert observation['target/' + key] == pytest.approx(expect_fn(t, y),
+                                                         abs=1e-6)
+
+
+def test_r2_score_evaluator_streaming():
+    numpy.random.seed(0)
+    t = numpy.random.uniform(-1, 1, (100, 1)).astype(numpy.float32)
+    y = t + numpy.random.normal(0, 0.3, (100, 1)).astype(numpy.float32)
+    predictor = DummyPredictor()
+    iterator = SerialIterator(NumpyTupleDataset(y, t), 16, repeat=False,
+                              shuffle=False)
+    evaluator = R2ScoreEvaluator(iterator, predictor, streaming=True)
+    observation = _evaluate(evaluator, predictor)
+    assert observation['target/r2_score'] == pytest.approx(
+        metrics.r2_score(t, y), rel=1e-5)
+
+
+def test_r2_score_evaluator_streaming_multioutput():
+    numpy.random.seed(0)
+    t = numpy.random.uniform(-1, 1, (100, 2)).astype(numpy.float32)
+    t[:, 1] *= 100.
+    y = t + numpy.random.normal(0, 1., (100, 2)).astype(numpy.float32)
+    predictor = DummyPredictor()
+    for multioutput in ['uniform_average', 'raw_values']:
+        iterator = SerialIterator(NumpyTupleDataset(y, t), 16, repeat=False,
+                                  shuffle=False)
+        evaluator = R2ScoreEvaluator(iterator, predictor, streaming=True,
+                                     multioutput=multioutput)
+        observation = _evaluate(evaluator, predictor)
+        numpy.testing.assert_allclose(
+            observation['target/r2_score'],
+            metrics.r2_score(t, y, multioutput=multioutput), rtol=1e-5)
+
+
+def test_batch_evaluator_mixed_metrics():
+    numpy.random.seed(0)
+    t = numpy.random.uniform(-1, 1, (50, 1)).astype(numpy.float32)
+    y = t + numpy.random.normal(0, 0.3, (50, 1)).astype(numpy.float32)
+    predictor = DummyPredictor()
+    iterator = SerialIterator(NumpyTupleDataset(y, t), 16, repeat=False,
+                              shuffle=False)
+    evaluator = BatchEvaluator(iterator, predictor, metrics_fun={
+        'mae': RegressionMetricAccumulator('mae'),
+        'mae_exact': lambda y, t: numpy.abs(y - t).mean()})
+    observation = _evaluate(evaluator, predictor)
+    assert observation['target/mae'] == pytest.approx(
+        observation['target/mae_exact'], rel=1e-5)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
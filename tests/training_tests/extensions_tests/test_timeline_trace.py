@@ -0,0 +1,115 @@
+import json
+import os
+import types
+
+import numpy
+import pytest
+
+from chainer import functions
+from chainer import links
+from chainer.iterators import SerialIterator
+from chainer import optimizers
+from chainer.dataset import convert
+from chainer import training
+
+from chainer_chemistry.dataset.converters import concat_mols
+from chainer_chemistry.datasets.numpy_tuple_dataset import NumpyTupleDataset  # NOQA
+from chainer_chemistry.training.extensions.r2_score_evaluator import R2ScoreEvaluator  # NOQA
+from chainer_chemistry.training.extensions import timeline_trace
+from chainer_chemistry.training.extensions.timeline_trace import TimelineTrace  # NOQA
+
+
+@pytest.fixture
+def dataset():
+    numpy.random.seed(0)
+    x = numpy.random.uniform(-1, 1, (20, 3)).astype(numpy.float32)
+    t = x.sum(axis=1, keepdims=True)
+    return NumpyTupleDataset(x, t)
+
+
+def _setup_trainer(dataset, out):
+    model = links.Classifier(links.Linear(3, 1),
+                             lossfun=functions.mean_squared_error)
+    model.compute_accuracy = False
+    optimizer = optimizers.SGD()
+    optimizer.setup(model)
+    iterator = SerialIterator(dataset, 5)
+    updater = training.StandardUpdater(iterator, optimizer,
+                                       converter=concat_mols)
+    trainer = training.Trainer(updater, (2, 'epoch'), out=out)
+    valid_iter = SerialIterator(dataset, 5, repeat=False, shuffle=False)
+    trainer.extend(R2ScoreEvaluator(valid_iter, model.predictor, name='val'),
+                   name='val')
+    return trainer
+
+
+@pytest.mark.parametrize('sample_interval', [1, 3])
+def test_timeline_trace(dataset, tmpdir, sample_interval):
+    trainer = _setup_trainer(dataset, str(tmpdir))
+    trace = TimelineTrace(sample_interval=sample_interval)
+    trainer.extend(trace)
+    updater = trainer.updater
+    trainer.run()
+
+    with open(os.path.join(str(tmpdir), 'trace.json')) as f:
+        events = json.load(f)['traceEvents']
+    # 8 iterations, iteration 0, 3, 6 are sampled when sample_interval=3
+    n_sampled = len(range(0, 8, sample_interval))
+    names = [e['name'] for e in events]
+    for name in ['iteration', 'next_batch', 'converter', 'optimizer_update',
+                 'forward', 'backward', 'extensions']:
+        assert names.count(name) == n_sampled
+    # evaluator is always recorded
+    assert names.count('val/evaluate') == 2
+    iterations = sorted(set(e['args']['iteration'] for e in events
+                            if e['name'] == 'iteration'))
+    assert iterations == list(range(0, 8, sample_interval))
+    for e in events:
+        assert e['ph'] == 'X'
+        assert e['dur'] >= 0
+
+    # Wrapped methods are restored
+    assert 'update' not in vars(updater)
+    assert 'next' not in vars(updater.get_iterator('main'))
+    assert updater.converter is concat_mols
+    assert updater.loss_func is None
+
+
+def test_timeline_trace_old_chainer(dataset, tmpdir, monkeypatch):
+    # Chainer older than v7 does not have `Converter`.
+    monkeypatch.setattr(timeline_trace, 'convert', types.SimpleNamespace(
+        converter=convert.converter))
+    trainer = _setup_trainer(dataset, str(tmpdir))
+    trainer.extend(TimelineTrace())
+    trainer.run()
+    assert os.path.exists(os.path.join(str(tmpdir), 'trace.json'))
+
+
+def test_timeline_trace_max_events(dataset, tmpdir):
+    trainer = _setup_trainer(dataset, str(tmpdir))
+    trace = TimelineTrace(filename='out/trace.json', max_events=5)
+    trainer.extend(trace)
+    trainer.run()
+    with open(os.path.join(str(tmpdir), 'out', 'trace.json')) as f:
+        events = json.load(f)['traceEvents']
+    # The latest events are kept
+    assert len(events) == 5
+    assert max(e['args']['iteration'] for e in events) == 7
+
+
+def test_timeline_trace_default_max_events():
+    trace = TimelineTrace()
+    for i in range(trace.max_events + 10):
+        trace.add_span('iteration', 0., 1.)
+    assert len(trace.events) == trace.max_events
+
+
+def test_timeline_trace_invalid_args():
+    with pytest.raises(ValueError):
+        TimelineTrace(sample_interval=0)
+    with pytest.raises(ValueError):
+        TimelineTrace(max_events=0)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
@@ -0,0 +1,98 @@
+import subprocess
+import sys
+import types
+
+import pytest
+
+from chainer_chemistry.utils.lazy_import import lazy_import
+
+
+@pytest.fixture
+def module():
+    name = 'dummy_lazy_package'
+    m = types.ModuleType(name)
+    sys.modules[name] = m
+    yield m
+    del sys.modules[name]
+
+
+def test_lazy_import(module):
+    getattr_fn, dir_fn, names = lazy_import(
+        module.__name__, submodules=['path'],
+        attributes={'OrderedDict': 'collections'})
+    assert names == ['OrderedDict', 'path']
+    assert 'path' not in vars(module)
+    assert set(names) <= set(dir_fn())
+
+    import collections
+    assert getattr_fn('OrderedDict') is collections.OrderedDict
+    # value is cached in the module
+    assert vars(module)['OrderedDict'] is collections.OrderedDict
+    with pytest.raises(AttributeError):
+        getattr_fn('not_exist')
+
+
+def test_lazy_import_eager(module, monkeypatch):
+    # Python older than 3.7
+    monkeypatch.setattr(sys, 'version_info', (3, 6, 0))
+    lazy_import(module.__name__,
+                attributes={'OrderedDict': 'collections',
+                            'deque': 'collections'},
+                lazy_only=['deque'])
+    assert 'OrderedDict' in vars(module)
+    assert 'deque' not in vars(module)
+
+
+def _loaded_modules(code):
+    code += ('\nimport sys\n'
+             'print(",".join(m for m in ["chainer", "rdkit", "pandas", '
+             '"sklearn", "matplotlib"] if m in sys.modules))')
+    out = subprocess.check_output([sys.executable, '-c', code])
+    return set(out.decode('utf-8').strip().split(',')) - {''}
+
+
+def test_import_chainer_chemistry():
+    assert _loaded_modules('import chainer_chemistry') == set()
+
+
+def test_import_chainer_chemistry_eager_without_rdkit():
+    code = ('import sys, warnings\n'
+            'sys.version_info = (3, 6, 0)\n'
+            'sys.modules["rdkit"] = None\n'
+            'with warnings.catch_warnings(record=True) as w:\n'
+            '    warnings.simplefilter("always")\n'
+            '    import chainer_chemistry\n'
+            'print(any("RDKit" in str(x.message) for x in w))\n'
+            'print(",".join(chainer_chemistry.__all__))')
+    out = subprocess.check_output([sys.executable, '-c', code])
+    warned, names = out.decode('utf-8').strip().splitlines()[-2:]
+    assert warned == 'True'
+    assert 'datasets' not in names.split(',')
+    assert 'models' in names.split(',')
+
+
+def test_package_attributes():
+    import chainer_chemistry
+    assert 'models' in chainer_chemistry.__all__
+    assert not hasattr(chainer_chemistry, '_')
+
+
+def test_import_model():
+    assert _loaded_modules(
+        'from chainer_chemistry.models import NFP') == {'chainer'}
+
+
+def test_import_numpy_inference():
+    assert _loaded_modules(
+        'from chainer_chemistry.inference import load_numpy_model') == set()
+
+
+def test_attribute_access():
+    import chainer_chemistry
+    from chainer_chemistry.models.nfp import NFP
+    assert chainer_chemistry.models.NFP is NFP
+    assert 'NFP' in dir(chainer_chemistry.models)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])